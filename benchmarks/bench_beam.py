@@ -0,0 +1,40 @@
+"""
+Quality-versus-time report of the beam-search mode against the exact greedy total score approach on
+generated large catalogs: per catalog size and (beam width, candidate cap), the run time and score of both.
+
+    python -m benchmarks.bench_beam --catalog-tools 2000 5000 --activities 300 --stack-tools 25 --beams 1x1 4x8 8x16
+"""
+import argparse
+
+from benchmarks.compare_engines import prepare_inputs, time_call
+from utils.catalog_matrix import CatalogMatrix
+from utils.requirement_calc import run_beam_search, run_total_score_prioritization
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--catalog-tools", type=int, nargs="+", default=(2000, 5000))
+    parser.add_argument("--activities", type=int, default=300)
+    parser.add_argument("--stack-tools", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--beams", nargs="+", default=("1x1", "4x8", "8x16"), help="beam width x candidate cap")
+    args = parser.parse_args()
+
+    print(f"{'catalog':>7} {'mode':>10} {'ms':>9} {'score':>8} {'vs greedy':>10}")
+    for catalog_tools in args.catalog_tools:
+        tools_dict, def_tools_data = prepare_inputs(catalog_tools, args.activities, args.stack_tools, args.seed)
+        catalog = CatalogMatrix(def_tools_data)
+        (_, greedy_score), seconds = time_call(
+            run_total_score_prioritization, tools_dict, def_tools_data, catalog=catalog
+        )
+        print(f"{catalog_tools:>7} {'greedy':>10} {seconds * 1000:9.1f} {greedy_score:8.3f}")
+        for beam in args.beams:
+            beam_width, candidate_cap = (int(part) for part in beam.split("x"))
+            (_, score), seconds = time_call(
+                run_beam_search, tools_dict, def_tools_data, catalog=catalog, beam_width=beam_width, candidate_cap=candidate_cap
+            )
+            print(f"{catalog_tools:>7} {beam:>10} {seconds * 1000:9.1f} {score:8.3f} {score - greedy_score:+10.3f}")
+
+
+if __name__ == "__main__":
+    main()
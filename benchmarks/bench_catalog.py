@@ -0,0 +1,45 @@
+"""
+Times and measures peak memory of catalog ingestion on a generated catalog.
+
+    python -m benchmarks.bench_catalog --tools 5000 --activities 300
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import synthetic_catalog, write_catalog_xlsx
+from utils.utils import parse_def_tools_data_from_xlsx
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tools", type=int, default=5000)
+    parser.add_argument("--activities", type=int, default=300)
+    parser.add_argument("--density", type=float, default=0.3)
+    args = parser.parse_args()
+
+    catalog = synthetic_catalog(args.tools, args.activities, args.density)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.xlsx")
+        write_catalog_xlsx(catalog, path)
+        print(f"workbook: {args.tools} tools x {args.activities} activities, {os.path.getsize(path) / 1e6:.1f} MB")
+
+        start = time.perf_counter()
+        parsed = parse_def_tools_data_from_xlsx(path)
+        elapsed = time.perf_counter() - start
+
+        # Separate pass for memory, tracemalloc slows parsing down several times
+        tracemalloc.start()
+        parse_def_tools_data_from_xlsx(path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    pairs = sum(len(info["activities"]) for info in parsed.values())
+    assert len(parsed) == len(catalog), "tool columns were cut off"
+    print(f"parsed {len(parsed)} tools / {pairs} activity pairs in {elapsed:.2f} s, peak traced memory {peak / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Times the payment-method sweep of the Design Recommendation page after the user edited one activity row on the
+requirement engineering page: once from scratch, once with the score memo of the sweeps before the edit, and once with
+that memo and the step log of those sweeps (replaying the decisions the edit left as they were). Checks that all three
+give the same recommendations.
+
+    python -m benchmarks.bench_edit --catalog-tools 2000 --activities 300 --stack-tools 25 --edits 10
+"""
+import argparse
+import copy
+import random
+import time
+
+from benchmarks.compare_engines import prepare_inputs
+from data.SelectValues import DigitalizationOptions, AILevelOptions, synchronizationOptions, NeedForChangeOptions
+from utils import instrumentation
+from utils.catalog_matrix import CatalogMatrix
+from utils.option_codecs import ActivityCodes
+from utils.requirement_calc import ENGINES, RECOMMENDATION_ENGINE, StepLog, run_payment_sweep, tool_priorizitation
+from utils.score_memo import ScoreMemo
+
+EDITABLE_COLUMNS = {
+    "needForChange": NeedForChangeOptions,
+    "digitalization": DigitalizationOptions,
+    "aiLevel": AILevelOptions,
+    "synchronization": synchronizationOptions,
+}
+
+
+def edited_stack(tools_dict, tool_id, row_idx, column, value):
+    """tools_dict after a saved edit of one cell, rebuilt the way pages/requirement.py loads the stack."""
+    edited = copy.deepcopy(tools_dict)
+    row = edited[tool_id]["activities"][row_idx]
+    row[column] = value
+    row.pop("nfc_score", None)
+    edited[tool_id]["prio_score"] = tool_priorizitation(edited[tool_id]["activities"])
+    edited[tool_id]["activity_codes"] = ActivityCodes(edited[tool_id]["activities"])
+    return edited
+
+
+def timed_sweep(tools_dict, def_tools_data, catalog, engine, memo=None, step_log=None):
+    # Every sweep is profiled, so the counters cost all of them alike
+    with instrumentation.profiling() as profile:
+        start = time.perf_counter()
+        sweep = run_payment_sweep(tools_dict, def_tools_data, catalog=catalog, engine=engine, memo=memo, step_log=step_log)
+        return sweep, time.perf_counter() - start, profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--catalog-tools", type=int, default=2000)
+    parser.add_argument("--activities", type=int, default=300)
+    parser.add_argument("--stack-tools", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", choices=ENGINES, default=RECOMMENDATION_ENGINE)
+    parser.add_argument("--edits", type=int, default=10, help="single-cell edits, each followed by a sweep")
+    args = parser.parse_args()
+
+    tools_dict, def_tools_data = prepare_inputs(args.catalog_tools, args.activities, args.stack_tools, args.seed)
+    for tool_info in tools_dict.values():
+        tool_info["activity_codes"] = ActivityCodes(tool_info["activities"])
+    catalog = CatalogMatrix(def_tools_data)
+    memo, logged_memo = ScoreMemo(), ScoreMemo()
+    step_log = StepLog(logged_memo)
+    run_payment_sweep(tools_dict, def_tools_data, catalog=catalog, engine=args.engine, memo=memo)
+    run_payment_sweep(tools_dict, def_tools_data, catalog=catalog, engine=args.engine, memo=logged_memo, step_log=step_log)
+
+    rng = random.Random(args.seed)
+    print(f"catalog: {args.catalog_tools} tools, stack: {len(tools_dict)} tools, engine: {args.engine}")
+    print(f"{'edit':40} {'fresh ms':>9} {'warm memo ms':>12} {'step log ms':>11} {'replayed':>8}")
+    fresh_total = warm_total = logged_total = 0
+    for _ in range(args.edits):
+        tool_id = rng.choice([tool_id for tool_id, info in tools_dict.items() if info["activities"]])
+        row_idx = rng.randrange(len(tools_dict[tool_id]["activities"]))
+        column = rng.choice(list(EDITABLE_COLUMNS))
+        value = rng.choice(EDITABLE_COLUMNS[column])
+        tools_dict = edited_stack(tools_dict, tool_id, row_idx, column, value)
+
+        fresh, fresh_seconds, _ = timed_sweep(copy.deepcopy(tools_dict), def_tools_data, catalog, args.engine)
+        warm, warm_seconds, _ = timed_sweep(tools_dict, def_tools_data, catalog, args.engine, memo=memo)
+        logged, logged_seconds, profile = timed_sweep(
+            tools_dict, def_tools_data, catalog, args.engine, memo=logged_memo, step_log=step_log
+        )
+
+        assert warm == fresh, "warm-memo sweep disagrees with the fresh one"
+        assert logged == fresh, "step-log sweep disagrees with the fresh one"
+        fresh_total += fresh_seconds
+        warm_total += warm_seconds
+        logged_total += logged_seconds
+        replayed = profile.counters.get("steps_replayed", 0)
+        print(f"{column + ' = ' + value:40.40} {fresh_seconds * 1000:9.1f} {warm_seconds * 1000:12.1f} {logged_seconds * 1000:11.1f} {replayed:8}")
+    print(
+        f"{'total':40} {fresh_total * 1000:9.1f} {warm_total * 1000:12.1f} {logged_total * 1000:11.1f}"
+        f"   warm memo {fresh_total / warm_total:.1f}x, step log {fresh_total / logged_total:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Runs the exact branch-and-bound solver of the total score objective against the greedy approach on synthetic stacks
+of growing size and prints the score it gains, the proven gap left when the time budget runs out and the search size.
+
+    python -m benchmarks.bench_exact --catalog-tools 300 --activities 60 --stack-tools 2 4 8 --budget 2
+"""
+import argparse
+
+from benchmarks.compare_engines import prepare_inputs, time_call
+from utils.catalog_matrix import CatalogMatrix
+from utils.requirement_calc import run_exact_total_score
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--catalog-tools", type=int, default=300)
+    parser.add_argument("--activities", type=int, default=60)
+    parser.add_argument("--stack-tools", type=int, nargs="+", default=(2, 4, 8))
+    parser.add_argument("--seeds", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=2.0, help="time budget per solve in seconds")
+    args = parser.parse_args()
+
+    print(f"catalog: {args.catalog_tools} tools, budget: {args.budget} s")
+    print(f"{'stack':>5} {'seed':>4} {'greedy':>8} {'exact':>8} {'gain':>7} {'gap':>7} {'optimal':>7} {'nodes':>7} {'seconds':>8}")
+    for stack_tools in args.stack_tools:
+        for seed in range(args.seeds):
+            tools_dict, def_tools_data = prepare_inputs(args.catalog_tools, args.activities, stack_tools, seed)
+            catalog = CatalogMatrix(def_tools_data)
+            (results, score, report), seconds = time_call(
+                run_exact_total_score, tools_dict, def_tools_data, catalog=catalog, time_budget=args.budget
+            )
+            print(
+                f"{stack_tools:>5} {seed:>4} {report['greedy_score']:8.3f} {score:8.3f} {report['improvement']:7.3f}"
+                f" {report['gap']:7.3f} {str(report['optimal']):>7} {report['nodes']:>7} {seconds:8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Times run_all_approaches, as the Design Recommendation page calls it, with the "sequential" and the "thread"
+executor (a fresh score memo per run, like a new request), and checks that both give the same recommendations.
+
+    python -m benchmarks.bench_executor --catalog-tools 2000 --activities 300 --stack-tools 25
+"""
+import argparse
+import os
+import time
+
+from benchmarks.compare_engines import prepare_inputs
+from utils.catalog_matrix import CatalogMatrix
+from utils.requirement_calc import ENGINES, EXECUTORS, RECOMMENDATION_ENGINE, run_all_approaches
+from utils.score_memo import ScoreMemo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--catalog-tools", type=int, default=2000)
+    parser.add_argument("--activities", type=int, default=300)
+    parser.add_argument("--stack-tools", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--payment", type=int, nargs="*", default=[2])
+    parser.add_argument("--engine", choices=ENGINES, default=RECOMMENDATION_ENGINE)
+    args = parser.parse_args()
+
+    tools_dict, def_tools_data = prepare_inputs(args.catalog_tools, args.activities, args.stack_tools, args.seed)
+    catalog = CatalogMatrix(def_tools_data)
+    # Warm up the thread pool and the imports
+    run_all_approaches(tools_dict, def_tools_data, args.payment, catalog=catalog, engine=args.engine, executor="thread")
+
+    print(f"catalog: {args.catalog_tools} tools, stack: {len(tools_dict)} tools, engine: {args.engine}, cpus: {os.cpu_count()}")
+    outputs = {}
+    best = {}
+    for executor in EXECUTORS:
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            outputs[executor] = run_all_approaches(
+                tools_dict, def_tools_data, args.payment, catalog=catalog, engine=args.engine, memo=ScoreMemo(), executor=executor
+            )
+            times.append(time.perf_counter() - start)
+        best[executor] = min(times)
+        print(f"{executor:10} {best[executor] * 1000:8.1f} ms (best of {args.repeat})")
+    assert outputs["thread"] == outputs["sequential"], "executors disagree"
+    print(f"thread / sequential: {best['thread'] / best['sequential']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
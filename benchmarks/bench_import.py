@@ -0,0 +1,79 @@
+"""
+Cold start of the recommendation_engine package in fresh interpreters (median of --runs): its import time, measured
+with python -X importtime, next to the engine modules it loads on the first recommend call, and the time from a cold
+interpreter to the first recommendation (import plus first call on a two-tool catalog), of which numpy takes most.
+Exits with status 1 when the package import takes longer than --max-ms or the first recommendation longer than
+--max-first-ms, so the check can run in CI.
+
+    python -m benchmarks.bench_import --runs 7 --max-ms 30 --max-first-ms 250
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+MODULES = ("recommendation_engine", "numpy", "utils.requirement_calc", "utils.cover_engine")
+
+# Imports the package and makes one recommendation, printing both times in ms
+FIRST_RECOMMENDATION = """
+import json, time
+start = time.perf_counter()
+from recommendation_engine import ActivityRequirement, CatalogTool, Preferences, StackTool, recommend
+imported = time.perf_counter()
+catalog = [
+    CatalogTool("Chat", ("Text chatting", "Video calls"), 2, 1, 2, 4, 4, 3, 4, 4, (1, 2)),
+    CatalogTool("Mail", ("Text chatting",), 1, 0, 1, 3, 3, 4, 3, 3, (2,)),
+]
+stack = [StackTool("t1", "Old chat", (ActivityRequirement("Text chatting", need_for_change="Must change"),))]
+recommend(stack, catalog, Preferences(3, 4, 2, 5, payment_methods=(2,)))
+done = time.perf_counter()
+print(json.dumps({"import": (imported - start) * 1000, "first call": (done - imported) * 1000}))
+"""
+
+
+def cold_import_ms(module):
+    """Cumulative import time of module in a fresh interpreter, from the last line of the -X importtime report."""
+    report = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    ).stderr
+    for line in reversed(report.splitlines()):
+        if line.rstrip().endswith(f"| {module}"):
+            return int(line.split("|")[1]) / 1000
+    raise RuntimeError(f"no import time reported for {module}")
+
+
+def first_recommendation_ms():
+    """Import and first-call times of FIRST_RECOMMENDATION in a fresh interpreter."""
+    output = subprocess.run([sys.executable, "-c", FIRST_RECOMMENDATION], capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--max-ms", type=float, default=30.0)
+    parser.add_argument("--max-first-ms", type=float, default=250.0)
+    args = parser.parse_args()
+
+    medians = {}
+    for module in MODULES:
+        medians[module] = statistics.median(cold_import_ms(module) for _ in range(args.runs))
+        print(f"import {module:28} {medians[module]:8.1f} ms")
+    cold = [first_recommendation_ms() for _ in range(args.runs)]
+    first_ms = statistics.median(times["import"] + times["first call"] for times in cold)
+    print(f"{'first recommendation':35} {first_ms:8.1f} ms (import {statistics.median(t['import'] for t in cold):.1f} ms, "
+          f"first call {statistics.median(t['first call'] for t in cold):.1f} ms, numpy alone {medians['numpy']:.1f} ms)")
+    failed = False
+    if medians[MODULES[0]] > args.max_ms:
+        print(f"{MODULES[0]} imports in more than {args.max_ms} ms")
+        failed = True
+    if first_ms > args.max_first_ms:
+        print(f"the first recommendation takes more than {args.max_first_ms} ms")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Times the trade-off view of the recommendations on a synthetic catalog, and the sweep dominance filter it uses against
+an all-pairs comparison on random (coverage, cost rating, tool count) points.
+
+    python -m benchmarks.bench_pareto --catalog-tools 2000 --activities 300 --stack-tools 25 --points 100 1000 5000
+"""
+import argparse
+import random
+import time
+
+from benchmarks.compare_engines import prepare_inputs, time_call
+from utils.catalog_matrix import CatalogMatrix
+from utils.pareto import pareto_front
+from utils.requirement_calc import run_pareto_frontier
+
+
+def all_pairs_front(points):
+    def dominates(p, q):
+        return p[0] >= q[0] and p[1] >= q[1] and p[2] <= q[2] and p != q
+    return [idx for idx, point in enumerate(points) if not any(dominates(other, point) for other in points)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--catalog-tools", type=int, default=2000)
+    parser.add_argument("--activities", type=int, default=300)
+    parser.add_argument("--stack-tools", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--points", type=int, nargs="+", default=[100, 1000, 5000])
+    args = parser.parse_args()
+
+    tools_dict, def_tools_data = prepare_inputs(args.catalog_tools, args.activities, args.stack_tools, args.seed)
+    catalog = CatalogMatrix(def_tools_data)
+    frontier, seconds = time_call(run_pareto_frontier, tools_dict, def_tools_data, catalog=catalog)
+    print(f"catalog: {args.catalog_tools} tools, stack: {len(tools_dict)} tools")
+    print(f"frontier: {len(frontier)} stacks in {seconds * 1000:.1f} ms")
+
+    rng = random.Random(args.seed)
+    print(f"{'points':>7} {'front':>6} {'sweep ms':>9} {'all-pairs ms':>13}")
+    for count in args.points:
+        points = [(rng.randint(0, 300) / 300, rng.randint(1, 50) / 10, rng.randint(1, 30)) for _ in range(count)]
+        start = time.perf_counter()
+        front = pareto_front(points)
+        sweep_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        reference = all_pairs_front(points)
+        pairs_seconds = time.perf_counter() - start
+        assert sorted(points[idx] for idx in front) == sorted(set(points[idx] for idx in reference))
+        print(f"{count:7} {len(front):6} {sweep_seconds * 1000:9.2f} {pairs_seconds * 1000:13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Times the unfiltered fallback of run_approach: the payment-filtered run followed by a full second run on the whole
+catalog sharing the score memo, against run_approach, which re-takes the decisions both runs share (see
+requirement_calc.PaymentFallbackSteps). Checks that both give the same recommendations.
+
+    python -m benchmarks.bench_payment_fallback --catalog-tools 2000 --activities 300 --stack-tools 25 --payment 1
+"""
+import argparse
+import time
+
+from benchmarks.compare_engines import prepare_inputs
+from utils import instrumentation
+from utils.catalog_matrix import CatalogMatrix
+from utils.requirement_calc import APPROACHES, _approach_outcome, check_if_all_activities_covered, run_approach
+from utils.score_memo import ScoreMemo
+
+
+def best_ms(repeat, fn):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--catalog-tools", type=int, default=2000)
+    parser.add_argument("--activities", type=int, default=300)
+    parser.add_argument("--stack-tools", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--payment", type=int, nargs="+", default=[1])
+    args = parser.parse_args()
+
+    tools_dict, def_tools_data = prepare_inputs(args.catalog_tools, args.activities, args.stack_tools, args.seed)
+    catalog = CatalogMatrix(def_tools_data)
+    print(f"catalog: {args.catalog_tools} tools, stack: {len(tools_dict)} tools, payment: {args.payment}")
+    print(f"{'approach':32} {'filtered':>9} {'2 runs':>9} {'shared':>9} {'steps shared':>13}")
+    for title, approach in APPROACHES:
+        filtered_ms, filtered = best_ms(
+            args.repeat, lambda: approach(tools_dict, def_tools_data, args.payment, catalog=catalog, memo=ScoreMemo())
+        )
+
+        def two_runs():
+            memo = ScoreMemo()
+            filtered = approach(tools_dict, def_tools_data, args.payment, catalog=catalog, memo=memo)
+            unfiltered = None
+            if not check_if_all_activities_covered(tools_dict, filtered[0]):
+                unfiltered = approach(tools_dict, def_tools_data, catalog=catalog, memo=memo)
+            return _approach_outcome(title, tools_dict, args.payment, filtered, unfiltered)
+
+        two_runs_ms, expected = best_ms(args.repeat, two_runs)
+        with instrumentation.profiling() as profile:
+            shared_ms, outcome = best_ms(
+                args.repeat, lambda: run_approach(title, tools_dict, def_tools_data, args.payment, catalog=catalog, memo=ScoreMemo())
+            )
+        assert outcome == expected, f"{title}: run_approach disagrees with the two runs"
+        steps = f"{profile.counters.get('fallback_steps_shared', 0) // args.repeat}/{profile.counters.get('picks', 0) // args.repeat}"
+        print(f"{title:32} {filtered_ms:7.1f}ms {two_runs_ms:7.1f}ms {shared_ms:7.1f}ms {steps:>13}")
+
+
+if __name__ == "__main__":
+    main()
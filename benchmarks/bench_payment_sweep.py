@@ -0,0 +1,46 @@
+"""
+Times the payment-method scenario sweep of the Design Recommendation page against running the page's approaches
+once per scenario, and checks that both give the same recommendations.
+
+    python -m benchmarks.bench_payment_sweep --catalog-tools 2000 --activities 300 --stack-tools 25
+"""
+import argparse
+import time
+
+from benchmarks.compare_engines import prepare_inputs
+from utils.catalog_matrix import CatalogMatrix
+from utils.requirement_calc import ENGINES, RECOMMENDATION_ENGINE, payment_scenarios, run_all_approaches, run_payment_sweep
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--catalog-tools", type=int, default=2000)
+    parser.add_argument("--activities", type=int, default=300)
+    parser.add_argument("--stack-tools", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", choices=ENGINES, default=RECOMMENDATION_ENGINE)
+    args = parser.parse_args()
+
+    tools_dict, def_tools_data = prepare_inputs(args.catalog_tools, args.activities, args.stack_tools, args.seed)
+    catalog = CatalogMatrix(def_tools_data)
+    scenarios = payment_scenarios()
+
+    start = time.perf_counter()
+    separate = {
+        scenario: run_all_approaches(tools_dict, def_tools_data, list(scenario), catalog=catalog, engine=args.engine)
+        for scenario in scenarios
+    }
+    separate_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sweep = run_payment_sweep(tools_dict, def_tools_data, scenarios, catalog=catalog, engine=args.engine)
+    sweep_seconds = time.perf_counter() - start
+
+    assert sweep == separate, "sweep disagrees with the separate runs"
+    print(f"catalog: {args.catalog_tools} tools, stack: {len(tools_dict)} tools, engine: {args.engine}")
+    print(f"{len(scenarios)} separate runs {separate_seconds * 1000:8.1f} ms")
+    print(f"one sweep          {sweep_seconds * 1000:8.1f} ms ({separate_seconds / sweep_seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
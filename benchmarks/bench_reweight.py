@@ -0,0 +1,52 @@
+"""
+Times the payment-method sweep of the Design Recommendation page after the user changed only the preference weights:
+once from scratch and once with the score memo of the sweep under the previous weights, and checks that both give the
+same recommendations. The warm sweep is a full rerun whose per-tool scores come from the memo; nothing is re-ranked
+from cached weight components or replayed.
+
+    python -m benchmarks.bench_reweight --catalog-tools 2000 --activities 300 --stack-tools 25
+"""
+import argparse
+import time
+
+from benchmarks.compare_engines import prepare_inputs
+from utils.catalog_matrix import CatalogMatrix
+from utils.requirement_calc import ENGINES, RECOMMENDATION_ENGINE, assign_preference_scores, run_payment_sweep
+from utils.score_memo import ScoreMemo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--catalog-tools", type=int, default=2000)
+    parser.add_argument("--activities", type=int, default=300)
+    parser.add_argument("--stack-tools", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", choices=ENGINES, default=RECOMMENDATION_ENGINE)
+    parser.add_argument("--weights", type=float, nargs=4, default=(3, 4, 2, 5), help="usability support integration cost")
+    parser.add_argument("--new-weights", type=float, nargs=4, default=(3, 5, 2, 4))
+    args = parser.parse_args()
+
+    tools_dict, def_tools_data = prepare_inputs(args.catalog_tools, args.activities, args.stack_tools, args.seed, args.weights)
+    catalog = CatalogMatrix(def_tools_data)
+    memo = ScoreMemo()
+    run_payment_sweep(tools_dict, def_tools_data, catalog=catalog, engine=args.engine, memo=memo)
+
+    start = time.perf_counter()
+    assign_preference_scores(def_tools_data, *args.new_weights, catalog=catalog)
+    fresh = run_payment_sweep(tools_dict, def_tools_data, catalog=catalog, engine=args.engine)
+    fresh_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    assign_preference_scores(def_tools_data, *args.new_weights, catalog=catalog)
+    warm = run_payment_sweep(tools_dict, def_tools_data, catalog=catalog, engine=args.engine, memo=memo)
+    warm_seconds = time.perf_counter() - start
+
+    assert warm == fresh, "warm-memo sweep disagrees with the fresh one"
+    print(f"catalog: {args.catalog_tools} tools, stack: {len(tools_dict)} tools, engine: {args.engine}")
+    print(f"weights {tuple(args.weights)} -> {tuple(args.new_weights)}")
+    print(f"fresh sweep      {fresh_seconds * 1000:8.1f} ms")
+    print(f"warm-memo sweep  {warm_seconds * 1000:8.1f} ms ({fresh_seconds / warm_seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Times the top_k option of the recommendation approaches for growing k on a synthetic catalog, to check that the
+runtime grows about linearly with k.
+
+    python -m benchmarks.bench_top_k --catalog-tools 2000 --activities 300 --stack-tools 25 --k 1 3 5 10
+"""
+import argparse
+import time
+
+from benchmarks.compare_engines import prepare_inputs
+from utils.catalog_matrix import CatalogMatrix
+from utils.requirement_calc import APPROACHES, ENGINES, RECOMMENDATION_ENGINE
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--catalog-tools", type=int, default=2000)
+    parser.add_argument("--activities", type=int, default=300)
+    parser.add_argument("--stack-tools", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", choices=ENGINES, default=RECOMMENDATION_ENGINE)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5, 10])
+    args = parser.parse_args()
+
+    tools_dict, def_tools_data = prepare_inputs(args.catalog_tools, args.activities, args.stack_tools, args.seed)
+    catalog = CatalogMatrix(def_tools_data)
+    print(f"catalog: {args.catalog_tools} tools, stack: {len(tools_dict)} tools, engine: {args.engine}")
+    print(f"{'approach':40} {'k':>4} {'stacks':>7} {'ms':>9} {'best score':>11} {'k-th score':>11}")
+    for title, approach in APPROACHES:
+        for k in args.k:
+            start = time.perf_counter()
+            outputs = approach(tools_dict, def_tools_data, catalog=catalog, engine=args.engine, top_k=k)
+            seconds = time.perf_counter() - start
+            print(f"{title:40} {k:4} {len(outputs):7} {seconds * 1000:9.1f} {outputs[0][1]:11.3f} {outputs[-1][1]:11.3f}")
+
+
+if __name__ == "__main__":
+    main()
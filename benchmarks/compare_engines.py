@@ -0,0 +1,75 @@
+"""
+Runs the three recommendation approaches (with and without payment filter) on synthetic inputs with the classic and
+lazy engines, checks that both return the same results and prints timings and, for the lazy engine, how many tools
+were scored.
+
+    python -m benchmarks.compare_engines --catalog-tools 2000 --activities 300 --stack-tools 25
+"""
+import argparse
+import copy
+import time
+
+from utils import cover_engine
+from benchmarks.synthetic import synthetic_catalog, synthetic_re_details, tools_dict_from_rows
+from utils.catalog_matrix import CatalogMatrix
+from utils.requirement_calc import (
+    calculate_def_tools_preference_scores,
+    run_forced_exchange_approach,
+    run_one_by_one_exchange_approach,
+    run_total_score_prioritization,
+    tool_priorizitation,
+)
+
+APPROACHES = (
+    ("total score", run_total_score_prioritization, cover_engine.run_total_score_prioritization),
+    ("one-by-one", run_one_by_one_exchange_approach, cover_engine.run_one_by_one_exchange_approach),
+    ("forced", run_forced_exchange_approach, cover_engine.run_forced_exchange_approach),
+)
+
+
+def prepare_inputs(catalog_tools, activities, stack_tools, seed=0, weights=(3, 4, 2, 5)):
+    """Catalog with preference scores and a prioritized tools_dict, as pages/requirement.py prepares them."""
+    def_tools_data = synthetic_catalog(catalog_tools, activities, density=0.05, seed=seed)
+    for def_tool_info in def_tools_data.values():
+        calculate_def_tools_preference_scores(def_tool_info, *weights)
+    tools_dict = tools_dict_from_rows(synthetic_re_details(def_tools_data, stack_tools, seed=seed))
+    for tool_info in tools_dict.values():
+        tool_info["prio_score"] = tool_priorizitation(tool_info["activities"])
+    return tools_dict, def_tools_data
+
+
+def time_call(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--catalog-tools", type=int, default=2000)
+    parser.add_argument("--activities", type=int, default=300)
+    parser.add_argument("--stack-tools", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    tools_dict, def_tools_data = prepare_inputs(args.catalog_tools, args.activities, args.stack_tools, args.seed)
+    catalog = CatalogMatrix(def_tools_data)
+    print(f"catalog: {args.catalog_tools} tools, stack: {len(tools_dict)} tools / "
+          f"{sum(len(t['activities']) for t in tools_dict.values())} activities")
+    for title, approach, bitset_approach in APPROACHES:
+        for user_payment in ([2], None):
+            stats = {}
+            classic, classic_seconds = time_call(
+                approach, copy.deepcopy(tools_dict), def_tools_data, user_payment, catalog=catalog, engine="classic"
+            )
+            lazy, lazy_seconds = time_call(
+                bitset_approach, copy.deepcopy(tools_dict), def_tools_data, user_payment, catalog, stats=stats
+            )
+            assert lazy == classic, f"{title}: lazy engine disagrees with classic"
+            label = f"{title} ({'payment filter' if user_payment else 'no filter'})"
+            print(f"{label:32} classic {classic_seconds * 1000:8.1f} ms"
+                  f" | lazy {lazy_seconds * 1000:7.1f} ms, {stats['tools_scored']:6} scored")
+
+
+if __name__ == "__main__":
+    main()
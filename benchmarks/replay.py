@@ -0,0 +1,69 @@
+"""
+Replays a corpus of recorded Design Recommendation sessions (see utils.replay) against the current engine: runs
+run_all_approaches on every capture, prints its time and the differences to the recommendations recorded with it,
+and optionally writes the report as JSON. Captures recorded against another catalog are skipped unless --force.
+
+    python -m benchmarks.replay recordings/ --engine lazy --repeat 3 --report replay_report.json
+"""
+import argparse
+import json
+import sys
+import time
+
+from utils.catalog_matrix import CatalogMatrix
+from utils.replay import catalog_hash, diff_outcomes, load_corpus, session_inputs, summarize_outcomes
+from utils.requirement_calc import ENGINES, RECOMMENDATION_ENGINE, assign_preference_scores, run_all_approaches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", help="directory of recorded captures")
+    parser.add_argument("--catalog", default=None, help="catalog workbook (default: data/def_tools_data.xlsx)")
+    parser.add_argument("--engine", choices=ENGINES, default=RECOMMENDATION_ENGINE)
+    parser.add_argument("--repeat", type=int, default=1, help="runs per capture, the best time is reported")
+    parser.add_argument("--force", action="store_true", help="also replay captures recorded against another catalog")
+    parser.add_argument("--report", default=None, help="write the per-capture report to this JSON file")
+    args = parser.parse_args()
+
+    # Imported here: utils.utils sets up the app's data directory and pulls in streamlit and pandas
+    from utils.utils import load_def_tools_data_from_xlsx
+
+    def_tools_data = load_def_tools_data_from_xlsx(args.catalog) if args.catalog else load_def_tools_data_from_xlsx()
+    catalog = CatalogMatrix(def_tools_data)
+    current_hash = catalog_hash(def_tools_data)
+
+    report = []
+    for path, capture in load_corpus(args.corpus):
+        entry = {"capture": path, "catalog_matches": capture["catalog_hash"] == current_hash}
+        report.append(entry)
+        if not entry["catalog_matches"] and not args.force:
+            print(f"{path}: recorded against another catalog, skipped")
+            continue
+        tools_dict, weights, user_payment = session_inputs(capture)
+        assign_preference_scores(def_tools_data, *weights, catalog=catalog)
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            outcomes = run_all_approaches(tools_dict, def_tools_data, user_payment, catalog=catalog, engine=args.engine)
+            seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+        entry["ms"] = best * 1000
+        entry["stack_activities"] = len(capture["re_details"])
+        entry["diffs"] = diff_outcomes(capture["outcomes"], summarize_outcomes(outcomes))
+        print(f"{path}: {entry['stack_activities']} activities, {entry['ms']:.1f} ms, "
+              + ("same recommendations" if not entry["diffs"] else f"{len(entry['diffs'])} differences"))
+        for diff in entry["diffs"]:
+            print(f"  {diff}")
+
+    replayed = [entry for entry in report if "ms" in entry]
+    changed = [entry for entry in replayed if entry["diffs"]]
+    total_ms = sum(entry["ms"] for entry in replayed)
+    print(f"replayed {len(replayed)} of {len(report)} captures in {total_ms:.1f} ms, {len(changed)} with differences")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"engine": args.engine, "catalog_hash": current_hash, "captures": report}, f, indent=1)
+    sys.exit(1 if changed else 0)
+
+
+if __name__ == "__main__":
+    main()
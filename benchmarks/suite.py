@@ -0,0 +1,196 @@
+"""
+Benchmark suite: times catalog ingestion and the recommendation engine on generated catalogs
+(benchmarks.synthetic.realistic_catalog) and re_details tool stacks over a grid of sizes, and appends the timings to a
+JSON history file, so runs on different commits can be compared case by case. Each timing is the best of --repeat
+runs, in milliseconds:
+- parse_xlsx: parse_def_tools_data_from_xlsx of the catalog written as a workbook (skipped above --max-ingest-cells)
+- load_cached: load_def_tools_data_from_xlsx served from its cache snapshot
+- catalog_matrix: CatalogMatrix of the catalog
+- total_score / one_by_one / forced: the approach with the common payment method (2) as filter
+- payment_fallback: run_all_approaches with a rare payment method (3), which mostly falls back to the whole catalog
+- recommendation_score: one calculate_recommendation_score call on the total score stack
+
+    python -m benchmarks.suite --grid quick
+    python -m benchmarks.suite --grid full --history benchmarks/history.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+
+from benchmarks.synthetic import realistic_catalog, synthetic_re_details, tools_dict_from_rows, write_catalog_xlsx
+from utils.catalog_matrix import CatalogMatrix
+from utils.requirement_calc import (
+    RECOMMENDATION_ENGINE,
+    assign_preference_scores,
+    calculate_recommendation_score,
+    run_all_approaches,
+    run_forced_exchange_approach,
+    run_one_by_one_exchange_approach,
+    run_total_score_prioritization,
+    tool_priorizitation,
+)
+
+# (catalog tools, catalog activities) per grid
+GRIDS = {
+    "quick": [(10, 50), (100, 50), (100, 300), (1000, 300)],
+    "full": [(tools, activities) for tools in (10, 100, 1000, 10000) for activities in (50, 300, 2000)],
+}
+DEFAULT_HISTORY = os.path.join(os.path.dirname(__file__), "history.json")
+COMMON_PAYMENT = [2]
+RARE_PAYMENT = [3]
+WEIGHTS = (3, 4, 2, 5)
+
+
+def best_ms(repeat, fn, *args, **kwargs):
+    """Best wall time of repeat calls in ms, and the result of the last call."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best * 1000, result
+
+
+def per_call_ms(repeat, fn, *args):
+    """Best mean time per call in ms for cheap functions, over batches of calls lasting at least 50 ms."""
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn(*args)
+        if time.perf_counter() - start >= 0.05:
+            break
+        calls *= 2
+    return min(best_ms(1, lambda: [fn(*args) for _ in range(calls)])[0] for _ in range(repeat)) / calls
+
+
+def time_ingestion(def_tools_data, repeat, max_cells):
+    # Imported here: utils.utils sets up the app's data directory and pulls in streamlit and pandas
+    from utils.utils import load_def_tools_data_from_xlsx, parse_def_tools_data_from_xlsx
+
+    activities = {activity["activity"] for info in def_tools_data.values() for activity in info["activities"]}
+    if len(def_tools_data) * len(activities) > max_cells:
+        return {"parse_xlsx": None, "load_cached": None}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.xlsx")
+        cache_path = os.path.join(tmp, "catalog.cache")
+        write_catalog_xlsx(def_tools_data, path)
+        parse_ms, _ = best_ms(repeat, parse_def_tools_data_from_xlsx, path)
+        load_def_tools_data_from_xlsx(path, cache_path)
+        cached_ms, _ = best_ms(repeat, load_def_tools_data_from_xlsx, path, cache_path)
+    return {"parse_xlsx": parse_ms, "load_cached": cached_ms}
+
+
+def run_case(catalog_tools, catalog_activities, stack_tools, engine, repeat, max_cells, seed):
+    def_tools_data = realistic_catalog(catalog_tools, catalog_activities, seed=seed)
+    tools_dict = tools_dict_from_rows(synthetic_re_details(def_tools_data, stack_tools, seed=seed))
+    for tool_info in tools_dict.values():
+        tool_info["prio_score"] = tool_priorizitation(tool_info["activities"])
+
+    timings = time_ingestion(def_tools_data, repeat, max_cells)
+    timings["catalog_matrix"], catalog = best_ms(repeat, CatalogMatrix, def_tools_data)
+    assign_preference_scores(def_tools_data, *WEIGHTS, catalog=catalog)
+    for key, approach in (
+        ("total_score", run_total_score_prioritization),
+        ("one_by_one", run_one_by_one_exchange_approach),
+        ("forced", run_forced_exchange_approach),
+    ):
+        timings[key], output = best_ms(repeat, approach, tools_dict, def_tools_data, COMMON_PAYMENT, catalog=catalog, engine=engine)
+        if key == "total_score":
+            results = output[0] if output else []
+    timings["payment_fallback"], _ = best_ms(
+        repeat, run_all_approaches, tools_dict, def_tools_data, RARE_PAYMENT, catalog=catalog, engine=engine
+    )
+    timings["recommendation_score"] = per_call_ms(repeat, calculate_recommendation_score, tools_dict, results)
+    return {
+        "catalog_tools": catalog_tools,
+        "catalog_activities": catalog_activities,
+        "stack_tools": stack_tools,
+        "stack_activities": sum(len(info["activities"]) for info in tools_dict.values()),
+        "timings_ms": timings,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def case_key(case):
+    return case["catalog_tools"], case["catalog_activities"], case["stack_tools"]
+
+
+def previous_cases(history, engine):
+    """Latest earlier timings per case (catalog size, stack size) measured with the same engine."""
+    previous = {}
+    for run in history:
+        if run.get("engine") == engine:
+            for case in run["cases"]:
+                previous[case_key(case)] = (run.get("commit"), case["timings_ms"])
+    return previous
+
+
+def print_case(case, previous):
+    commit, earlier = previous.get(case_key(case), (None, {}))
+    print(f"{case['catalog_tools']} tools x {case['catalog_activities']} activities, stack {case['stack_tools']} tools"
+          f" / {case['stack_activities']} activities" + (f" (vs {commit})" if earlier else ""))
+    for key, ms in case["timings_ms"].items():
+        line = f"  {key:22} " + ("   skipped" if ms is None else f"{ms:10.3f} ms")
+        if ms is not None and earlier.get(key):
+            line += f"  {(ms / earlier[key] - 1) * 100:+7.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--grid", choices=GRIDS, default="quick")
+    parser.add_argument("--stack-tools", type=int, default=25)
+    parser.add_argument("--engine", default=RECOMMENDATION_ENGINE)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-ingest-cells", type=int, default=2_000_000,
+                        help="skip the workbook timings above this many tool x activity cells")
+    parser.add_argument("--history", default=DEFAULT_HISTORY)
+    parser.add_argument("--no-save", action="store_true", help="print the timings without appending them")
+    args = parser.parse_args()
+
+    history = load_history(args.history)
+    previous = previous_cases(history, args.engine)
+    cases = []
+    for catalog_tools, catalog_activities in GRIDS[args.grid]:
+        case = run_case(catalog_tools, catalog_activities, args.stack_tools, args.engine, args.repeat, args.max_ingest_cells, args.seed)
+        print_case(case, previous)
+        cases.append(case)
+
+    if not args.no_save:
+        history.append({
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "engine": args.engine,
+            "grid": args.grid,
+            "seed": args.seed,
+            "cases": cases,
+        })
+        with open(args.history, "w", encoding="utf-8") as file:
+            json.dump(history, file, indent=1)
+        print(f"appended to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
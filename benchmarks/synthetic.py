@@ -0,0 +1,155 @@
+"""
+Synthetic inputs for the benchmarks: tool catalogs in the def_tools_data.xlsx layout and re_details tool stacks.
+"""
+import math
+import random
+
+import openpyxl
+
+# Share of catalog tools per payment method list, roughly as in data/def_tools_data.xlsx
+PAYMENT_METHOD_MIX = [([2], 0.70), ([1, 2], 0.12), ([2, 3], 0.08), ([0], 0.04), ([3], 0.03), ([1], 0.03)]
+
+
+def synthetic_catalog(n_tools, n_activities, density=0.3, seed=0):
+    """
+    Returns a catalog dict shaped like utils.utils.load_def_tools_data_from_xlsx output.
+    Every tool covers each activity with probability `density` (at least one activity).
+    """
+    rnd = random.Random(seed)
+    activities = [(f"activity {i}", f"task {i // 8}") for i in range(n_activities)]
+    methods, weights = zip(*PAYMENT_METHOD_MIX)
+    catalog = {}
+    for t in range(n_tools):
+        covered = [a for a in activities if rnd.random() < density] or [rnd.choice(activities)]
+        catalog[f"Tool {t}"] = {
+            "activities": [{"activity": name, "category": category} for name, category in covered],
+            "integration": round(rnd.uniform(3.5, 5.0), 1),
+            "usability": round(rnd.uniform(3.5, 5.0), 1),
+            "cost": round(rnd.uniform(3.5, 5.0), 1),
+            "support": round(rnd.uniform(3.5, 5.0), 1),
+            "functionality": round(rnd.uniform(3.5, 5.0), 1),
+            "automation": rnd.randint(1, 3),
+            "ai_level": rnd.randint(1, 4),
+            "syncronization": rnd.randint(1, 4),
+            "payment_method": list(rnd.choices(methods, weights)[0]),
+        }
+    return catalog
+
+
+def realistic_catalog(n_tools, n_activities, median_activities=26, max_activities=60, seed=0):
+    """
+    Like synthetic_catalog, but sparse the way data/def_tools_data.xlsx is: a tool offers a bounded, skewed number of
+    activities (about median_activities, 2 to max_activities, whatever the size of the activity list) and some
+    activities are offered by far more tools than others.
+    """
+    rnd = random.Random(seed)
+    activities = [(f"activity {i}", f"task {i // 8}") for i in range(n_activities)]
+    popularity = [1 / (rank + 1) ** 0.8 for rank in range(n_activities)]
+    rnd.shuffle(popularity)
+    cum_weights = []
+    total = 0.0
+    for weight in popularity:
+        total += weight
+        cum_weights.append(total)
+    methods, weights = zip(*PAYMENT_METHOD_MIX)
+    catalog = {}
+    for t in range(n_tools):
+        count = min(n_activities, max_activities, max(2, int(rnd.lognormvariate(math.log(median_activities), 0.6))))
+        covered = set()
+        while len(covered) < count:
+            covered.update(rnd.choices(range(n_activities), cum_weights=cum_weights, k=count - len(covered)))
+        catalog[f"Tool {t}"] = {
+            "activities": [{"activity": activities[i][0], "category": activities[i][1]} for i in sorted(covered)],
+            "integration": round(rnd.uniform(3.5, 5.0), 1),
+            "usability": round(rnd.uniform(3.5, 5.0), 1),
+            "cost": round(rnd.uniform(3.5, 5.0), 1),
+            "support": round(rnd.uniform(3.5, 5.0), 1),
+            "functionality": round(rnd.uniform(3.5, 5.0), 1),
+            "automation": rnd.randint(1, 3),
+            "ai_level": rnd.randint(1, 4),
+            "syncronization": rnd.randint(1, 4),
+            "payment_method": list(rnd.choices(methods, weights)[0]),
+        }
+    return catalog
+
+
+def write_catalog_xlsx(catalog, file_path):
+    """Writes a catalog dict as a workbook in the def_tools_data.xlsx layout (incidence sheet + rating sheet)."""
+    activities = []
+    seen = set()
+    for info in catalog.values():
+        for act in info["activities"]:
+            key = (act["activity"], act["category"])
+            if key not in seen:
+                seen.add(key)
+                activities.append(key)
+    row_of = {key: i for i, key in enumerate(activities)}
+    tool_names = list(catalog)
+    marks = [[0] * len(tool_names) for _ in activities]
+    for col, name in enumerate(tool_names):
+        for act in catalog[name]["activities"]:
+            marks[row_of[(act["activity"], act["category"])]][col] = 1
+
+    # A regular (not write-only) workbook so the sheets carry a <dimension> tag like Excel-saved files do
+    workbook = openpyxl.Workbook()
+    incidence = workbook.active
+    incidence.title = "ECBBs"
+    incidence.append(["tool category", "task", "activity"] + tool_names)
+    for (activity, category), row in zip(activities, marks):
+        incidence.append(["synthetic", category, activity] + row)
+    ratings = workbook.create_sheet("Tool Rating")
+    ratings.append(["Software", "tool integration", "tool usability", "cost", "support", "funcionality", "rating",
+                    None, "automatisation", "AI level", "synchronisation", "pay modell"])
+    for name in tool_names:
+        info = catalog[name]
+        ratings.append([name, info["integration"], info["usability"], info["cost"], info["support"],
+                        info["functionality"], None, None, info["automation"], info["ai_level"],
+                        info["syncronization"], " / ".join(str(pm) for pm in info["payment_method"])])
+    workbook.save(file_path)
+
+
+def synthetic_re_details(catalog, n_tools, activities_per_tool=6, manual_tasks=3, unknown_share=0.05, seed=0):
+    """
+    Returns re_details_data.json style rows for a current tool stack of n_tools tools plus manual_tasks manual
+    tasks. Activities are drawn from the catalog (a share of them under names the catalog does not know).
+    """
+    # Imported here so the catalog generators stay usable without the option lists
+    from data.SelectValues import DigitalizationOptions, AILevelOptions, synchronizationOptions, NeedForChangeOptions
+
+    rnd = random.Random(seed)
+    names = sorted({act["activity"] for info in catalog.values() for act in info["activities"]})
+    rows = []
+
+    def row(tool_idx, activity_idx, tool_name, is_manual):
+        if rnd.random() < unknown_share:
+            category = f"Unlisted activity {rnd.randint(0, 50)}"
+        else:
+            category = rnd.choice(names).capitalize()
+        return {
+            "needForChange": rnd.choice(NeedForChangeOptions),
+            "voe": round(rnd.uniform(1, 10), 1),
+            "category": category,
+            "tool": tool_name,
+            "digitalization": rnd.choice(DigitalizationOptions),
+            "aiLevel": rnd.choice(AILevelOptions),
+            "synchronization": rnd.choice(synchronizationOptions),
+            "id": f"{tool_idx}-{activity_idx}",
+            "base_tool_id": f"tool-{tool_idx}",
+            "isManual": is_manual,
+        }
+
+    for t in range(n_tools):
+        for a in range(rnd.randint(1, 2 * activities_per_tool - 1)):
+            rows.append(row(t, a, f"Current Tool {t}", False))
+    for m in range(manual_tasks):
+        rows.append(row(n_tools + m, 0, "Manual Task", True))
+    return rows
+
+
+def tools_dict_from_rows(rows):
+    """Groups re_details rows by base_tool_id the way pages/requirement.py builds tools_dict."""
+    tools_dict = {}
+    for row in rows:
+        tool = tools_dict.setdefault(row["base_tool_id"], {"activities": [], "tool_name": row["tool"]})
+        tool["activities"].append(dict(row))
+    return tools_dict
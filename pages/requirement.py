@@ -1,4 +1,6 @@
 import streamlit as st
+import hashlib
+import json
 
 from utils.utils import (
     JSON_RE_DETAILS_DATA_PATH,
@@ -8,7 +10,15 @@ from utils.utils import (
 
 from utils.process_locator import determine_page, save_current_page, Page, run_redirect, clean_for_previous_direction
 
-from utils.requirement_calc import read_user_preference_scores, tool_priorizitation, calculate_def_tools_preference_scores, run_total_score_prioritization, run_one_by_one_exchange_approach, run_forced_exchange_approach
+from utils.catalog_matrix import CatalogMatrix
+from utils.score_memo import ScoreMemo
+from utils.replay import RECORD_DIR, catalog_hash, record_session
+from utils.instrumentation import DEBUG, start_profiling, stop_profiling, timed
+from utils.result_cache import RESULT_CACHE, result_key
+from utils.option_codecs import ActivityCodes
+from utils.activity_registry import activity_id
+from utils.requirement_calc import read_user_preference_scores, tool_priorizitation, assign_preference_scores, payment_scenarios, run_all_approaches, run_pareto_frontier, resolve_engine, submit_payment_sweep, StepLog
+from data.SelectValues import PaymentMethodOptions
 import pandas as pd
 from io import BytesIO
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
@@ -17,6 +27,9 @@ from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 
 run_redirect(Page.REQUIREMENT.value)
+# Engine counters and step timings of this run, shown in a debug expander below (RECOMMENDATION_DEBUG). The profile
+# belongs to the script thread of this session, so sessions running at the same time keep their numbers apart
+profile = start_profiling() if DEBUG else None
 
 maintitle1, maintitle2 = st.columns([1, 1])
 maintitle1.title("Design Recommendation")
@@ -90,13 +103,30 @@ for tool_id, tool_info in tools_dict.items():
   tool_name = tool_info["tool_name"]
   prio_score = tool_priorizitation(activities)  # Pass activities list
   tools_dict[tool_id]['prio_score'] = prio_score  # Add prio_score to tools_dict
+  # Decode the option strings of the rows once, the engine loops work on the integer codes
+  tools_dict[tool_id]['activity_codes'] = ActivityCodes(activities)
   # st.header(f"Tool Name: {tool_name} - Tool ID: {tool_id} - Prioritization Score: {prio_score:.2f}")
   # for activity in activities:
   #   #st.write(f"  Activity ID: {activity.get('id', 'N/A')} - Activity Name: {activity.get('tool', 'N/A')} - Need For Change: {activity.get('needForChange', 'N/A')} - NFC Score: {activity.get('nfc_score', 0)}")
   #   st.write(activity)
 
+# Highest Need For Change per activity ID over the whole tool stack, shown next to the recommended activities
+need_for_change_order = {"Must change": 3, "Nice to change": 2, "No need to change": 1}
+max_need_for_change = {}
+for tool_info in tools_dict.values():
+  for act in tool_info["activities"]:
+    if (act.get("category") or "").strip():
+      key = activity_id(act["category"])
+      nfc = act.get("needForChange", "")
+      if key not in max_need_for_change or need_for_change_order.get(nfc, 0) > need_for_change_order.get(max_need_for_change[key], 0):
+        max_need_for_change[key] = nfc
+
 # load def_tool_data
-def_tools_data = load_def_tools_data_from_xlsx()
+with timed("catalog loading"):
+  def_tools_data, catalog_load_info = load_def_tools_data_from_xlsx(with_info=True)
+  catalog = CatalogMatrix(def_tools_data)
+  # The catalog content without the preference scores, hashed once per run for the score memo and result cache keys
+  catalog_key = catalog_hash(def_tools_data)
 user_scores = read_user_preference_scores()
 if user_scores:
   user_usability, user_support, user_integration, user_cost, user_payment = user_scores
@@ -104,10 +134,8 @@ else:
   user_usability = user_support = user_integration = user_cost = 0
   user_payment = [1]
 
-
-for tool_name, def_tool_info in def_tools_data.items():
-  activities = def_tool_info.get("activities", [])
-  calculate_def_tools_preference_scores(def_tool_info, user_usability, user_support, user_integration, user_cost)
+with timed("preference scores"):
+  assign_preference_scores(def_tools_data, user_usability, user_support, user_integration, user_cost, catalog=catalog)
 
 with col_main[1]:
   st.header("Recommendation Results")
@@ -126,16 +154,7 @@ with col_main[1]:
     flow.append(Spacer(1, 12))
 
     def get_max_nfc_for_activity(activity_name):
-      order = {"Must change": 3, "Nice to change": 2, "No need to change": 1}
-      max_nfc = None
-      for tool in tools_dict.values():
-        for act in tool["activities"]:
-          cat = (act.get("category") or "").strip().lower()
-          if cat and cat == (activity_name or "").strip().lower():
-            nfc = act.get("needForChange", "")
-            if max_nfc is None or order.get(nfc, 0) > order.get(max_nfc, 0):
-              max_nfc = nfc
-      return max_nfc or ""
+      return max_need_for_change.get(activity_id(activity_name or "")) or ""
 
     for title, score, results in approaches:
       flow.append(Paragraph(f"{title} - Recommendation Score: {score:.2f}%" if results else f"{title} - Recommendation Score: N/A", styles['Heading2']))
@@ -193,16 +212,7 @@ with col_main[1]:
           activity_df["Activity"] = activity_df["Activity"].apply(lambda x: x.capitalize() if isinstance(x, str) else x)
 
           def get_max_need_for_change(activity_name):
-            max_nfc = None
-            for tool in tools_dict.values():
-              for act in tool["activities"]:
-                if act.get("category").strip().lower() == activity_name.lower():
-                  nfc = act.get("needForChange", "")
-                  # Order: Must change > Nice to change > No need to change
-                  order = {"Must change": 3, "Nice to change": 2, "No need to change": 1}
-                  if max_nfc is None or order.get(nfc, 0) > order.get(max_nfc, 0):
-                    max_nfc = nfc
-            return max_nfc
+            return max_need_for_change.get(activity_id(activity_name))
 
           # Add 'Need For Change' column
           activity_df["Need For Change"] = activity_df["Activity"].apply(
@@ -220,49 +230,83 @@ with col_main[1]:
       else:
         st.write("No activities found for this tool.")
 
-  def check_if_all_activities_covered(tools_dict, result_data):
-    all_activities = set()
-    for tool in tools_dict.values():
-      for activity in tool["activities"]:
-        category = activity.get("category", "").strip().lower()
-        if category:
-          all_activities.add(category)
-
-    covered_activities = set()
-    for tool in result_data:
-      for activity in tool.get("activities", []):
-        if isinstance(activity, str):
-          category = activity.strip().lower()
-        elif isinstance(activity, dict):
-          category = activity.get("category", "").strip().lower()
-        else:
-          continue
-        if category:
-          covered_activities.add(category)
-
-    uncovered_activities = all_activities - covered_activities
-    if not uncovered_activities:
-      return True
-    return False
+  def payment_scenario_label(scenario):
+    return ", ".join(PaymentMethodOptions[code - 1] if 0 < code <= len(PaymentMethodOptions) else "None" for code in scenario)
 
   st.write("---")
-  total_score_payment_flag = True
-  [total_score_prio_result, total_score_prio_score] = run_total_score_prioritization(tools_dict, def_tools_data, user_payment)
-  if not check_if_all_activities_covered(tools_dict, total_score_prio_result):
-    [total_score_prio_result, total_score_prio_score] = run_total_score_prioritization(tools_dict, def_tools_data)
-    total_score_payment_flag = False
-
-  one_by_one_payment_flag = True
-  [one_bye_one_exchange_result, one_by_one_score] = run_one_by_one_exchange_approach(tools_dict, def_tools_data, user_payment)
-  if not check_if_all_activities_covered(tools_dict, one_bye_one_exchange_result):
-    [one_bye_one_exchange_result, one_by_one_score] = run_one_by_one_exchange_approach(tools_dict, def_tools_data)
-    one_by_one_payment_flag = False
-
-  forced_exchange_payment_flag = True
-  [forced_exchange_result, forced_exchange_score] = run_forced_exchange_approach(tools_dict, def_tools_data, user_payment)
-  if not check_if_all_activities_covered(tools_dict, forced_exchange_result):
-    [forced_exchange_result, forced_exchange_score] = run_forced_exchange_approach(tools_dict, def_tools_data)
-    forced_exchange_payment_flag = False
+  scenarios = payment_scenarios()
+  user_scenario = tuple(sorted(set(user_payment)))
+  if user_scenario not in scenarios:
+    scenarios.append(user_scenario)
+  payment_scenario = st.selectbox(
+    "Payment Method Scenario",
+    options=scenarios,
+    index=scenarios.index(user_scenario),
+    format_func=payment_scenario_label,
+    help="Your payment method selection is preselected. Switch to compare the recommendations for other payment methods.",
+  )
+
+  def inputs_hash(*inputs):
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+  # The score memo depends on the catalog only, not on the preference scores
+  if st.session_state.get("payment_inputs_key") != catalog_key:
+    # Tool scores shared by all scenarios, and reused by the reruns after changing the preference weights or
+    # editing activity rows on the requirement engineering page
+    st.session_state["payment_score_memo"] = ScoreMemo()
+    # The greedy decisions of the runs, which the reruns after an edit of activity rows take over where the edit left
+    # them as they were
+    st.session_state["payment_step_log"] = StepLog(st.session_state["payment_score_memo"])
+    st.session_state["payment_inputs_key"] = catalog_key
+  # Recommendations per payment scenario, kept while the inputs stay the same. The selected scenario is computed first;
+  # the others are swept in the background once its results are shown (see below), so switching is a lookup
+  outcomes_key = inputs_hash(
+    catalog_key,
+    {tool_id: info["activities"] for tool_id, info in tools_dict.items()},
+    {tool_name: info["preference_score"] for tool_name, info in def_tools_data.items()},
+  )
+  if st.session_state.get("payment_outcomes_key") != outcomes_key:
+    st.session_state["payment_outcomes"] = {}
+    st.session_state["payment_outcomes_key"] = outcomes_key
+  scenario_outcomes = st.session_state["payment_outcomes"]
+  user_weights = (user_usability, user_support, user_integration, user_cost)
+
+  def scenario_cache_key(scenario):
+    return result_key(tools_dict, user_weights, [scenario], def_tools_data, resolve_engine(), catalog_key)
+
+  sweep = st.session_state.get("payment_sweep")
+  if sweep is not None and sweep["key"] == outcomes_key and (
+    sweep["future"].done() or (payment_scenario in sweep["scenarios"] and payment_scenario not in scenario_outcomes)
+  ):
+    # The background sweep of these inputs: taken when done, or waited for when it holds the selected scenario
+    with timed("background sweep"):
+      # A failed sweep leaves the scenarios to be computed when selected
+      swept = sweep["future"].result() if sweep["future"].exception() is None else {}
+    for scenario, outcomes in swept.items():
+      RESULT_CACHE.put(scenario_cache_key(scenario), outcomes)
+      scenario_outcomes.setdefault(scenario, outcomes)
+    del st.session_state["payment_sweep"]
+  if payment_scenario not in scenario_outcomes:
+    # Results of identical inputs computed before, in this or another session
+    cache_key = scenario_cache_key(payment_scenario)
+    outcomes = RESULT_CACHE.get(cache_key)
+    if outcomes is not None and profile is not None:
+      profile.count("result_cache_hits")
+    if outcomes is None:
+      with timed("recommendations"):
+        outcomes = run_all_approaches(
+          tools_dict, def_tools_data, list(payment_scenario), catalog=catalog, memo=st.session_state["payment_score_memo"],
+          step_log=st.session_state["payment_step_log"],
+        )
+      RESULT_CACHE.put(cache_key, outcomes)
+      if RECORD_DIR and payment_scenario == user_scenario:
+        record_session(RECORD_DIR, tools_dict, def_tools_data, user_weights, user_scenario, outcomes, catalog_key)
+    scenario_outcomes[payment_scenario] = outcomes
+  (
+    (_, total_score_prio_result, total_score_prio_score, total_score_payment_flag),
+    (_, one_bye_one_exchange_result, one_by_one_score, one_by_one_payment_flag),
+    (_, forced_exchange_result, forced_exchange_score, forced_exchange_payment_flag),
+  ) = scenario_outcomes[payment_scenario]
 
   # Prepare approaches and generate PDF for download (download button placed at top)
   approaches = [
@@ -270,7 +314,8 @@ with col_main[1]:
     ("One-by-One Exchange Approach", one_by_one_score or 0.0, one_bye_one_exchange_result),
     ("Forced Exchange Approach", forced_exchange_score or 0.0, forced_exchange_result),
   ]
-  pdf_bytes = generate_recommendation_pdf(tools_dict, approaches)
+  with timed("PDF generation"):
+    pdf_bytes = generate_recommendation_pdf(tools_dict, approaches)
   st.download_button(label="⬇️ Download Recommendation Report", data=pdf_bytes, file_name="recommendation_report.pdf", mime="application/pdf")
 
   st.header(f"Total Score Prioritization Approach", help="This approach considers all tool activities all together to find the best matching tool set for all activities.")
@@ -286,6 +331,78 @@ with col_main[1]:
   st.header(f"Forced Exchange Approach", help="This approach cosniders tools' activities prioritizing to find a tool that can cover all activities at once.")
   st.header(f"Recommendation Score: {forced_exchange_score:.2f}%" if forced_exchange_result else "Forced Exchange Approach - Recommendation Score: N/A")
   display_recommendation_results(forced_exchange_result, forced_exchange_payment_flag)
+  st.write("---")
+
+  # The results are shown; sweep the scenarios not computed yet in the background (the cached ones are taken as they are)
+  pending = []
+  for scenario in scenarios:
+    if scenario not in scenario_outcomes:
+      outcomes = RESULT_CACHE.get(scenario_cache_key(scenario))
+      if outcomes is None:
+        pending.append(scenario)
+      else:
+        scenario_outcomes[scenario] = outcomes
+  sweep = st.session_state.get("payment_sweep")
+  if pending and (sweep is None or sweep["key"] != outcomes_key):
+    if sweep is not None:
+      # A sweep of inputs that changed since; dropped if it hasn't started yet
+      sweep["future"].cancel()
+    st.session_state["payment_sweep"] = {
+      "key": outcomes_key,
+      "scenarios": pending,
+      "future": submit_payment_sweep(
+        tools_dict, def_tools_data, pending, catalog=catalog, memo=st.session_state["payment_score_memo"],
+        step_log=st.session_state["payment_step_log"],
+      ),
+    }
+
+  if st.checkbox("Show trade-offs between coverage, cost and number of tools", help="Tool sets from all approaches for which no other set covers more activities with a better cost rating and fewer tools."):
+    frontier_key = (outcomes_key, payment_scenario)
+    if st.session_state.get("pareto_frontier_key") != frontier_key:
+      with timed("trade-offs"):
+        st.session_state["pareto_frontier"] = run_pareto_frontier(
+          tools_dict, def_tools_data, list(payment_scenario), catalog=catalog, memo=st.session_state["payment_score_memo"]
+        )
+      st.session_state["pareto_frontier_key"] = frontier_key
+    frontier = st.session_state["pareto_frontier"]
+    if frontier:
+      st.dataframe(pd.DataFrame([
+        {
+          "Tools": ", ".join(result["tool_name"] for result in stack["results"]),
+          "Coverage": f"{stack['coverage'] * 100:.0f}%",
+          "Cost Rating": round(stack["cost"], 2),
+          "Number of Tools": stack["tool_count"],
+          "Recommendation Score": round(stack["score"], 2),
+        }
+        for stack in frontier
+      ]), hide_index=True)
+    else:
+      st.write("No tool set fits your payment method preferences.")
+
+  if profile is not None:
+    stop_profiling()
+    with st.expander("Debug: engine counters and timings"):
+      st.caption(
+        f"Catalog loaded from {catalog_load_info['source']} in {catalog_load_info['seconds'] * 1000:.1f} ms. "
+        "Only the steps computed in this run are listed; recommendations reused from the session add nothing."
+      )
+      st.dataframe(pd.DataFrame(
+        [{"Step": name, "Calls": calls, "Time (ms)": round(seconds * 1000, 2)} for name, (calls, seconds) in profile.timings.items()],
+        columns=["Step", "Calls", "Time (ms)"],
+      ), hide_index=True)
+      st.dataframe(pd.DataFrame(
+        [{"Counter": name, "Value": value} for name, value in sorted(profile.counters.items())], columns=["Counter", "Value"],
+      ), hide_index=True)
+      # Totals since the score memo of this session was created and since the server process started
+      memo_info = st.session_state["payment_score_memo"].info()
+      cache_info = RESULT_CACHE.info()
+      st.dataframe(pd.DataFrame(
+        [
+          {"Cache": "Score memo (session)", "Hits": memo_info["hits"], "Misses": memo_info["misses"], "Hit rate": f"{memo_info['hit_rate'] * 100:.1f}%", "Entries": memo_info["size"]},
+          {"Cache": "Result cache (server)", "Hits": cache_info["hits"] + cache_info["disk_hits"], "Misses": cache_info["misses"], "Hit rate": f"{cache_info['hit_rate'] * 100:.1f}%", "Entries": cache_info["size"]},
+        ],
+        columns=["Cache", "Hits", "Misses", "Hit rate", "Entries"],
+      ), hide_index=True)
 
 
   # calculate_def_tool_scores(tools_dict, def_tool_info)
@@ -0,0 +1,35 @@
+"""
+Importable recommendation engine: the approaches of the Design Recommendation page behind typed inputs and outputs,
+without Streamlit, pandas or data directory access. Importing the package only loads the types and the entry point;
+numpy and the engine modules (utils.requirement_calc, utils.cover_engine) load on the first recommend call, which
+makes that call the cold start: about 80-120 ms, nearly all of it the numpy import (benchmarks.bench_import measures
+both).
+
+    from recommendation_engine import ActivityRequirement, Catalog, Preferences, StackTool, recommend
+
+    catalog = Catalog.from_def_tools_data(load_def_tools_data_from_xlsx())
+    stack = [StackTool("t1", "Jira", (ActivityRequirement("Text chatting", need_for_change="Must change"),))]
+    for recommendation in recommend(stack, catalog, Preferences(3, 4, 2, 5, payment_methods=(2,))):
+      print(recommendation.approach, recommendation.score, [tool.name for tool in recommendation.tools])
+"""
+from recommendation_engine.types import (
+  ActivityRequirement,
+  Catalog,
+  CatalogTool,
+  Preferences,
+  Recommendation,
+  RecommendedTool,
+  StackTool,
+)
+from recommendation_engine.api import recommend
+
+__all__ = [
+  "ActivityRequirement",
+  "Catalog",
+  "CatalogTool",
+  "Preferences",
+  "Recommendation",
+  "RecommendedTool",
+  "StackTool",
+  "recommend",
+]
@@ -0,0 +1,55 @@
+"""
+Entry point of the recommendation engine for callers outside the Streamlit app (batch jobs, worker processes,
+tests). The engine modules are imported on the first call, not with this module.
+"""
+from recommendation_engine.types import Catalog, Preferences, Recommendation, RecommendedTool
+
+
+def recommend(stack, catalog, preferences=Preferences(), engine=None, executor=None):
+  """
+  The recommendations of the Design Recommendation page for one tool stack: per approach (utils.requirement_calc
+  APPROACHES order) the stack recommended among the tools accepting the user's payment methods, or among all tools
+  when those leave activities uncovered.
+  stack: StackTools; catalog: a Catalog (or CatalogTools, converted for this call only); preferences: Preferences;
+  engine / executor: see utils.requirement_calc.resolve_engine / run_all_approaches.
+  Returns a tuple of Recommendation.
+  """
+  from utils import requirement_calc as rc
+
+  if not isinstance(catalog, Catalog):
+    catalog = Catalog(catalog)
+  tools_dict = {}
+  for tool in stack:
+    rows = [activity.as_row(tool.tool_id, tool.tool_name) for activity in tool.activities]
+    tools_dict[tool.tool_id] = {"activities": rows, "tool_name": tool.tool_name, "prio_score": rc.tool_priorizitation(rows)}
+  # Preference scores are written into a copy, so one Catalog serves requests with different weights
+  def_tools_data = {name: dict(info) for name, info in catalog.def_tools_data().items()}
+  matrix = catalog.matrix()
+  rc.assign_preference_scores(
+    def_tools_data, preferences.usability, preferences.support, preferences.integration, preferences.cost, catalog=matrix
+  )
+  user_payment = list(preferences.payment_methods)
+  outcomes = rc.run_all_approaches(tools_dict, def_tools_data, user_payment, catalog=matrix, engine=engine, executor=executor)
+  return tuple(
+    Recommendation(
+      approach=title,
+      score=float(score or 0.0),
+      tools=tuple(_recommended_tool(result) for result in results),
+      payment_fallback=bool(user_payment) and not payment_flag,
+    )
+    for title, results, score, payment_flag in outcomes
+  )
+
+
+def _recommended_tool(result):
+  return RecommendedTool(
+    name=result["tool_name"],
+    activities=tuple(result.get("activities", [])),
+    total_score=float(result.get("total_score", 0.0)),
+    digi_score=float(result.get("digi_score", 0.0)),
+    cap_score=float(result.get("cap_score", 0.0)),
+    preference_score=float(result.get("preference_score", 0.0)),
+    automation=result.get("automation", "N/A"),
+    ai_level=result.get("ai_level", "N/A"),
+    synchronization=result.get("synchronization", "N/A"),
+  )
@@ -0,0 +1,150 @@
+"""
+Typed inputs and outputs of recommendation_engine.recommend. They are plain named tuples, so importing them costs next
+to nothing; recommend converts them to the dict layouts utils.requirement_calc works on.
+"""
+from typing import NamedTuple, Tuple
+
+
+class ActivityRequirement(NamedTuple):
+  """One activity of a tool in the current stack (a re_details row), with the option labels of data.SelectValues."""
+  activity: str
+  digitalization: str = "Automated"
+  ai_level: str = "No"
+  synchronization: str = "Ad-Hoc File Sharing"
+  need_for_change: str = "No need to change"
+  is_manual: bool = False
+
+  def as_row(self, tool_id, tool_name):
+    return {
+      "category": self.activity,
+      "tool": tool_name,
+      "digitalization": self.digitalization,
+      "aiLevel": self.ai_level,
+      "synchronization": self.synchronization,
+      "needForChange": self.need_for_change,
+      "isManual": self.is_manual,
+      "base_tool_id": tool_id,
+    }
+
+
+class StackTool(NamedTuple):
+  """A tool of the current stack and the activities it is used for."""
+  tool_id: str
+  tool_name: str
+  activities: Tuple[ActivityRequirement, ...] = ()
+
+
+class CatalogTool(NamedTuple):
+  """
+  A catalog tool as the def_tools_data.xlsx sheets describe it: the activities it offers, its automation / AI /
+  synchronization levels (-1 when unknown), its ratings and the codes of the payment methods it accepts (1-based in
+  PaymentMethodOptions order, 0 for none).
+  """
+  name: str
+  activities: Tuple[str, ...] = ()
+  automation: int = -1
+  ai_level: int = -1
+  synchronization: int = -1
+  integration: float = 0
+  usability: float = 0
+  cost: float = 0
+  support: float = 0
+  functionality: float = 0
+  payment_methods: Tuple[int, ...] = ()
+
+  def as_def_tool_info(self):
+    info = {
+      "activities": [{"activity": activity} for activity in self.activities],
+      "automation": self.automation,
+      "ai_level": self.ai_level,
+      "syncronization": self.synchronization,
+      "integration": self.integration,
+      "usability": self.usability,
+      "cost": self.cost,
+      "support": self.support,
+      "functionality": self.functionality,
+    }
+    if self.payment_methods:
+      info["payment_method"] = list(self.payment_methods)
+    return info
+
+
+class Preferences(NamedTuple):
+  """
+  The user's weights of the catalog ratings and accepted payment methods (codes as in CatalogTool); no payment
+  methods means no payment filter.
+  """
+  usability: float = 0
+  support: float = 0
+  integration: float = 0
+  cost: float = 0
+  payment_methods: Tuple[int, ...] = ()
+
+
+class RecommendedTool(NamedTuple):
+  """A tool of a recommended stack with the stack activities it takes over and its scores."""
+  name: str
+  activities: Tuple[str, ...]
+  total_score: float
+  digi_score: float
+  cap_score: float
+  preference_score: float
+  automation: str
+  ai_level: str
+  synchronization: str
+
+
+class Recommendation(NamedTuple):
+  """
+  The stack one approach recommends. payment_fallback: the stack was computed on the whole catalog because the tools
+  accepting the user's payment methods left activities uncovered.
+  """
+  approach: str
+  score: float
+  tools: Tuple[RecommendedTool, ...]
+  payment_fallback: bool
+
+
+class Catalog:
+  """
+  A tool catalog for recommend, converted to the engine's layout (def_tools_data and its CatalogMatrix) on first use
+  and reused by every request after that.
+  """
+
+  def __init__(self, tools):
+    self.tools = tuple(tools)
+    self._def_tools_data = None
+    self._matrix = None
+
+  @classmethod
+  def from_def_tools_data(cls, def_tools_data):
+    """Catalog of a def_tools_data dict as utils.utils.load_def_tools_data_from_xlsx returns it."""
+    catalog = cls(
+      CatalogTool(
+        name=name,
+        activities=tuple(activity.get("activity", "") for activity in info.get("activities", [])),
+        automation=info.get("automation", -1),
+        ai_level=info.get("ai_level", -1),
+        synchronization=info.get("syncronization", -1),
+        integration=info.get("integration", 0),
+        usability=info.get("usability", 0),
+        cost=info.get("cost", 0),
+        support=info.get("support", 0),
+        functionality=info.get("functionality", 0),
+        payment_methods=tuple(info.get("payment_method", ())),
+      )
+      for name, info in def_tools_data.items()
+    )
+    catalog._def_tools_data = {name: dict(info) for name, info in def_tools_data.items()}
+    return catalog
+
+  def def_tools_data(self):
+    if self._def_tools_data is None:
+      self._def_tools_data = {tool.name: tool.as_def_tool_info() for tool in self.tools}
+    return self._def_tools_data
+
+  def matrix(self):
+    if self._matrix is None:
+      from utils.catalog_matrix import CatalogMatrix
+      self._matrix = CatalogMatrix(self.def_tools_data())
+    return self._matrix
@@ -0,0 +1,17 @@
+"""Shared inputs of the engine tests: small synthetic catalogs and stacks (see benchmarks.synthetic)."""
+from benchmarks.synthetic import synthetic_catalog, synthetic_re_details, tools_dict_from_rows
+from utils.requirement_calc import calculate_def_tools_preference_scores, tool_priorizitation
+
+WEIGHTS = (3, 4, 2, 5)
+
+
+def make_inputs(catalog_tools=120, activities=40, stack_tools=6, seed=0, density=0.1, activities_per_tool=4, manual_tasks=2):
+    """Catalog with preference scores and a prioritized tools_dict, as pages/requirement.py prepares them."""
+    def_tools_data = synthetic_catalog(catalog_tools, activities, density=density, seed=seed)
+    for def_tool_info in def_tools_data.values():
+        calculate_def_tools_preference_scores(def_tool_info, *WEIGHTS)
+    rows = synthetic_re_details(def_tools_data, stack_tools, activities_per_tool, manual_tasks, seed=seed)
+    tools_dict = tools_dict_from_rows(rows)
+    for tool_info in tools_dict.values():
+        tool_info["prio_score"] = tool_priorizitation(tool_info["activities"])
+    return tools_dict, def_tools_data
@@ -0,0 +1,47 @@
+"""Canonical activity IDs (utils.activity_registry)."""
+from utils import activity_registry as ar
+
+
+def test_options_get_ids_in_list_order():
+    registry = ar.ActivityRegistry()
+    assert [registry.activity_id(option) for option in ar.CATEGORY_OPTIONS[:3]] == [0, 1, 2]
+    assert registry.names[0] == ar.normalize_activity_name(ar.CATEGORY_OPTIONS[0])
+
+
+def test_spellings_of_one_activity_share_an_id():
+    registry = ar.ActivityRegistry()
+    option = "Conducting Video calls/conferencing"
+    expected = registry.activity_id(option)
+    assert registry.activity_id("  conducting   VIDEO calls/conferencing ") == expected
+    for alias, target in ar.ACTIVITY_ALIASES.items():
+        assert registry.activity_id(alias) == registry.activity_id(target)
+        assert registry.activity_id(alias.upper()) == registry.activity_id(target)
+    assert registry.activity_id("Conducting Video calls") == expected
+
+
+def test_unlisted_names_get_stable_ids_outside_the_options():
+    registry = ar.ActivityRegistry()
+    first = registry.activity_id("Some Typed Activity")
+    assert first == ar.ActivityRegistry().activity_id("some typed   activity")
+    assert first >= ar.UNLISTED_BASE and first < 2**63
+    assert first != registry.activity_id("Another Typed Activity")
+
+
+def test_only_registered_spellings_are_remembered():
+    registry = ar.ActivityRegistry(options=["Sending Email"], aliases={})
+    size = len(registry)
+    for idx in range(100):
+        registry.activity_id(f"typed by a user {idx}")
+    assert len(registry) == size
+    registry.register(["Catalog Activity", "Sending Email", "Catalog Activity"])
+    assert len(registry) == size + 1
+
+
+def test_aliases_can_be_left_out():
+    registry = ar.ActivityRegistry(aliases={})
+    assert registry.activity_id("Conducting Video calls") != registry.activity_id("Conducting Video calls/conferencing")
+
+
+def test_flat_activities_use_their_id_or_name():
+    assert ar.flat_activity_id({"activity_id": 7, "activity_name": "Sending Email"}) == 7
+    assert ar.flat_activity_id({"activity_name": "sending email"}) == ar.activity_id("Sending Email")
@@ -0,0 +1,36 @@
+"""The batched scorer (find_highest_scorer_batched) and the lazy engine against the scalar scan on unusual scores."""
+import copy
+
+import pytest
+
+from tests.conftest import make_inputs
+from utils import requirement_calc as rc
+from utils.catalog_matrix import CatalogMatrix
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("nan_share", [3, 1])
+def test_nan_preference_scores_never_win(seed, nan_share):
+    tools_dict, def_tools_data = make_inputs(seed=seed)
+    for idx, def_tool_info in enumerate(def_tools_data.values()):
+        if idx % nan_share == 0:
+            def_tool_info["preference_score"] = float("nan")
+    catalog = CatalogMatrix(def_tools_data)
+    for user_payment in (None, [2]):
+        for _, approach in rc.APPROACHES:
+            expected = approach(copy.deepcopy(tools_dict), def_tools_data, user_payment, engine="classic")
+            for engine in rc.ENGINES:
+                output = approach(copy.deepcopy(tools_dict), def_tools_data, user_payment, catalog=catalog, engine=engine)
+                # repr, since NaN != NaN
+                assert repr(output) == repr(expected)
+
+
+def test_batched_pick_skips_nan_totals():
+    tools_dict, def_tools_data = make_inputs(seed=0)
+    flat_activities = rc.flatten_activities(tools_dict)
+    catalog = CatalogMatrix(def_tools_data)
+    winner = rc.find_highest_scorer(def_tools_data, flat_activities)["tool_name"]
+    def_tools_data[winner]["preference_score"] = float("nan")
+    expected = rc.find_highest_scorer(def_tools_data, flat_activities)
+    assert expected["tool_name"] != winner
+    assert rc.find_highest_scorer(def_tools_data, flat_activities, catalog=catalog) == expected
@@ -0,0 +1,35 @@
+"""run_beam_search against the greedy total-score run, and the stacks it completes."""
+import pytest
+
+from tests.conftest import make_inputs
+from utils import requirement_calc as rc
+from utils.catalog_matrix import CatalogMatrix, payment_methods_of
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("user_payment", [None, [2]])
+def test_beam_of_one_is_the_greedy_run(seed, user_payment):
+    tools_dict, def_tools_data = make_inputs(seed=seed)
+    catalog = CatalogMatrix(def_tools_data)
+    greedy = rc.run_total_score_prioritization(tools_dict, def_tools_data, user_payment, catalog=catalog, engine="classic")
+    assert rc.run_beam_search(tools_dict, def_tools_data, user_payment, catalog=catalog, beam_width=1, candidate_cap=1) == greedy
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_completed_stacks_are_scored_and_complete(seed):
+    tools_dict, def_tools_data = make_inputs(seed=seed)
+    catalog = CatalogMatrix(def_tools_data)
+    stacks = rc.beam_search_stacks(tools_dict, def_tools_data, [2], catalog=catalog)
+    assert stacks
+    accepted = {name for name, info in def_tools_data.items() if 2 in payment_methods_of(info)}
+    for results, score in stacks:
+        assert score == pytest.approx(rc.calculate_recommendation_score(tools_dict, results))
+        names = [result["tool_name"] for result in results]
+        assert len(set(names)) == len(names) and set(names) <= accepted
+        # No tool accepting the payment method offers an activity the stack left uncovered
+        covered = {rc.activity_id(activity) for result in results for activity in result["activities"]}
+        uncovered = {rc.flat_activity_id(a) for a in rc.flatten_activities(tools_dict)} - covered
+        for name in accepted - set(names):
+            assert not uncovered & {rc.activity_id(a["activity"]) for a in def_tools_data[name]["activities"]}
+    best = rc.run_beam_search(tools_dict, def_tools_data, [2], catalog=catalog)
+    assert best[1] == max(score for _, score in stacks)
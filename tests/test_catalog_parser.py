@@ -0,0 +1,54 @@
+"""The streaming workbook parser (utils.utils.parse_def_tools_data_from_xlsx)."""
+import openpyxl
+import pytest
+
+pytest.importorskip("streamlit")
+
+from benchmarks.synthetic import synthetic_catalog, write_catalog_xlsx
+from utils import utils
+
+
+def by_activity(catalog):
+    """The catalog with each tool's activities in a fixed order (the parser lists them in sheet row order)."""
+    return {
+        name: {**info, "activities": sorted(info["activities"], key=lambda act: (act["activity"], act["category"]))}
+        for name, info in catalog.items()
+    }
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_written_catalog_parses_back(tmp_path, seed):
+    catalog = synthetic_catalog(30, 20, seed=seed)
+    path = str(tmp_path / "catalog.xlsx")
+    write_catalog_xlsx(catalog, path)
+    parsed = utils.parse_def_tools_data_from_xlsx(path)
+    assert list(parsed) == list(catalog)
+    assert by_activity(parsed) == by_activity(catalog)
+
+
+def test_missing_and_non_finite_cells_are_skipped(tmp_path):
+    catalog = synthetic_catalog(4, 6, seed=0)
+    path = str(tmp_path / "catalog.xlsx")
+    write_catalog_xlsx(catalog, path)
+    workbook = openpyxl.load_workbook(path)
+    ratings = workbook["Tool Rating"]
+    ratings["B2"] = float("nan")  # integration
+    ratings["C2"] = float("inf")  # usability
+    ratings["D2"] = "n/a"  # cost
+    ratings["L2"] = None  # payment methods
+    workbook.save(path)
+
+    parsed = utils.parse_def_tools_data_from_xlsx(path)
+    first = parsed[next(iter(catalog))]
+    for attr in ("integration", "usability", "cost", "payment_method"):
+        assert attr not in first
+    assert first["support"] == catalog[next(iter(catalog))]["support"]
+
+
+def test_integral_floats_become_ints():
+    assert utils._xlsx_value(3.0) == 3 and isinstance(utils._xlsx_value(3.0), int)
+    assert utils._xlsx_value(3.5) == 3.5
+    assert utils._xlsx_value(float("nan")) is None
+    assert utils._xlsx_value(float("-inf")) is None
+    assert utils._xlsx_value("NA") is None
+    assert utils._xlsx_value("Tool") == "Tool"
@@ -0,0 +1,87 @@
+"""The on-disk snapshot of the parsed tool catalog (utils.utils.load_def_tools_data_from_xlsx)."""
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("streamlit")
+
+from benchmarks.synthetic import synthetic_catalog, write_catalog_xlsx
+from utils import utils
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = str(tmp_path / "catalog.xlsx")
+    write_catalog_xlsx(synthetic_catalog(12, 8, seed=0), path)
+    return path
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    calls = []
+    parse = utils.parse_def_tools_data_from_xlsx
+
+    def counting_parse(file_path):
+        calls.append(file_path)
+        return parse(file_path)
+
+    monkeypatch.setattr(utils, "parse_def_tools_data_from_xlsx", counting_parse)
+    return calls
+
+
+def test_second_load_is_served_from_the_snapshot(workbook, tmp_path, parses):
+    cache_path = str(tmp_path / "catalog.cache")
+    parsed, info = utils.load_def_tools_data_from_xlsx(workbook, cache_path, with_info=True)
+    assert info["source"] == "workbook"
+    cached, info = utils.load_def_tools_data_from_xlsx(workbook, cache_path, with_info=True)
+    assert info["source"] == "cache"
+    assert info["seconds"] >= 0
+    assert cached == parsed
+    assert len(parses) == 1
+
+
+def test_snapshot_is_rebuilt_after_the_workbook_changed(workbook, tmp_path, parses):
+    cache_path = str(tmp_path / "catalog.cache")
+    utils.load_def_tools_data_from_xlsx(workbook, cache_path)
+    changed = synthetic_catalog(14, 8, seed=1)
+    write_catalog_xlsx(changed, workbook)
+    reloaded = utils.load_def_tools_data_from_xlsx(workbook, cache_path)
+    assert len(parses) == 2
+    assert sorted(reloaded) == sorted(changed)
+
+
+def test_touched_workbook_is_not_parsed_again(workbook, tmp_path, parses):
+    cache_path = str(tmp_path / "catalog.cache")
+    parsed = utils.load_def_tools_data_from_xlsx(workbook, cache_path)
+    stat = os.stat(workbook)
+    os.utime(workbook, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert utils.load_def_tools_data_from_xlsx(workbook, cache_path) == parsed
+    assert len(parses) == 1
+
+
+def test_each_workbook_gets_its_own_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "DEF_TOOLS_CACHE_DIR", str(tmp_path))
+    first, second = str(tmp_path / "a" / "catalog.xlsx"), str(tmp_path / "b" / "catalog.xlsx")
+    for path, seed in ((first, 0), (second, 1)):
+        os.makedirs(os.path.dirname(path))
+        write_catalog_xlsx(synthetic_catalog(10, 6, seed=seed), path)
+    assert utils.def_tools_cache_path(first) != utils.def_tools_cache_path(second)
+    assert utils.load_def_tools_data_from_xlsx(first) != utils.load_def_tools_data_from_xlsx(second)
+    assert utils.load_def_tools_data_from_xlsx(first) == utils.parse_def_tools_data_from_xlsx(first)
+
+
+def test_concurrent_loads_leave_one_readable_snapshot(workbook, tmp_path):
+    cache_path = str(tmp_path / "catalog.cache")
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(utils.load_def_tools_data_from_xlsx(workbook, cache_path)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 4 and all(result == results[0] for result in results)
+    assert sorted(os.listdir(tmp_path)) == ["catalog.cache", "catalog.xlsx"]
+    assert utils.load_def_tools_data_from_xlsx(workbook, cache_path, with_info=True)[1]["source"] == "cache"
@@ -0,0 +1,56 @@
+"""run_exact_total_score against enumerating every pick order on catalogs small enough to do so."""
+import pytest
+
+from tests.conftest import make_inputs
+from utils import cover_engine
+from utils import requirement_calc as rc
+from utils.catalog_matrix import CatalogMatrix
+
+
+def brute_force_score(tools_dict, def_tools_data, catalog, user_payment):
+    """Best calculate_recommendation_score over all orders of picking tools that cover a remaining activity."""
+    engine = cover_engine.CoverEngine(def_tools_data, catalog)
+    table = engine.new_table(rc.flatten_activities(tools_dict))
+    best = 0.0
+
+    def extend(remaining, candidates, results):
+        nonlocal best
+        options = engine.touching(table, remaining) & candidates if remaining else 0
+        if not options:
+            best = max(best, rc.calculate_recommendation_score(tools_dict, results))
+            return
+        for tool_idx in cover_engine.iter_bits(options):
+            picked = list(results)
+            rest = engine.cover(engine.highest(table, remaining, tool_idx), table, remaining, picked)
+            extend(rest, candidates & ~(1 << tool_idx), picked)
+
+    extend(table.all_bits, engine.payment_candidates(user_payment), [])
+    return best
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("user_payment", [None, [2]])
+def test_exact_solver_matches_brute_force(seed, user_payment):
+    tools_dict, def_tools_data = make_inputs(
+        catalog_tools=6, activities=10, stack_tools=2, seed=seed, density=0.35, activities_per_tool=3, manual_tasks=1
+    )
+    catalog = CatalogMatrix(def_tools_data)
+    results, score, report = rc.run_exact_total_score(tools_dict, def_tools_data, user_payment, catalog=catalog, time_budget=30)
+    assert report["optimal"]
+    assert score == pytest.approx(brute_force_score(tools_dict, def_tools_data, catalog, user_payment), rel=1e-9)
+    assert score == pytest.approx(rc.calculate_recommendation_score(tools_dict, results))
+    greedy = rc.run_total_score_prioritization(tools_dict, def_tools_data, user_payment, catalog=catalog, engine="classic")
+    assert report["greedy_score"] == pytest.approx(greedy[1])
+    assert score >= greedy[1] - 1e-12
+
+
+def test_exhausted_budget_returns_the_greedy_stack_with_its_gap():
+    tools_dict, def_tools_data = make_inputs(seed=0)
+    catalog = CatalogMatrix(def_tools_data)
+    results, score, report = rc.run_exact_total_score(tools_dict, def_tools_data, catalog=catalog, time_budget=0)
+    greedy = rc.run_total_score_prioritization(tools_dict, def_tools_data, catalog=catalog, engine="classic")
+    assert report["timed_out"] and not report["optimal"]
+    assert score == pytest.approx(greedy[1]) and report["improvement"] == pytest.approx(0.0)
+    assert report["gap"] == pytest.approx(report["upper_bound"] - score)
+    assert report["gap"] >= 0
+    assert score == pytest.approx(rc.calculate_recommendation_score(tools_dict, results))
@@ -0,0 +1,25 @@
+"""The executors of run_all_approaches."""
+import pytest
+
+from tests.conftest import make_inputs
+from utils import requirement_calc as rc
+from utils.catalog_matrix import CatalogMatrix
+from utils.score_memo import ScoreMemo
+
+
+@pytest.mark.parametrize("engine", rc.ENGINES)
+def test_thread_executor_matches_sequential(engine):
+    tools_dict, def_tools_data = make_inputs(seed=2)
+    catalog = CatalogMatrix(def_tools_data)
+    for user_payment in ([1], [2], None):
+        sequential = rc.run_all_approaches(tools_dict, def_tools_data, user_payment, catalog=catalog, engine=engine, executor="sequential")
+        threaded = rc.run_all_approaches(
+            tools_dict, def_tools_data, user_payment, catalog=catalog, engine=engine, memo=ScoreMemo(), executor="thread"
+        )
+        assert threaded == sequential
+
+
+def test_unknown_executor_is_rejected():
+    tools_dict, def_tools_data = make_inputs(seed=2)
+    with pytest.raises(ValueError):
+        rc.run_all_approaches(tools_dict, def_tools_data, executor="process")
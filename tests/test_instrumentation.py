@@ -0,0 +1,72 @@
+"""Engine counters and timings (utils.instrumentation): collection, isolation between contexts and threads."""
+import contextvars
+import threading
+
+from tests.conftest import make_inputs
+from utils import instrumentation
+from utils import requirement_calc as rc
+from utils.catalog_matrix import CatalogMatrix
+
+
+def test_nothing_is_collected_while_profiling_is_off():
+    tools_dict, def_tools_data = make_inputs(seed=0)
+    assert instrumentation.active_profile() is None
+    with instrumentation.timed("block"):
+        rc.run_all_approaches(tools_dict, def_tools_data, [2])
+    assert instrumentation.active_profile() is None
+
+
+def test_profile_counts_the_engine_work():
+    tools_dict, def_tools_data = make_inputs(seed=1)
+    with instrumentation.profiling() as profile:
+        rc.run_all_approaches(tools_dict, def_tools_data, [2], catalog=CatalogMatrix(def_tools_data), executor="sequential")
+    assert instrumentation.active_profile() is None
+    for counter in ("find_highest_scorer", "tools_scored", "picks"):
+        assert profile.counters[counter] > 0
+    for title, _ in rc.APPROACHES:
+        calls, seconds = profile.timings[title]
+        assert calls == 1 and seconds > 0
+    assert profile.timings["cover_calcs"][0] == profile.counters["picks"]
+
+
+def test_thread_executor_reports_into_the_callers_profile():
+    tools_dict, def_tools_data = make_inputs(seed=2)
+    catalog = CatalogMatrix(def_tools_data)
+    with instrumentation.profiling() as sequential:
+        rc.run_all_approaches(tools_dict, def_tools_data, [2], catalog=catalog, executor="sequential")
+    with instrumentation.profiling() as threaded:
+        rc.run_all_approaches(tools_dict, def_tools_data, [2], catalog=catalog, executor="thread")
+    assert threaded.counters == sequential.counters
+    assert set(threaded.timings) == set(sequential.timings)
+
+
+def test_sessions_profile_apart():
+    tools_dict, def_tools_data = make_inputs(seed=3)
+    profiles = {}
+    barrier = threading.Barrier(2)
+
+    def session(name, profiled):
+        profile = instrumentation.start_profiling() if profiled else None
+        barrier.wait()
+        rc.run_total_score_prioritization(tools_dict, def_tools_data, [2], engine="classic")
+        profiles[name] = (profile, instrumentation.active_profile())
+
+    threads = [threading.Thread(target=session, args=(name, name == "profiled")) for name in ("profiled", "other")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    profile, active = profiles["profiled"]
+    assert active is profile and profile.counters["picks"] > 0
+    assert profiles["other"] == (None, None)
+    # Work handed to a thread without the caller's context reports nowhere, with it into the caller's profile
+    with instrumentation.profiling() as caller:
+        worker = threading.Thread(target=rc.run_total_score_prioritization, args=(tools_dict, def_tools_data, [2]))
+        worker.start()
+        worker.join()
+        assert caller.counters == {}
+        context = contextvars.copy_context()
+        worker = threading.Thread(target=context.run, args=(rc.run_total_score_prioritization, tools_dict, def_tools_data, [2]))
+        worker.start()
+        worker.join()
+    assert caller.counters["picks"] == profile.counters["picks"]
@@ -0,0 +1,58 @@
+"""The option codecs against the if/elif mappings they replaced."""
+import pytest
+
+from utils import requirement_calc as rc
+from utils.activity_registry import activity_id
+from utils.option_codecs import AI_LEVEL, AUTOMATION, NEED_FOR_CHANGE, PAYMENT_METHOD, SYNCHRONIZATION, ActivityCodes
+
+# option -> score of the former get_*_score functions; anything else scored 0
+SCORES = {
+    "automation": (AUTOMATION, {"Manual": 0, "Automated": 1, "AI-Asisted": 2, "AI-Driven Automation": 3}),
+    "ai_level": (AI_LEVEL, {"No": 1, "Descriptive": 2, "Diagnostic": 3, "Predictive": 4, "Prescriptive": 5}),
+    "sync": (SYNCHRONIZATION, {"Ad-Hoc File Sharing": 1, "Planned Batch Exchange": 2, "Standardized Data Interfaces": 3,
+                               "Real-Time Ecosystem Integration": 4}),
+    "nfc": (NEED_FOR_CHANGE, {"No need to change": 1, "Nice to change": 2, "Must change": 3}),
+}
+
+
+@pytest.mark.parametrize("name", SCORES)
+def test_codes_match_the_former_scores(name):
+    codec, scores = SCORES[name]
+    for option, score in scores.items():
+        assert codec.encode(option) == score
+        assert codec.decode(score) == option
+    for value in ("", "automated", None, 3, ["Manual"]):
+        assert codec.encode(value) == 0
+    assert codec.decode(99) == "Unknown"
+    assert codec.decode([1]) == "Unknown"
+
+
+def test_module_functions_use_the_codecs():
+    assert rc.get_ai_score("Predictive") == 4
+    assert rc.ai_score_to_str(0) == "Unknown"
+    assert rc.automation_score_to_str(3) == "AI-Driven Automation"
+    assert rc.sync_score_to_str(2) == "Planned Batch Exchange"
+    assert rc.get_nfc_score("Must change") == 3
+    assert rc.get_payment_method_score(["Pay-Per-Use", "Licensed", "Barter"]) == [3, 1]
+    assert rc.get_payment_method_score([]) == [0]
+    assert PAYMENT_METHOD.encode("Subscription-based") == 2
+
+
+def test_activity_codes_apply_the_row_defaults():
+    rows = [
+        {"category": " Sending Email ", "digitalization": "AI-Asisted", "aiLevel": "Diagnostic",
+         "synchronization": "Planned Batch Exchange", "needForChange": "Must change", "isManual": True},
+        {"category": "Data analysis"},
+        {"category": "Brainstorming Ideas", "nfc_score": 2, "needForChange": "Must change"},
+        "not a row",
+    ]
+    codes = ActivityCodes(rows)
+    assert len(codes) == 3
+    assert list(codes) == [
+        ("sending email", activity_id("Sending Email"), 2, 3, 2, 3, 1),
+        # flatten_activities' defaults: Automated, No, Ad-Hoc File Sharing, No need to change
+        ("data analysis", activity_id("Data analysis"), 1, 1, 1, 1, 0),
+        # A stored nfc_score wins over needForChange
+        ("brainstorming ideas", activity_id("Brainstorming Ideas"), 1, 1, 1, 2, 0),
+    ]
+    assert all(isinstance(value, int) for row in codes for value in row[1:])
@@ -0,0 +1,59 @@
+"""pareto_front and run_pareto_frontier against pairwise dominance checks."""
+import random
+
+import pytest
+
+from tests.conftest import make_inputs
+from utils import requirement_calc as rc
+from utils.catalog_matrix import CatalogMatrix
+from utils.pareto import pareto_front
+
+
+def dominates(a, b):
+    """a is at least as good as b in coverage, cost rating and tool count, and better in one of them."""
+    at_least = a[0] >= b[0] and a[1] >= b[1] and a[2] <= b[2]
+    return at_least and a != b
+
+
+def brute_force_front(points):
+    return {
+        idx for idx, point in enumerate(points)
+        if not any(dominates(other, point) for other in points) and point not in points[:idx]
+    }
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_pareto_front_matches_pairwise_dominance(seed):
+    rnd = random.Random(seed)
+    # Few distinct values, so ties and equal points are common
+    points = [(rnd.randint(0, 4) / 4, rnd.choice((3.5, 4.0, 4.5)), rnd.randint(1, 4)) for _ in range(rnd.randint(0, 40))]
+    front = pareto_front(points)
+    assert set(front) == brute_force_front(points)
+    assert [points[idx][0] for idx in front] == sorted((points[idx][0] for idx in front), reverse=True)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_pareto_frontier_has_no_dominated_stack(seed):
+    tools_dict, def_tools_data = make_inputs(seed=seed)
+    frontier = rc.run_pareto_frontier(tools_dict, def_tools_data, [2], catalog=CatalogMatrix(def_tools_data))
+    assert frontier
+    points = [(stack["coverage"], stack["cost"], stack["tool_count"]) for stack in frontier]
+    for point in points:
+        assert not any(dominates(other, point) for other in points)
+    for stack in frontier:
+        assert stack["tool_count"] == len(stack["results"])
+        assert stack["score"] == pytest.approx(rc.calculate_recommendation_score(tools_dict, stack["results"]))
+
+
+def test_frontier_is_coverage_first_and_holds_the_best_covering_stack():
+    tools_dict, def_tools_data = make_inputs(seed=3)
+    catalog = CatalogMatrix(def_tools_data)
+    frontier = rc.run_pareto_frontier(tools_dict, def_tools_data, None, catalog=catalog)
+    coverages = [stack["coverage"] for stack in frontier]
+    assert coverages == sorted(coverages, reverse=True)
+    # A greedy stack covers every activity some catalog tool offers; nothing on the frontier covers more
+    greedy = rc.run_total_score_prioritization(tools_dict, def_tools_data, catalog=catalog, engine="classic")
+    covered = {activity for result in greedy[0] for activity in result["activities"]}
+    assert coverages[0] >= len(covered) / rc.find_number_of_unique_activities(tools_dict) - 1e-12
+    assert rc.run_pareto_frontier({}, def_tools_data) == []
+    assert pareto_front([]) == []
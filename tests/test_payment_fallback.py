@@ -0,0 +1,42 @@
+"""run_approach's unfiltered fallback against a plain second run on the whole catalog."""
+import pytest
+
+from tests.conftest import make_inputs
+from utils import instrumentation
+from utils import requirement_calc as rc
+from utils.catalog_matrix import CatalogMatrix
+from utils.score_memo import ScoreMemo
+
+
+@pytest.mark.parametrize("engine", rc.ENGINES)
+def test_fallback_matches_a_second_run(engine):
+    shared = 0
+    for seed in range(4):
+        tools_dict, def_tools_data = make_inputs(catalog_tools=150, density=0.06, seed=seed)
+        catalog = CatalogMatrix(def_tools_data)
+        for user_payment in ([1], [2], [3], [2, 3]):
+            for title, approach in rc.APPROACHES:
+                filtered = approach(tools_dict, def_tools_data, user_payment, engine="classic")
+                unfiltered = approach(tools_dict, def_tools_data, engine="classic")
+                expected = rc._approach_outcome(title, tools_dict, user_payment, filtered, unfiltered)
+                with instrumentation.profiling() as profile:
+                    outcome = rc.run_approach(title, tools_dict, def_tools_data, user_payment, catalog=catalog, engine=engine)
+                assert outcome == expected
+                shared += profile.counters.get("fallback_steps_shared", 0)
+    # The classic engine re-takes the decisions both runs share
+    assert shared > 0 if engine == "classic" else shared == 0
+
+
+def test_shared_decisions_stop_where_an_excluded_tool_could_win():
+    tools_dict, def_tools_data = make_inputs(catalog_tools=150, density=0.06, seed=1)
+    catalog = CatalogMatrix(def_tools_data)
+    for _, approach in rc.APPROACHES:
+        steps = rc.PaymentFallbackSteps(ScoreMemo())
+        approach(tools_dict, def_tools_data, [3], catalog=catalog, memo=steps.memo, steps=steps)
+        shared = steps.start_fallback(def_tools_data, [3], catalog)
+        unfiltered = approach(tools_dict, def_tools_data, catalog=catalog, memo=steps.memo, steps=steps)
+        # The re-taken decisions are the leading decisions of the unfiltered run
+        fresh = approach(tools_dict, def_tools_data, catalog=catalog)
+        assert unfiltered == fresh
+        taken = [highest["tool_name"] for highest, _ in steps.decisions[:shared] if highest]
+        assert [result["tool_name"] for result in fresh[0][:len(taken)]] == taken
@@ -0,0 +1,26 @@
+"""The payment scenario sweep against separate runs per scenario."""
+import pytest
+
+from tests.conftest import make_inputs
+from utils import requirement_calc as rc
+from utils.catalog_matrix import CatalogMatrix
+from utils.score_memo import ScoreMemo
+
+
+@pytest.mark.parametrize("engine", rc.ENGINES)
+def test_payment_sweep_matches_separate_runs(engine):
+    tools_dict, def_tools_data = make_inputs(seed=1)
+    catalog = CatalogMatrix(def_tools_data)
+    scenarios = rc.payment_scenarios()
+    sweep = rc.run_payment_sweep(tools_dict, def_tools_data, scenarios, catalog=catalog, engine=engine)
+    assert list(sweep) == scenarios
+    for scenario in scenarios:
+        assert sweep[scenario] == rc.run_all_approaches(tools_dict, def_tools_data, list(scenario), catalog=catalog, engine=engine)
+
+
+def test_background_sweep_matches_the_sweep():
+    tools_dict, def_tools_data = make_inputs(seed=1)
+    catalog = CatalogMatrix(def_tools_data)
+    scenarios = rc.payment_scenarios()[1:]
+    future = rc.submit_payment_sweep(tools_dict, def_tools_data, scenarios, catalog=catalog, memo=ScoreMemo())
+    assert future.result(timeout=60) == rc.run_payment_sweep(tools_dict, def_tools_data, scenarios, catalog=catalog)
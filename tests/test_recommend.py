@@ -0,0 +1,66 @@
+"""recommendation_engine.recommend against the engine run of the Design Recommendation page."""
+import subprocess
+import sys
+
+import pytest
+
+from recommendation_engine import ActivityRequirement, Catalog, Preferences, StackTool, recommend
+from tests.conftest import WEIGHTS, make_inputs
+from utils import requirement_calc as rc
+from utils.catalog_matrix import CatalogMatrix
+
+
+def stack_of(tools_dict):
+    return [
+        StackTool(
+            tool_id,
+            info["tool_name"],
+            tuple(
+                ActivityRequirement(
+                    row["category"], row["digitalization"], row["aiLevel"], row["synchronization"], row["needForChange"],
+                    bool(row.get("isManual")),
+                )
+                for row in info["activities"]
+            ),
+        )
+        for tool_id, info in tools_dict.items()
+    ]
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("payment_methods", [(), (2,)])
+def test_recommend_matches_run_all_approaches(seed, payment_methods):
+    tools_dict, def_tools_data = make_inputs(seed=seed)
+    expected = rc.run_all_approaches(
+        tools_dict, def_tools_data, list(payment_methods), catalog=CatalogMatrix(def_tools_data), engine="classic"
+    )
+    catalog = Catalog.from_def_tools_data(def_tools_data)
+    recommendations = recommend(stack_of(tools_dict), catalog, Preferences(*WEIGHTS, payment_methods=payment_methods))
+    assert [recommendation.approach for recommendation in recommendations] == [title for title, _ in rc.APPROACHES]
+    for recommendation, (_, results, score, payment_flag) in zip(recommendations, expected):
+        assert recommendation.score == pytest.approx(score)
+        assert [tool.name for tool in recommendation.tools] == [result["tool_name"] for result in results]
+        assert [tool.total_score for tool in recommendation.tools] == pytest.approx([result["total_score"] for result in results])
+        assert recommendation.payment_fallback == (bool(payment_methods) and not payment_flag)
+
+
+def test_catalog_serves_requests_with_other_weights():
+    tools_dict, def_tools_data = make_inputs(seed=4)
+    catalog = Catalog.from_def_tools_data(def_tools_data)
+    stack = stack_of(tools_dict)
+    first = recommend(stack, catalog, Preferences(*WEIGHTS))
+    recommend(stack, catalog, Preferences(5, 1, 1, 1))
+    assert recommend(stack, catalog, Preferences(*WEIGHTS)) == first
+
+
+def test_first_recommendation_loads_no_ui_or_data_modules():
+    code = "\n".join((
+        "import sys",
+        "from recommendation_engine import ActivityRequirement, CatalogTool, Preferences, StackTool, recommend",
+        "catalog = [CatalogTool('Chat', ('Text chatting',), 2, 1, 2, 4, 4, 3, 4, 4, (2,))]",
+        "stack = [StackTool('t1', 'Old chat', (ActivityRequirement('Text chatting', need_for_change='Must change'),))]",
+        "assert recommend(stack, catalog, Preferences(3, 4, 2, 5))[0].tools[0].name == 'Chat'",
+        "print(' '.join(m for m in ('streamlit', 'pandas', 'openpyxl', 'utils.utils') if m in sys.modules))",
+    ))
+    loaded = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split()
+    assert loaded == []
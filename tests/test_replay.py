@@ -0,0 +1,72 @@
+"""Recording sessions into a replay corpus and re-running them (utils.replay)."""
+import json
+import os
+
+from tests.conftest import WEIGHTS, make_inputs
+from utils import replay
+from utils import requirement_calc as rc
+from utils.catalog_matrix import CatalogMatrix
+
+
+def recorded(tmp_path, seed=0, user_payment=(2,)):
+    tools_dict, def_tools_data = make_inputs(seed=seed)
+    catalog = CatalogMatrix(def_tools_data)
+    outcomes = rc.run_all_approaches(tools_dict, def_tools_data, list(user_payment), catalog=catalog)
+    path = replay.record_session(str(tmp_path), tools_dict, def_tools_data, WEIGHTS, user_payment, outcomes)
+    return path, tools_dict, def_tools_data, catalog
+
+
+def test_replayed_capture_gives_the_recorded_recommendations(tmp_path):
+    path, _, def_tools_data, catalog = recorded(tmp_path)
+    [(corpus_path, capture)] = list(replay.load_corpus(str(tmp_path)))
+    assert corpus_path == path
+    assert capture["catalog_hash"] == replay.catalog_hash(def_tools_data)
+    tools_dict, weights, user_payment = replay.session_inputs(capture)
+    assert weights == WEIGHTS and user_payment == [2]
+    rc.assign_preference_scores(def_tools_data, *weights, catalog=catalog)
+    outcomes = rc.run_all_approaches(tools_dict, def_tools_data, user_payment, catalog=catalog)
+    assert replay.diff_outcomes(capture["outcomes"], replay.summarize_outcomes(outcomes)) == []
+
+
+def test_capture_is_anonymized_and_stored_once(tmp_path):
+    tools_dict, def_tools_data = make_inputs(seed=0)
+    # Names and IDs as a user's stack has them
+    tools_dict = {
+        f"acme-{number}": {**info, "tool_name": f"ACME Tracker {number}"} for number, info in enumerate(tools_dict.values())
+    }
+    outcomes = rc.run_all_approaches(tools_dict, def_tools_data, [2])
+    path = replay.record_session(str(tmp_path), tools_dict, def_tools_data, WEIGHTS, (2,), outcomes)
+    assert replay.record_session(str(tmp_path), tools_dict, def_tools_data, WEIGHTS, (2,), outcomes) == path
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+    with open(path, encoding="utf-8") as f:
+        body = f.read()
+    assert "acme-" not in body and "ACME Tracker" not in body and "Current Tool" not in body
+    offered = {replay.activity_id(a["activity"]) for info in def_tools_data.values() for a in info["activities"]}
+    for row in json.loads(body)["re_details"]:
+        category = row.get("category")
+        if isinstance(category, str) and category.strip():
+            assert replay.activity_id(category) in offered or category.startswith("Unlisted activity ")
+
+
+def test_catalog_hash_leaves_out_the_preference_scores():
+    _, def_tools_data = make_inputs(seed=1)
+    key = replay.catalog_hash(def_tools_data)
+    rc.assign_preference_scores(def_tools_data, 5, 1, 1, 1)
+    assert replay.catalog_hash(def_tools_data) == key
+    next(iter(def_tools_data.values()))["cost"] = 1.5
+    assert replay.catalog_hash(def_tools_data) != key
+
+
+def test_diff_outcomes_reports_changed_stacks():
+    before = [{"approach": "A", "tools": ["Tool 1"], "score": 61.0, "payment_flag": True}]
+    after = [{"approach": "A", "tools": ["Tool 2"], "score": 62.0, "payment_flag": False}]
+    assert replay.diff_outcomes(before, before) == []
+    assert len(replay.diff_outcomes(before, after)) == 3
+
+
+def test_unwritable_record_dir_is_skipped(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    tools_dict, def_tools_data = make_inputs(seed=2)
+    outcomes = rc.run_all_approaches(tools_dict, def_tools_data, [2])
+    assert replay.record_session(str(blocker / "corpus"), tools_dict, def_tools_data, WEIGHTS, (2,), outcomes) is None
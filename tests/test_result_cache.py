@@ -0,0 +1,86 @@
+"""The recommendation result cache (utils.result_cache): keys, the in-memory LRU and the disk tier."""
+import json
+import os
+import pickle
+
+import pytest
+
+from tests.conftest import WEIGHTS, make_inputs
+from utils import requirement_calc as rc
+from utils.result_cache import ResultCache, from_json, result_key, to_json
+
+
+@pytest.fixture
+def outcomes():
+    tools_dict, def_tools_data = make_inputs(seed=0)
+    return rc.run_all_approaches(tools_dict, def_tools_data, [2])
+
+
+def test_result_key_follows_every_input():
+    tools_dict, def_tools_data = make_inputs(seed=1)
+    key = result_key(tools_dict, WEIGHTS, [(2,)], def_tools_data, "classic")
+    assert result_key(tools_dict, WEIGHTS, [(2,)], def_tools_data, "classic") == key
+    assert result_key(tools_dict, (5, 1, 1, 1), [(2,)], def_tools_data, "classic") != key
+    assert result_key(tools_dict, WEIGHTS, [(1, 2)], def_tools_data, "classic") != key
+    assert result_key(tools_dict, WEIGHTS, [(2,)], def_tools_data, "lazy") != key
+    next(iter(tools_dict.values()))["activities"][0]["needForChange"] = "Must change"
+    assert result_key(tools_dict, WEIGHTS, [(2,)], def_tools_data, "classic") != key
+
+
+def test_memory_tier_is_a_bounded_lru():
+    cache = ResultCache(maxsize=2)
+    cache.put("a", [1])
+    cache.put("b", [2])
+    assert cache.get("a") == [1]
+    cache.put("c", [3])
+    assert cache.get("b") is None
+    assert cache.get("a") == [1] and cache.get("c") == [3]
+    assert cache.info()["hits"] == 3 and cache.info()["misses"] == 1 and len(cache) == 2
+
+
+def test_results_round_trip_through_json(outcomes):
+    sweep = {(2,): outcomes, (1, 3): [("A", [], 0.0, False)]}
+    for value in (outcomes, sweep):
+        restored = from_json(json.loads(json.dumps(to_json(value))))
+        assert restored == value
+    assert isinstance(from_json(json.loads(json.dumps(to_json(outcomes))))[0], tuple)
+    with pytest.raises(TypeError):
+        to_json({"set": {1}})
+
+
+def test_disk_tier_serves_other_processes(tmp_path, outcomes):
+    directory = str(tmp_path / "cache")
+    ResultCache(directory=directory).put("key", outcomes)
+    assert (os.stat(directory).st_mode & 0o777) == 0o700
+    restarted = ResultCache(directory=directory)
+    assert restarted.get("key") == outcomes
+    assert restarted.info()["disk_hits"] == 1
+    assert restarted.get("key") == outcomes and restarted.info()["hits"] == 1
+
+
+def test_disk_tier_keeps_disk_entries_files(tmp_path):
+    cache = ResultCache(directory=str(tmp_path), disk_entries=3)
+    for idx in range(5):
+        cache.put(f"key{idx}", [idx])
+    assert len(os.listdir(tmp_path)) == 3
+
+
+class Payload:
+    def __reduce__(self):
+        return (open, (os.environ["RESULT_CACHE_MARKER"], "w"))
+
+
+def test_planted_files_are_not_executed(tmp_path, monkeypatch):
+    marker = tmp_path / "marker"
+    monkeypatch.setenv("RESULT_CACHE_MARKER", str(marker))
+    directory = tmp_path / "cache"
+    directory.mkdir()
+    for name in ("planted.json", "planted.pickle"):
+        (directory / name).write_bytes(pickle.dumps(Payload()))
+    (directory / "broken.json").write_text('{"items": [[["not", "hashable"], 1]]}')
+    cache = ResultCache(directory=str(directory))
+    assert cache.get("planted") is None and cache.get("broken") is None
+    assert not marker.exists()
+    # Skipped the same way: a result that isn't plain data stays in memory only
+    cache.put("object", [Payload()])
+    assert not (directory / "object.json").exists()
@@ -0,0 +1,29 @@
+"""Reruns after a change of the preference weights only, with the score memo of the run before."""
+import pytest
+
+from tests.conftest import make_inputs
+from utils import requirement_calc as rc
+from utils.catalog_matrix import CatalogMatrix
+from utils.score_memo import ScoreMemo
+
+
+@pytest.mark.parametrize("engine", rc.ENGINES)
+def test_warm_memo_rerun_matches_fresh_after_reweight(engine):
+    tools_dict, def_tools_data = make_inputs(seed=3)
+    catalog = CatalogMatrix(def_tools_data)
+    memo = ScoreMemo()
+    rc.run_payment_sweep(tools_dict, def_tools_data, catalog=catalog, engine=engine, memo=memo)
+    rc.assign_preference_scores(def_tools_data, 3, 5, 2, 4, catalog=catalog)
+    hits = memo.hits
+    warm = rc.run_payment_sweep(tools_dict, def_tools_data, catalog=catalog, engine=engine, memo=memo)
+    assert memo.hits > hits
+    assert warm == rc.run_payment_sweep(tools_dict, def_tools_data, catalog=catalog, engine=engine)
+
+
+def test_reweight_matches_the_scalar_preference_scores():
+    tools_dict, def_tools_data = make_inputs(seed=2)
+    catalog = CatalogMatrix(def_tools_data)
+    rc.assign_preference_scores(def_tools_data, 1, 5, 3, 2, catalog=catalog)
+    vectorized = {name: info["preference_score"] for name, info in def_tools_data.items()}
+    rc.assign_preference_scores(def_tools_data, 1, 5, 3, 2)
+    assert vectorized == pytest.approx({name: info["preference_score"] for name, info in def_tools_data.items()})
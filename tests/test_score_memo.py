@@ -0,0 +1,75 @@
+"""ScoreMemo tokens and bounds, and runs sharing a memo."""
+import numpy as np
+import pytest
+
+from tests.conftest import make_inputs
+from utils import requirement_calc as rc
+from utils.catalog_matrix import CatalogMatrix
+from utils.score_memo import CATALOG_SCORES, ScoreMemo
+
+
+@pytest.mark.parametrize("batched", [False, True])
+def test_shared_memo_matches_unmemoized_runs(batched):
+    tools_dict, def_tools_data = make_inputs(seed=6)
+    catalog = CatalogMatrix(def_tools_data) if batched else None
+    memo = ScoreMemo()
+    for user_payment in ([2], [1, 3], None):
+        expected = rc.run_all_approaches(tools_dict, def_tools_data, user_payment, catalog=catalog, engine="classic")
+        assert rc.run_all_approaches(tools_dict, def_tools_data, user_payment, catalog=catalog, engine="classic", memo=memo) == expected
+    # The approaches and the payment selections score the same tools against the same requirements
+    assert memo.hits > 0
+
+
+def test_tokens_are_not_reused_after_clear():
+    memo = ScoreMemo()
+    first = memo.token(("a",))
+    memo.put("Tool 0", first, (0.5, 0.5))
+    memo.clear()
+    second = memo.token(("b",))
+    assert second != first
+    assert memo.get("Tool 0", second) is None
+    # The key seen before the reset gets a new token too, and no scores with it
+    again = memo.token(("a",))
+    assert again not in (first, second)
+    assert memo.get("Tool 0", again) is None
+
+
+def test_tokens_are_not_reused_after_eviction():
+    memo = ScoreMemo(max_tokens=2)
+    tokens = [memo.token((key,)) for key in "abc"]
+    memo.put("Tool 0", tokens[0], (0.1, 0.2))
+    assert len(set(tokens)) == 3
+    assert memo.info()["tokens"] == 2
+    # "a" was forgotten: it must not get its old token back or the scores stored under it
+    token = memo.token(("a",))
+    assert token not in tokens
+    assert memo.get("Tool 0", token) is None
+
+
+def test_equal_keys_share_a_token():
+    memo = ScoreMemo()
+    assert memo.token(("a", 1)) == memo.token(("a", 1))
+
+
+def test_catalog_score_arrays_are_bounded_by_bytes():
+    memo = ScoreMemo(max_array_bytes=2000)
+    arrays = (np.zeros(100), np.zeros(100))  # 1600 bytes
+    memo.put(CATALOG_SCORES, 0, arrays)
+    memo.put(CATALOG_SCORES, 1, arrays)
+    assert memo.get(CATALOG_SCORES, 0) is None
+    assert memo.get(CATALOG_SCORES, 1) is arrays
+    assert memo.info()["array_bytes"] == 1600
+    # Arrays larger than the whole budget are not kept
+    memo.put(CATALOG_SCORES, 2, (np.zeros(300),))
+    assert memo.get(CATALOG_SCORES, 2) is None
+    assert memo.info()["array_bytes"] <= 2000
+
+
+def test_pairs_are_bounded_by_maxsize():
+    memo = ScoreMemo(maxsize=2)
+    token = memo.token(("a",))
+    for tool_idx in range(3):
+        memo.put(f"Tool {tool_idx}", token, (0.1, 0.1))
+    assert memo.get("Tool 0", token) is None
+    assert memo.get("Tool 2", token) == (0.1, 0.1)
+    assert memo.info()["size"] == 2
@@ -0,0 +1,90 @@
+"""Reruns after an edit of the tool stack, with the score memo and step log of the runs before."""
+import copy
+
+import pytest
+
+from tests.conftest import make_inputs
+from utils import instrumentation
+from utils import requirement_calc as rc
+from utils.catalog_matrix import CatalogMatrix
+from utils.score_memo import ScoreMemo
+
+EDITS = ({"needForChange": "Must change"}, {"digitalization": "AI-Driven Automation"}, {"synchronization": "Manual"})
+
+
+def edited(tools_dict, changes):
+    """tools_dict with changes applied to the first row of a non-manual tool, rebuilt as pages/requirement.py loads it."""
+    tools_dict = copy.deepcopy(tools_dict)
+    tool_id = next(tool_id for tool_id, info in tools_dict.items() if not info["activities"][0].get("isManual"))
+    row = tools_dict[tool_id]["activities"][0]
+    row.update(changes)
+    row.pop("nfc_score", None)
+    tools_dict[tool_id]["prio_score"] = rc.tool_priorizitation(tools_dict[tool_id]["activities"])
+    return tools_dict
+
+
+@pytest.mark.parametrize("engine", rc.ENGINES)
+def test_warm_memo_rerun_matches_fresh_after_edit(engine):
+    tools_dict, def_tools_data = make_inputs(seed=4)
+    catalog = CatalogMatrix(def_tools_data)
+    memo = ScoreMemo()
+    rc.run_payment_sweep(tools_dict, def_tools_data, catalog=catalog, engine=engine, memo=memo)
+    for changes in EDITS:
+        tools_dict = edited(tools_dict, changes)
+        warm = rc.run_payment_sweep(tools_dict, def_tools_data, catalog=catalog, engine=engine, memo=memo)
+        assert warm == rc.run_payment_sweep(tools_dict, def_tools_data, catalog=catalog, engine=engine)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_logged_sweep_matches_fresh_after_edit(seed):
+    tools_dict, def_tools_data = make_inputs(seed=seed)
+    catalog = CatalogMatrix(def_tools_data)
+    memo = ScoreMemo()
+    step_log = rc.StepLog(memo)
+    rc.run_payment_sweep(tools_dict, def_tools_data, catalog=catalog, memo=memo, step_log=step_log)
+    for changes in EDITS:
+        tools_dict = edited(tools_dict, changes)
+        with instrumentation.profiling() as profile:
+            logged = rc.run_payment_sweep(tools_dict, def_tools_data, catalog=catalog, memo=memo, step_log=step_log)
+        assert logged == rc.run_payment_sweep(tools_dict, def_tools_data, catalog=catalog)
+        # The steps before the edited activity comes in are taken over
+        assert profile.counters.get("steps_replayed", 0) > 0
+
+
+@pytest.mark.parametrize("user_payment", [[2], [1, 3]])
+def test_logged_approaches_match_fresh_after_edit(user_payment):
+    tools_dict, def_tools_data = make_inputs(seed=5)
+    catalog = CatalogMatrix(def_tools_data)
+    memo = ScoreMemo()
+    step_log = rc.StepLog(memo)
+    rc.run_all_approaches(tools_dict, def_tools_data, user_payment, catalog=catalog, memo=memo, step_log=step_log)
+    for changes in EDITS:
+        tools_dict = edited(tools_dict, changes)
+        logged = rc.run_all_approaches(tools_dict, def_tools_data, user_payment, catalog=catalog, memo=memo, step_log=step_log)
+        assert logged == rc.run_all_approaches(tools_dict, def_tools_data, user_payment, catalog=catalog)
+
+
+def test_unchanged_rerun_replays_every_step():
+    tools_dict, def_tools_data = make_inputs(seed=1)
+    catalog = CatalogMatrix(def_tools_data)
+    step_log = rc.StepLog(ScoreMemo())
+    with instrumentation.profiling() as first:
+        fresh = rc.run_payment_sweep(tools_dict, def_tools_data, [(2,)], catalog=catalog, step_log=step_log)
+    with instrumentation.profiling() as again:
+        assert rc.run_payment_sweep(tools_dict, def_tools_data, [(2,)], catalog=catalog, step_log=step_log) == fresh
+    assert "steps_replayed" not in first.counters
+    # Every decision is taken over, nothing is scored
+    assert again.counters["steps_replayed"] >= again.counters["picks"]
+    assert "find_highest_scorer" not in again.counters
+
+
+def test_reweighted_runs_are_not_replayed():
+    tools_dict, def_tools_data = make_inputs(seed=2)
+    catalog = CatalogMatrix(def_tools_data)
+    step_log = rc.StepLog(ScoreMemo())
+    rc.run_payment_sweep(tools_dict, def_tools_data, [(2,)], catalog=catalog, step_log=step_log)
+    rc.assign_preference_scores(def_tools_data, 1, 5, 3, 2, catalog=catalog)
+    with instrumentation.profiling() as profile:
+        logged = rc.run_payment_sweep(tools_dict, def_tools_data, [(2,)], catalog=catalog, step_log=step_log)
+    assert logged == rc.run_payment_sweep(tools_dict, def_tools_data, [(2,)], catalog=catalog)
+    assert "steps_replayed" not in profile.counters
@@ -0,0 +1,48 @@
+"""The top_k stacks of the approaches and the decisions cover_engine replays for their branches."""
+from collections import deque
+
+import pytest
+
+from tests.conftest import make_inputs
+from utils import cover_engine
+from utils import requirement_calc as rc
+from utils.catalog_matrix import CatalogMatrix
+
+
+def test_replayed_decisions_reproduce_the_run_without_scoring():
+    tools_dict, def_tools_data = make_inputs(seed=5)
+    engine = cover_engine.CoverEngine(def_tools_data, CatalogMatrix(def_tools_data))
+    candidates = engine.payment_candidates([2])
+    for approach in cover_engine.APPROACHES.values():
+        engine.decisions = []
+        fresh = approach(engine, tools_dict, candidates)
+        decisions, engine.decisions = engine.decisions, []
+        engine.replay = deque(decisions)
+        scored = engine.stats["tools_scored"]
+        assert approach(engine, tools_dict, candidates) == fresh
+        assert not engine.replay
+        assert engine.stats["tools_scored"] == scored
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_top_k_holds_the_greedy_stack(seed):
+    tools_dict, def_tools_data = make_inputs(seed=seed)
+    catalog = CatalogMatrix(def_tools_data)
+    for _, approach in rc.APPROACHES:
+        greedy = approach(tools_dict, def_tools_data, [2], catalog=catalog, engine="classic")
+        outputs = approach(tools_dict, def_tools_data, [2], catalog=catalog, top_k=4)
+        assert greedy in outputs
+        assert [output[1] for output in outputs] == sorted((output[1] for output in outputs), reverse=True)
+        stacks = [frozenset(result["tool_name"] for result in output[0]) for output in outputs]
+        assert len(set(stacks)) == len(stacks)
+        for results, score in outputs:
+            assert score == pytest.approx(rc.calculate_recommendation_score(tools_dict, results))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_top_1_is_the_greedy_stack(seed):
+    tools_dict, def_tools_data = make_inputs(seed=seed)
+    catalog = CatalogMatrix(def_tools_data)
+    for _, approach in rc.APPROACHES:
+        greedy = approach(tools_dict, def_tools_data, None, catalog=catalog, engine="classic")
+        assert approach(tools_dict, def_tools_data, None, catalog=catalog, top_k=1) == [greedy]
@@ -0,0 +1,108 @@
+"""
+Canonical activity identities.
+
+Activities reach the engine from three places: the Category*Options lists, the activities of the tool catalog sheet
+and the re_details rows the user entered. ActivityRegistry gives every activity one integer ID: names are normalized
+(case, surrounding and repeated whitespace) and catalog spellings listed in ACTIVITY_ALIASES resolve to the option they
+stand for. The raw spellings of the options, the aliases and the loaded catalogs are resolved once and remembered, so
+matching activities elsewhere is comparing ints.
+"""
+import hashlib
+
+from data.SelectValues import (
+  Category1Options,
+  Category2Options,
+  Category3Options,
+  Category4Options,
+)
+
+CATEGORY_OPTIONS = (*Category1Options, *Category2Options, *Category3Options, *Category4Options)
+# Spellings of activities in the tool catalog sheet -> the Category*Options activity they stand for
+ACTIVITY_ALIASES = {
+  "Conducting Video calls": "Conducting Video calls/conferencing",
+  "Searching - Information": "Searching - (Filtering) Information",
+  "Categorizing and Tagging - Information": "Categorizing and Tagging - Data/Information/Knowledge",
+  "Allocating product data": "Allocating product data (CAE data etc.)",
+  "Allocating Bill of Materials": "Allocating Bill of Materials (BoM)",
+  "Establishing common language": "Establishing common language (Glossar tc.)",
+  "Reporting - Problem": "Reporting - Problem (Ticket System, etc)",
+  "Validating requirements": "Validating requirements (Align results with stakeholders)",
+  "Writing Lastenheft/Pflichtenheft": "Writing Lasten-/Pflichtenheft",
+  "Review - Status Updates": "Review - Status Updates (Approval, Revision…)",
+}
+# IDs of names outside the options and aliases start at this bit (they still fit an int64)
+UNLISTED_BASE = 1 << 62
+
+
+def normalize_activity_name(name):
+  return " ".join(name.split()).lower()
+
+
+def unlisted_id(normalized):
+  """ID of a normalized name that is neither an option nor an alias, derived from its text only."""
+  digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+  return UNLISTED_BASE | int.from_bytes(digest, "big") & (UNLISTED_BASE - 1)
+
+
+class ActivityRegistry:
+  """
+  Activity name -> ID. The Category*Options activities get IDs 0.. in list order and the aliases the ID of their
+  option; other names get unlisted_id, so all IDs are the same in every process. Only the spellings of the options,
+  the aliases and those passed to register (the catalog activities) are remembered; other names, e.g. typed by users,
+  are resolved on every call and never grow the registry. Safe to share between threads.
+  """
+
+  def __init__(self, options=CATEGORY_OPTIONS, aliases=ACTIVITY_ALIASES):
+    self.names = []  # ID -> canonical normalized name of the options
+    self._ids = {}  # normalized option or alias -> ID
+    self._spellings = {}  # remembered raw spelling -> ID
+    for option in options:
+      normalized = normalize_activity_name(option)
+      if normalized not in self._ids:
+        self._ids[normalized] = len(self.names)
+        self.names.append(normalized)
+    for alias, option in aliases.items():
+      self._ids.setdefault(normalize_activity_name(alias), self.activity_id(option))
+    self.register(options)
+    self.register(aliases)
+
+  def __len__(self):
+    return len(self._spellings)
+
+  def activity_id(self, name):
+    """ID of an activity name in any spelling."""
+    activity_id = self._spellings.get(name)
+    if activity_id is None:
+      normalized = normalize_activity_name(name)
+      activity_id = self._ids.get(normalized)
+      if activity_id is None:
+        activity_id = unlisted_id(normalized)
+    return activity_id
+
+  def register(self, names):
+    """Remembers the IDs of the given spellings, e.g. the activities of a loaded catalog."""
+    for name in names:
+      if name not in self._spellings:
+        # One dict store per spelling; concurrent registrations of the same spelling store the same ID
+        self._spellings[name] = self.activity_id(name)
+
+  def ids(self, names):
+    return {self.activity_id(name) for name in names}
+
+
+# Process-wide registry; data loaded anywhere in the app is resolved here
+ACTIVITIES = ActivityRegistry()
+
+
+def activity_id(name):
+  return ACTIVITIES.activity_id(name)
+
+
+def register_activities(names):
+  ACTIVITIES.register(names)
+
+
+def flat_activity_id(activity):
+  """ID of a flat activity (see requirement_calc.flatten_activities), looked up by name when it carries none."""
+  activity_id = activity.get("activity_id")
+  return activity_id if activity_id is not None else ACTIVITIES.activity_id(activity.get("activity_name", ""))
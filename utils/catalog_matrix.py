@@ -0,0 +1,192 @@
+import numpy as np
+
+from utils.activity_registry import activity_id, flat_activity_id, register_activities
+
+# Scores within this relative distance of the best one are re-scored with the scalar code before picking a winner,
+# so batched or reordered float arithmetic never changes which tool wins
+NEAR_TIE = 1e-9
+
+# Numeric catalog attributes and their values for missing cells: -1 (no level) for the level attributes, 0 otherwise
+ATTRIBUTE_DEFAULTS = {
+  "automation": -1,
+  "ai_level": -1,
+  "syncronization": -1,
+  "integration": 0,
+  "usability": 0,
+  "cost": 0,
+  "support": 0,
+  "functionality": 0,
+}
+
+
+def catalog_attribute(def_tool_info, attr):
+  """
+  Numeric value of a catalog attribute of a tool. Numbers are returned as they are, numeric text as float; missing
+  and other non-numeric cells (e.g. "n/a" or "-") count as the attribute's default.
+  """
+  value = def_tool_info.get(attr, ATTRIBUTE_DEFAULTS[attr])
+  if isinstance(value, (int, float, np.number)):
+    return value
+  try:
+    return float(value)
+  except (TypeError, ValueError):
+    return ATTRIBUTE_DEFAULTS[attr]
+
+
+def payment_methods_of(def_tool_info):
+  payment_method = def_tool_info.get("payment_method")
+  return payment_method if isinstance(payment_method, (list, tuple, set)) else [payment_method]
+
+def payment_bitmask(payment_methods):
+  mask = 0
+  for pm in payment_methods or []:
+    if isinstance(pm, (int, float, np.number)) and pm == pm and int(pm) == pm and 0 <= pm < 63:
+      mask |= 1 << int(pm)
+  return mask
+
+def build_activity_tool_index(def_tools_data):
+  """Inverted index: activity ID (see utils.activity_registry) -> set of catalog tool names offering it."""
+  index = {}
+  for tool_name, def_tool_info in def_tools_data.items():
+    register_activities(activity.get("activity", "") for activity in def_tool_info.get("activities", []))
+    for activity in def_tool_info.get("activities", []):
+      index.setdefault(activity_id(activity.get("activity", "")), set()).add(tool_name)
+  return index
+
+class CatalogMatrix:
+  """
+  Array view of a def_tools_data catalog (see utils.utils.load_def_tools_data_from_xlsx), built once per load:
+  - tool_names / tool_index: catalog order and name -> row
+  - column_activities / activity_columns: activity IDs (see utils.activity_registry) of the columns and ID -> column
+  - incidence: bool matrix [tool, activity]
+  - tool_activity_ids: per tool, activity IDs in catalog order (duplicates kept)
+  - automation, ai_level, syncronization (-1 when missing), integration, usability, cost, support, functionality (0 when
+    missing), read with catalog_attribute
+  - payment_mask: per tool bitmask with bit pm set for every payment method pm of the tool
+  - activity_tools: inverted index activity ID -> set of tool names (see build_activity_tool_index)
+  """
+
+  def __init__(self, def_tools_data):
+    self.tool_names = list(def_tools_data)
+    self.tool_index = {name: idx for idx, name in enumerate(self.tool_names)}
+    self.activity_columns = {}
+    self.column_activities = []
+    self.tool_activity_ids = []
+    pairs = []
+    for idx, def_tool_info in enumerate(def_tools_data.values()):
+      register_activities(a.get("activity", "") for a in def_tool_info.get("activities", []))
+      activity_ids = [activity_id(a.get("activity", "")) for a in def_tool_info.get("activities", [])]
+      self.tool_activity_ids.append(activity_ids)
+      for tool_activity_id in activity_ids:
+        pairs.append((idx, self.column(tool_activity_id)))
+
+    self.incidence = np.zeros((len(self.tool_names), len(self.column_activities)), dtype=bool)
+    if pairs:
+      rows, cols = zip(*pairs)
+      self.incidence[list(rows), list(cols)] = True
+    # Sparse form of incidence (duplicate activities of a tool collapsed) for weighted per-tool sums
+    self.pair_tools, self.pair_activities = np.nonzero(self.incidence)
+
+    for attr in ATTRIBUTE_DEFAULTS:
+      values = [catalog_attribute(def_tool_info, attr) for def_tool_info in def_tools_data.values()]
+      setattr(self, attr, np.array(values, dtype=float))
+    self.activity_tools = build_activity_tool_index(def_tools_data)
+    self.payment_mask = np.array(
+      [payment_bitmask(payment_methods_of(def_tool_info)) for def_tool_info in def_tools_data.values()], dtype=np.int64
+    )
+
+  def column(self, activity_id):
+    column = self.activity_columns.get(activity_id)
+    if column is None:
+      column = len(self.column_activities)
+      self.activity_columns[activity_id] = column
+      self.column_activities.append(activity_id)
+    return column
+
+  def activity_row(self, tool_name):
+    return self.incidence[self.tool_index[tool_name]]
+
+  def covers_all(self, tool_name, activity_ids):
+    """True if the tool offers every activity in activity_ids."""
+    row = self.activity_row(tool_name)
+    for activity_id in activity_ids:
+      column = self.activity_columns.get(activity_id)
+      if column is None or not row[column]:
+        return False
+    return True
+
+  def coverage_flags(self, tool_name, activity_ids):
+    """Per activity ID: does the tool offer it."""
+    row = self.activity_row(tool_name)
+    flags = []
+    for activity_id in activity_ids:
+      column = self.activity_columns.get(activity_id)
+      flags.append(column is not None and bool(row[column]))
+    return flags
+
+  def tools_touching(self, activity_ids):
+    """Names of the tools offering at least one of activity_ids."""
+    touching = set()
+    for activity_id in activity_ids:
+      touching |= self.activity_tools.get(activity_id, set())
+    return touching
+
+  def covers_all_mask(self, activity_ids):
+    """Bool array over tool_names: the tool offers every activity in activity_ids."""
+    mask = np.ones(len(self.tool_names), dtype=bool)
+    for activity_id in set(activity_ids):
+      column = self.activity_columns.get(activity_id)
+      if column is None:
+        return np.zeros(len(self.tool_names), dtype=bool)
+      mask &= self.incidence[:, column]
+    return mask
+
+  def digitalization_capability_scores(self, flat_activities, rows=None):
+    """
+    Batched calculate_digitalization_capability_scores: (digi_score, cap_score) arrays for the catalog tools in rows
+    (all tools by default) against flat_activities, equal to the scalar scores up to floating-point rounding.
+    Per attribute the nfc totals of the requirement levels a tool level meets come from one cumulative sum, and
+    capability sums are nfc weights accumulated over the sparse incidence pairs.
+    """
+    rows = np.arange(len(self.tool_names)) if rows is None else np.asarray(rows, dtype=int)
+    nfc = np.array([a.get("nfc_score", 0) for a in flat_activities], dtype=float)
+    total_nfc = nfc.sum()
+    if not len(flat_activities) or total_nfc <= 0:
+      return np.zeros(len(rows)), np.zeros(len(rows))
+
+    digi_sum = np.zeros(len(rows))
+    for tool_levels, key in ((self.automation, "digitalization"), (self.ai_level, "aiLevel"), (self.syncronization, "synchronization")):
+      required = np.array([a.get(key, 0) for a in flat_activities], dtype=float)
+      order = np.argsort(required, kind="stable")
+      met_nfc = np.concatenate(([0.0], np.cumsum(nfc[order])))
+      levels = tool_levels[rows]
+      met = met_nfc[np.searchsorted(required[order], levels, side="right")]
+      digi_sum += np.where(levels > -1, met, 0.0)
+
+    activity_weights = np.zeros(len(self.column_activities))
+    for activity, weight in zip(flat_activities, nfc):
+      column = self.activity_columns.get(flat_activity_id(activity))
+      if column is not None:
+        activity_weights[column] += weight
+    cap_sum = np.bincount(
+      self.pair_tools, weights=activity_weights[self.pair_activities], minlength=len(self.tool_names)
+    )[rows]
+    return digi_sum / 3 / total_nfc, cap_sum / total_nfc
+
+  def preference_scores(self, user_usability, user_support, user_integration, user_cost):
+    """
+    calculate_tool_preference_score of every tool for one set of user weights. The weighted attribute sum is
+    evaluated term by term in the scalar code's order, so the scores are bit-identical to it.
+    """
+    weighted = (
+      self.usability * user_usability
+      + self.support * user_support
+      + self.integration * user_integration
+      + self.cost * user_cost
+      + self.functionality * 5
+    )
+    return weighted / (25 * (user_usability + user_support + user_integration + user_cost + 5))
+
+  def payment_filter(self, user_payment):
+    """Bool array over tool_names: the tool accepts at least one of the user's payment methods."""
+    return (self.payment_mask & payment_bitmask(user_payment)) != 0
@@ -0,0 +1,611 @@
+"""
+Bitset engine for the recommendation approaches of utils.requirement_calc.
+
+Flat activities (the dicts produced by flatten_activities) become bit positions of Python ints, in list order, so
+covering and removing activities are AND / ANDNOT operations and the remaining activities stay in list order.
+Candidates are ranked by the unnormalized product of the digitalization and capability sums, which orders tools
+like total_score does (both scores share the same nfc total as denominator). The winner and its near ties are then
+scored with the exact float arithmetic of calculate_digitalization_capability_scores, so picks, tie-breaking and
+reported scores are identical to the classic engine. The covering loops run as lazy greedy (see
+CoverEngine.drain_lazy), so most steps only re-score the few tools at the top of a heap.
+
+run_top_k returns alternative stacks: runs that deviate from the greedy one at a step where another tool came close
+to the winner, replaying the decisions before that step.
+"""
+import heapq
+import time
+from collections import deque
+from itertools import count
+
+import numpy as np
+
+from utils import instrumentation
+from utils.activity_registry import flat_activity_id
+from utils.catalog_matrix import CatalogMatrix, NEAR_TIE, catalog_attribute
+from utils.option_codecs import tool_activity_codes
+from utils.score_memo import ScoreMemo
+from utils import requirement_calc as rc
+
+# Catalog attributes compared against the digitalization, aiLevel and synchronization requirement levels
+LEVEL_ATTRIBUTES = ("automation", "ai_level", "syncronization")
+# run_top_k: tools whose key is within this fraction of a step's winner are alternatives to branch on, and the
+# number of runs allowed per requested stack (deviations can end in a stack already found)
+TIE_TOLERANCE = 0.05
+MAX_RUNS_PER_STACK = 4
+
+
+def iter_bits(bits):
+  while bits:
+    low = bits & -bits
+    yield low.bit_length() - 1
+    bits ^= low
+
+
+class ActivityTable:
+  """
+  Flat activities as bit positions. Entry i is bit 1 << i; its name, activity ID, requirement levels and nfc_score
+  are kept in parallel lists, and per-value bitsets allow weighted popcounts over any selection of entries.
+  """
+
+  def __init__(self, catalog):
+    self.catalog = catalog
+    self.names = []
+    self.ids = []
+    self.levels = []  # (digitalization, aiLevel, synchronization)
+    self.nfc = []
+    self.by_id = {}
+    self.nfc_bits = {}
+    self.level_bits = [{}, {}, {}]
+    self.tool_bits = {}  # catalog tool name -> entries it covers
+    self._level_le = {}
+    self._tokens = {}  # remaining bits -> ScoreMemo token
+    self._values = None
+
+  def __len__(self):
+    return len(self.names)
+
+  @property
+  def all_bits(self):
+    return (1 << len(self.names)) - 1
+
+  def add(self, activity):
+    idx = len(self.names)
+    bit = 1 << idx
+    activity_id = flat_activity_id(activity)
+    self.names.append(activity.get("activity_name", ""))
+    self.ids.append(activity_id)
+    self.levels.append((0, 0, 0))
+    self.nfc.append(0)
+    self.by_id[activity_id] = self.by_id.get(activity_id, 0) | bit
+    for tool_name in self.catalog.activity_tools.get(activity_id, ()):
+      self.tool_bits[tool_name] = self.tool_bits.get(tool_name, 0) | bit
+    self._set_values(idx, activity)
+    return idx
+
+  def update(self, idx, activity):
+    """Replaces the requirement levels / nfc_score of entry idx (name and ID unchanged)."""
+    bit = 1 << idx
+    self.nfc_bits[self.nfc[idx]] &= ~bit
+    for attr, value in enumerate(self.levels[idx]):
+      self.level_bits[attr][value] &= ~bit
+    self._set_values(idx, activity)
+
+  def _set_values(self, idx, activity):
+    bit = 1 << idx
+    levels = (activity.get("digitalization", 0), activity.get("aiLevel", 0), activity.get("synchronization", 0))
+    nfc = activity.get("nfc_score", 0)
+    self.levels[idx] = levels
+    self.nfc[idx] = nfc
+    self.nfc_bits[nfc] = self.nfc_bits.get(nfc, 0) | bit
+    for attr, value in enumerate(levels):
+      self.level_bits[attr][value] = self.level_bits[attr].get(value, 0) | bit
+    self._level_le.clear()
+    self._tokens.clear()
+    self._values = None
+
+  def values(self):
+    """(activity ID, digitalization, aiLevel, synchronization, nfc_score) per entry; the same tuple until an entry changes."""
+    if self._values is None:
+      self._values = tuple((activity_id, *levels, nfc) for activity_id, levels, nfc in zip(self.ids, self.levels, self.nfc))
+    return self._values
+
+  def as_activity(self, idx):
+    digitalization, ai_level, synchronization = self.levels[idx]
+    return {
+      "activity_name": self.names[idx],
+      "activity_id": self.ids[idx],
+      "digitalization": digitalization,
+      "aiLevel": ai_level,
+      "synchronization": synchronization,
+      "nfc_score": self.nfc[idx],
+    }
+
+  def weighted_count(self, bits):
+    """Sum of nfc_score over the entries in bits."""
+    return sum(nfc * (bits & nfc_bits).bit_count() for nfc, nfc_bits in self.nfc_bits.items() if nfc)
+
+  def level_le(self, attr, level):
+    """Entries whose requirement for attr is met by a tool with the given level."""
+    key = (attr, level)
+    bits = self._level_le.get(key)
+    if bits is None:
+      bits = 0
+      if level > -1:
+        for value, value_bits in self.level_bits[attr].items():
+          if level >= value:
+            bits |= value_bits
+      self._level_le[key] = bits
+    return bits
+
+  def token(self, memo, bits):
+    """ScoreMemo token of the entries in bits, the same token requirement_key gives their flat activity list."""
+    token = self._tokens.get(bits)
+    if token is None:
+      token = memo.token(tuple((self.ids[idx], *self.levels[idx], self.nfc[idx]) for idx in iter_bits(bits)))
+      self._tokens[bits] = token
+    return token
+
+
+class CoverEngine:
+  """
+  Catalog side of the bitset engine: candidate sets are ints over catalog tool indices (catalog order), tool levels
+  and preference scores are read once from def_tools_data.
+  """
+
+  def __init__(self, def_tools_data, catalog=None, stats=None, memo=None):
+    """
+    stats: optional dict receiving scorer counters: "tools_scored" (score keys computed), "exact_scored" (exact
+    float re-scorings) and "picks" (greedy decisions).
+    memo: optional ScoreMemo (utils.score_memo) for the exact scores, shared with the other passes of a request.
+    """
+    self.memo = memo
+    profile = instrumentation.active_profile()
+    if stats is None and profile is not None:
+      stats = profile.counters
+    self.stats = stats if stats is not None else {}
+    for counter in ("tools_scored", "exact_scored", "picks"):
+      self.stats.setdefault(counter, 0)
+    if catalog is None or catalog.tool_names != list(def_tools_data):
+      catalog = CatalogMatrix(def_tools_data)
+    self.catalog = catalog
+    self.tool_names = catalog.tool_names
+    self.tool_levels = [
+      tuple(catalog_attribute(info, attr) for attr in LEVEL_ATTRIBUTES) for info in def_tools_data.values()
+    ]
+    self.preference = [info.get("preference_score", 0.0) for info in def_tools_data.values()]
+    self.preference_array = np.array(self.preference, dtype=float)
+    self.all_tools = (1 << len(self.tool_names)) - 1
+    # Tools with a NaN preference_score: their totals are NaN, which the scan of find_highest_scorer never picks
+    self.unscorable = 0
+    for tool_idx in np.flatnonzero(np.isnan(self.preference_array)):
+      self.unscorable |= 1 << int(tool_idx)
+    # Decisions the next run re-takes without scoring (see run_top_k)
+    self.replay = deque()
+    # Alternative stacks (see run_top_k): the decisions of the current run, and (step, tool index, relative key gap)
+    # of every tool within tie_tolerance of a step's winner
+    self.decisions = None
+    self.alternatives = None
+    self.tie_tolerance = 0.0
+
+  def _log_step(self, highest):
+    if self.decisions is not None:
+      self.decisions.append(highest)
+
+  def new_table(self, activities=()):
+    table = ActivityTable(self.catalog)
+    for activity in activities:
+      table.add(activity)
+    return table
+
+  def payment_candidates(self, user_payment):
+    """Candidate set after the payment filter of filter_def_tools_by_payment."""
+    if not (user_payment and isinstance(user_payment, (list, tuple, set))):
+      return self.all_tools
+    accepted = self.catalog.payment_filter(user_payment)
+    bits = 0
+    for idx in accepted.nonzero()[0]:
+      bits |= 1 << int(idx)
+    return bits
+
+  def tools_with_all(self, activity_ids):
+    """Candidate set of the tools offering every activity in activity_ids."""
+    bits = self.all_tools
+    for activity_id in activity_ids:
+      tool_set = 0
+      for tool_name in self.catalog.activity_tools.get(activity_id, ()):
+        tool_set |= 1 << self.catalog.tool_index[tool_name]
+      bits &= tool_set
+    return bits
+
+  def touching(self, table, remaining):
+    """Candidate set of the tools covering at least one entry in remaining."""
+    bits = 0
+    for activity_id, id_bits in table.by_id.items():
+      if id_bits & remaining:
+        for tool_name in self.catalog.activity_tools.get(activity_id, ()):
+          bits |= 1 << self.catalog.tool_index[tool_name]
+    return bits
+
+  def key(self, table, remaining, tool_idx, level_sums):
+    """
+    Unnormalized score key of one tool: digitalization sum (x3) * capability sum * preference_score.
+    Both sums only lose terms when activities are covered, so a key never grows within a covering loop.
+    level_sums caches the per-level digitalization sums for this remaining set.
+    """
+    self.stats["tools_scored"] += 1
+    tool_name = self.tool_names[tool_idx]
+    cap = table.weighted_count(table.tool_bits.get(tool_name, 0) & remaining)
+    digi = 0
+    for attr, level in enumerate(self.tool_levels[tool_idx]):
+      level_key = (attr, level)
+      level_sum = level_sums.get(level_key)
+      if level_sum is None:
+        level_sum = table.weighted_count(table.level_le(attr, level) & remaining)
+        level_sums[level_key] = level_sum
+      digi += level_sum
+    return digi * cap * self.preference[tool_idx]
+
+  def keys(self, table, remaining, candidates):
+    """Score key per candidate as a list of (tool_idx, key) in catalog order."""
+    level_sums = {}
+    return [(tool_idx, self.key(table, remaining, tool_idx, level_sums)) for tool_idx in iter_bits(candidates & ~self.unscorable)]
+
+  def exact_scores(self, table, remaining, tool_idx):
+    """(digi_score, cap_score) exactly as calculate_digitalization_capability_scores computes them."""
+    def_automation, def_ai_level, def_syncronization = self.tool_levels[tool_idx]
+    covered = table.tool_bits.get(self.tool_names[tool_idx], 0)
+    digitalization_score = 0
+    capability_score = 0
+    total_nfc = 0
+    for idx in iter_bits(remaining):
+      automation_score, ai_level_score, sync_score = table.levels[idx]
+      nfc_score = table.nfc[idx]
+      act_digi_score = 0
+      if def_automation >= automation_score and def_automation > -1:
+        act_digi_score += 1
+      if def_ai_level >= ai_level_score and def_ai_level > -1:
+        act_digi_score += 1
+      if def_syncronization >= sync_score and def_syncronization > -1:
+        act_digi_score += 1
+      digitalization_score += nfc_score * (act_digi_score / 3)
+      total_nfc += nfc_score
+      if covered >> idx & 1:
+        capability_score += nfc_score
+    total_digi_score = 0 if total_nfc == 0 else (digitalization_score / total_nfc if total_nfc > 0 else 0)
+    total_cap_score = 0 if total_nfc == 0 or capability_score == 0 else (capability_score / total_nfc if total_nfc > 0 else 0)
+    return total_digi_score, total_cap_score
+
+  def highest(self, table, remaining, tool_idx):
+    """The find_highest_scorer result dict for one tool."""
+    def_tool_name = self.tool_names[tool_idx]
+    scores = None
+    if self.memo is not None:
+      token = table.token(self.memo, remaining)
+      scores = self.memo.get(def_tool_name, token)
+    if scores is None:
+      self.stats["exact_scored"] += 1
+      scores = self.exact_scores(table, remaining, tool_idx)
+      if self.memo is not None:
+        self.memo.put(def_tool_name, token, scores)
+    digi_score, cap_score = scores
+    preference_score = self.preference[tool_idx]
+    def_automation, def_ai_level, def_syncronization = self.tool_levels[tool_idx]
+    return {
+      "tool_name": def_tool_name,
+      "total_score": float(digi_score * cap_score * preference_score),
+      "digi_score": digi_score,
+      "cap_score": cap_score,
+      "preference_score": preference_score,
+      "automation": rc.automation_score_to_str(def_automation),
+      "ai_level": rc.ai_score_to_str(def_ai_level),
+      "synchronization": rc.sync_score_to_str(def_syncronization),
+    }
+
+  def pick(self, table, remaining, candidates, scored):
+    """
+    find_highest_scorer over `scored` (a subset of candidates holding every tool that can score above 0).
+    When nothing scores above 0 the first of `candidates` is the pick; None if candidates is empty or that tool has
+    a NaN preference_score. When scored is all of candidates, the scan skips such tools and takes the next one.
+    """
+    if self.replay:
+      highest = self.replay.popleft()
+      if isinstance(highest, int):
+        # A pick forced by run_top_k: the tool with that index, scored at this state
+        highest = self.highest(table, remaining, highest)
+      self._log_step(highest)
+      return highest
+    self.stats["picks"] += 1
+    keys = self.keys(table, remaining, scored)
+    highest = self._pick_from(table, remaining, candidates, scored, keys)
+    self._record_alternatives(keys, highest)
+    self._log_step(highest)
+    return highest
+
+  def _record_alternatives(self, keys, highest):
+    # keys: (tool_idx, key) of the tools scored at the step highest won, holding the winner's near ties
+    if self.alternatives is None or not highest:
+      return
+    best_key = max((key for _, key in keys), default=0)
+    if best_key <= 0:
+      return
+    floor = best_key * (1 - self.tie_tolerance)
+    step = len(self.decisions)
+    alternatives = [
+      ((best_key - key) / best_key, tool_idx) for tool_idx, key in keys
+      if key >= floor and self.tool_names[tool_idx] != highest["tool_name"]
+    ]
+    # Sorted, so both engines list them alike
+    self.alternatives.extend((step, tool_idx, gap) for gap, tool_idx in sorted(alternatives))
+
+  def _pick_from(self, table, remaining, candidates, scored, keys):
+    best_key = max((key for _, key in keys), default=0)
+    if best_key <= 0:
+      if candidates == scored:
+        candidates &= ~self.unscorable
+      first = candidates & -candidates
+      if not first or first & self.unscorable:
+        return None
+      return self.highest(table, remaining, first.bit_length() - 1)
+    threshold = near_tie_threshold(best_key)
+    return self.exact_winner(table, remaining, [tool_idx for tool_idx, key in keys if key >= threshold])
+
+  def exact_winner(self, table, remaining, contenders):
+    """First contender (catalog order) with the highest exact total_score, as find_highest_scorer's scan picks it."""
+    winner = None
+    for tool_idx in sorted(contenders):
+      highest = self.highest(table, remaining, tool_idx)
+      if winner is None or highest["total_score"] > winner["total_score"]:
+        winner = highest
+    return winner
+
+  def select(self, table, remaining, candidates, drain=False):
+    """
+    Pick of find_highest_touching_scorer for the entries in remaining. With drain=True only tools covering a
+    remaining entry are considered and None is returned when there is none.
+    """
+    touching = self.touching(table, remaining) & candidates
+    if drain:
+      return self.pick(table, remaining, touching, touching)
+    return self.pick(table, remaining, candidates, touching)
+
+  def select_forced(self, table, candidates):
+    """Pick of find_highest_scorer(..., force_all_activities=True) for all entries of table."""
+    supersets = self.tools_with_all(set(table.ids)) & candidates
+    return self.pick(table, table.all_bits, supersets, supersets)
+
+  def cover(self, highest, table, remaining, results):
+    """cover_calcs: records the tool with the activities it covers; returns the new remaining bits."""
+    profile = instrumentation.active_profile()
+    if profile is None:
+      return self._cover(highest, table, remaining, results)
+    start = time.perf_counter()
+    remaining = self._cover(highest, table, remaining, results)
+    profile.add_time("cover_calcs", time.perf_counter() - start)
+    return remaining
+
+  def _cover(self, highest, table, remaining, results):
+    tool_name = highest["tool_name"]
+    tool_idx = self.catalog.tool_index[tool_name]
+    # Named like the first remaining entry of each activity, as cover_calcs does
+    covered_ids = [
+      activity_id for activity_id in self.catalog.tool_activity_ids[tool_idx]
+      if table.by_id.get(activity_id, 0) & remaining
+    ]
+    if covered_ids:
+      covered = []
+      for activity_id in covered_ids:
+        bits = table.by_id[activity_id] & remaining
+        covered.append(table.names[(bits & -bits).bit_length() - 1])
+      results.append({"tool_name": tool_name, "score": highest["total_score"], "activities": covered, **highest})
+      for activity_id in set(covered_ids):
+        remaining &= ~table.by_id[activity_id]
+    return remaining
+
+  def drain(self, table, remaining, candidates, results):
+    """The covering loop shared by the approaches: pick and cover until nothing is left to cover."""
+    # Decisions a top_k run re-takes (see run_top_k)
+    while self.replay and remaining and candidates:
+      highest = self.select(table, remaining, candidates, drain=True)
+      if not highest:
+        return remaining, candidates
+      remaining = self.cover(highest, table, remaining, results)
+      candidates &= ~(1 << self.catalog.tool_index[highest["tool_name"]])
+    remaining, candidates = self.drain_lazy(table, remaining, candidates, results)
+    while remaining and candidates:
+      highest = self.select(table, remaining, candidates, drain=True)
+      if not highest:
+        break
+      remaining = self.cover(highest, table, remaining, results)
+      candidates &= ~(1 << self.catalog.tool_index[highest["tool_name"]])
+    return remaining, candidates
+
+  def drain_lazy(self, table, remaining, candidates, results):
+    """
+    Lazy greedy version of the covering loop. Candidates sit in a max-heap keyed by their last computed key; since
+    keys never grow while activities are covered, an entry scored in the current step that is still on top beats
+    every stale entry below it. Only the entries popped above the near-tie threshold are re-scored, and the winner
+    is chosen among them exactly as pick() does, so the decisions match the eager loop.
+    Stops when the best key reaches 0 and leaves that tail (picks in catalog order) to the eager loop.
+    """
+    step = 0
+    level_sums = {}
+    heap = None
+    while remaining:
+      if heap is None:
+        heap = [(-key, tool_idx, step) for tool_idx, key in self.keys(table, remaining, self.touching(table, remaining) & candidates)]
+        heapq.heapify(heap)
+      # Re-score stale entries until the top one was scored against the current remaining set
+      while heap and heap[0][2] != step:
+        _, tool_idx, _ = heapq.heappop(heap)
+        if candidates >> tool_idx & 1:
+          heapq.heappush(heap, (-self.key(table, remaining, tool_idx, level_sums), tool_idx, step))
+      if not heap:
+        break
+      best_key = -heap[0][0]
+      if best_key <= 0:
+        break
+      threshold = near_tie_threshold(best_key)
+      # Recording alternatives (see run_top_k), the tools within the tie tolerance are brought up to date as well
+      floor = threshold if self.alternatives is None else min(threshold, best_key * (1 - self.tie_tolerance))
+      contenders = {}
+      while heap and -heap[0][0] >= floor:
+        neg_key, tool_idx, scored_step = heapq.heappop(heap)
+        if scored_step == step:
+          contenders[tool_idx] = neg_key
+        elif candidates >> tool_idx & 1:
+          heapq.heappush(heap, (-self.key(table, remaining, tool_idx, level_sums), tool_idx, step))
+      highest = self.exact_winner(table, remaining, [
+        tool_idx for tool_idx, neg_key in contenders.items() if -neg_key >= threshold
+      ])
+      winner_idx = self.catalog.tool_index[highest["tool_name"]]
+      self._record_alternatives([(tool_idx, -neg_key) for tool_idx, neg_key in contenders.items()], highest)
+      self._log_step(highest)
+      self.stats["picks"] += 1
+      for tool_idx, neg_key in contenders.items():
+        if tool_idx != winner_idx:
+          heapq.heappush(heap, (neg_key, tool_idx, step))
+      remaining = self.cover(highest, table, remaining, results)
+      candidates &= ~(1 << winner_idx)
+      step += 1
+      level_sums = {}
+    return remaining, candidates
+
+
+def near_tie_threshold(best_key):
+  return best_key - abs(best_key) * NEAR_TIE
+
+
+def _manual_start(engine, tools_dict):
+  manual_activities, copy_tools_dict = rc.split_manual_activities(tools_dict)
+  table = engine.new_table(manual_activities)
+  ordered_tools = sorted(copy_tools_dict.items(), key=lambda item: item[1].get("prio_score", 0), reverse=True)
+  return table, ordered_tools
+
+
+def total_score_prioritization(engine, tools_dict, candidates):
+  table = engine.new_table(rc.flatten_activities(tools_dict))
+  results = []
+  if not candidates:
+    return [results, 0.0]
+  engine.drain(table, table.all_bits, candidates, results)
+  return [results, rc.calculate_recommendation_score(tools_dict, results)]
+
+
+def one_by_one_exchange_approach(engine, tools_dict, candidates):
+  table, ordered_tools = _manual_start(engine, tools_dict)
+  remaining = table.all_bits
+  results = []
+  if not candidates:
+    return [results, 0.0]
+
+  for tool_id, info in ordered_tools:
+    for activity_name, activity_id, digitalization, ai_level, synchronization, nfc_score, _ in tool_activity_codes(info):
+      merged = {
+        "activity_name": activity_name,
+        "activity_id": activity_id,
+        "digitalization": digitalization,
+        "aiLevel": ai_level,
+        "synchronization": synchronization,
+        "nfc_score": nfc_score,
+      }
+      existing = table.by_id.get(activity_id, 0) & remaining
+      if existing:
+        idx = (existing & -existing).bit_length() - 1
+        current = table.as_activity(idx)
+        for key in ("digitalization", "aiLevel", "synchronization", "nfc_score"):
+          merged[key] = max(current[key], merged[key])
+        table.update(idx, merged)
+      else:
+        remaining |= 1 << table.add(merged)
+    highest = engine.select(table, remaining, candidates)
+    if highest:
+      remaining = engine.cover(highest, table, remaining, results)
+      candidates &= ~(1 << engine.catalog.tool_index[highest["tool_name"]])
+
+  engine.drain(table, remaining, candidates, results)
+  return [results, rc.calculate_recommendation_score(tools_dict, results)]
+
+
+def forced_exchange_approach(engine, tools_dict, candidates):
+  table, ordered_tools = _manual_start(engine, tools_dict)
+  remaining = table.all_bits
+  results = []
+  if not candidates:
+    return [results, 0.0]
+
+  for tool_id, info in ordered_tools:
+    flatten_tool_activities = rc.flatten_activities({tool_id: info})
+    highest = engine.select_forced(engine.new_table(flatten_tool_activities), candidates)
+    for activity in flatten_tool_activities:
+      remaining |= 1 << table.add(activity)
+    if highest:
+      remaining = engine.cover(highest, table, remaining, results)
+      candidates &= ~(1 << engine.catalog.tool_index[highest["tool_name"]])
+
+  engine.drain(table, remaining, candidates, results)
+  return [results, rc.calculate_recommendation_score(tools_dict, results)]
+
+
+def run_total_score_prioritization(tools_dict, def_tools_data, user_payment=None, catalog=None, stats=None, memo=None):
+  return run_approach(total_score_prioritization, tools_dict, def_tools_data, user_payment, catalog, stats, memo)
+
+
+def run_one_by_one_exchange_approach(tools_dict, def_tools_data, user_payment=None, catalog=None, stats=None, memo=None):
+  return run_approach(one_by_one_exchange_approach, tools_dict, def_tools_data, user_payment, catalog, stats, memo)
+
+
+def run_forced_exchange_approach(tools_dict, def_tools_data, user_payment=None, catalog=None, stats=None, memo=None):
+  return run_approach(forced_exchange_approach, tools_dict, def_tools_data, user_payment, catalog, stats, memo)
+
+
+def run_approach(approach, tools_dict, def_tools_data, user_payment=None, catalog=None, stats=None, memo=None):
+  """approach: one of the approach functions above, taking (engine, tools_dict, candidate tool bits)."""
+  if not tools_dict:
+    return []
+  engine = CoverEngine(def_tools_data, catalog, stats, memo)
+  return approach(engine, tools_dict, engine.payment_candidates(user_payment))
+
+
+def run_top_k(approach, tools_dict, def_tools_data, user_payment=None, catalog=None, stats=None, memo=None, k=3, tie_tolerance=TIE_TOLERANCE):
+  """
+  Up to k outputs of the approach with distinct tool stacks, best recommendation score first.
+  The greedy run is the first one. Every other run deviates from an earlier one at a single step, taking a tool whose
+  key was within tie_tolerance (relative) of the winner's, and continues greedily. Pending deviations sit in a heap
+  bounded to k, cheapest first by their summed relative key gaps. A deviation replays the decisions before it without
+  scoring and all runs share the score memo, so each costs about the greedy steps after its deviation and the total
+  grows linearly with k (at most MAX_RUNS_PER_STACK * k runs).
+  """
+  if not tools_dict:
+    return []
+  engine = CoverEngine(def_tools_data, catalog, stats, memo if memo is not None else ScoreMemo())
+  engine.tie_tolerance = tie_tolerance
+  candidates = engine.payment_candidates(user_payment)
+  order = count()
+  pending = [(0.0, next(order), (), None)]
+  outputs = []
+  stacks = set()
+  runs = 0
+  while pending and len(outputs) < k and runs < MAX_RUNS_PER_STACK * k:
+    gap, _, decisions, forced = heapq.heappop(pending)
+    engine.decisions = []
+    engine.alternatives = []
+    engine.replay = deque(decisions if forced is None else (*decisions, forced))
+    output = approach(engine, tools_dict, candidates)
+    runs += 1
+    stack = frozenset(result["tool_name"] for result in output[0])
+    if stack not in stacks:
+      stacks.add(stack)
+      outputs.append(output)
+    for step, tool_idx, step_gap in engine.alternatives:
+      heapq.heappush(pending, (gap + step_gap, next(order), tuple(engine.decisions[:step]), tool_idx))
+    if len(pending) > k:
+      pending = heapq.nsmallest(k, pending)
+  return sorted(outputs, key=lambda output: output[1], reverse=True)
+
+
+# Approach function behind each run_* of utils.requirement_calc
+APPROACHES = {
+  rc.run_total_score_prioritization: total_score_prioritization,
+  rc.run_one_by_one_exchange_approach: one_by_one_exchange_approach,
+  rc.run_forced_exchange_approach: forced_exchange_approach,
+}
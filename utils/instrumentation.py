@@ -0,0 +1,86 @@
+"""
+Opt-in counters and timings of the recommendation engine and the Design Recommendation page.
+
+Nothing is collected unless a profile is active (see profiling / start_profiling). The hooks in
+utils.requirement_calc and utils.cover_engine read active_profile() once per hooked call and do nothing else while it
+is None, so disabled instrumentation costs one context variable lookup per call.
+Counters:
+- find_highest_scorer: find_highest_scorer scans (classic engine)
+- tools_scored: tool scores computed (batched scans count every tool of the batch)
+- exact_scored: exact float re-scorings of the lazy engine
+- picks: greedy iterations, i.e. tools added to a stack
+- payment_fallbacks: approaches rerun on the whole catalog because the payment-filtered stack was incomplete
+- fallback_steps_shared: decisions a fallback run re-took from its payment-filtered run (classic engine)
+- steps_replayed: decisions a run re-took from the run logged before it in a StepLog (classic engine)
+- result_cache_hits: page runs served from utils.result_cache instead of running the approaches
+Timings are (calls, seconds) per name, e.g. cover_calcs and one entry per approach.
+The active profile is a context variable: every Streamlit session runs its script in its own thread and so profiles
+on its own, and work handed to other threads reports into it when submitted with contextvars.copy_context().run (as
+requirement_calc.run_all_approaches does). Threads of one request counting at the same time may rarely lose an
+increment. Enabled on the page with the RECOMMENDATION_DEBUG environment variable.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+DEBUG = bool(os.environ.get("RECOMMENDATION_DEBUG"))
+# The active EngineProfile of the current context, None while profiling is off
+_PROFILE = ContextVar("recommendation_profile", default=None)
+
+
+def active_profile():
+  return _PROFILE.get()
+
+
+class EngineProfile:
+  def __init__(self):
+    self.counters = {}
+    self.timings = {}  # name -> [calls, seconds]
+
+  def count(self, name, amount=1):
+    self.counters[name] = self.counters.get(name, 0) + amount
+
+  def add_time(self, name, seconds):
+    entry = self.timings.setdefault(name, [0, 0.0])
+    entry[0] += 1
+    entry[1] += seconds
+
+
+def start_profiling(profile=None):
+  """Makes profile (a new EngineProfile by default) the active one of the current context and returns it."""
+  profile = profile if profile is not None else EngineProfile()
+  _PROFILE.set(profile)
+  return profile
+
+
+def stop_profiling():
+  """Turns collection off in the current context and returns the profile that was active."""
+  profile = _PROFILE.get()
+  _PROFILE.set(None)
+  return profile
+
+
+@contextmanager
+def profiling(profile=None):
+  """Collects into profile (a new EngineProfile by default) for the duration of the block."""
+  profile = profile if profile is not None else EngineProfile()
+  token = _PROFILE.set(profile)
+  try:
+    yield profile
+  finally:
+    _PROFILE.reset(token)
+
+
+@contextmanager
+def timed(name):
+  """Adds the time of the block to the active profile under name; just runs the block while profiling is off."""
+  profile = _PROFILE.get()
+  if profile is None:
+    yield
+    return
+  start = time.perf_counter()
+  try:
+    yield
+  finally:
+    profile.add_time(name, time.perf_counter() - start)
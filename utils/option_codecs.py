@@ -0,0 +1,95 @@
+"""
+Integer codecs for the option vocabularies of data.SelectValues.
+
+The scorers work on ordinal codes (e.g. "Descriptive" -> 2); OptionCodec compiles a vocabulary into dict lookups
+both ways, and ActivityCodes decodes the re_details rows of a tool into one int8 array, so the engine loops only
+handle integers and strings are produced again at the presentation edge (OptionCodec.decode).
+"""
+import numpy as np
+
+from utils.activity_registry import activity_id
+from data.SelectValues import (
+  DigitalizationOptions,
+  AILevelOptions,
+  synchronizationOptions,
+  NeedForChangeOptions,
+  PaymentMethodOptions,
+)
+
+
+class OptionCodec:
+  """options[i] <-> code i + offset; values outside the vocabulary encode to default, unknown codes decode to unknown."""
+
+  def __init__(self, options, offset=0, default=0, unknown="Unknown"):
+    self.options = tuple(options)
+    self.default = default
+    self.unknown = unknown
+    self.codes = {option: idx + offset for idx, option in enumerate(self.options)}
+    self.labels = {code: option for option, code in self.codes.items()}
+
+  def encode(self, value):
+    try:
+      return self.codes.get(value, self.default)
+    except TypeError:  # unhashable cell values
+      return self.default
+
+  def decode(self, code):
+    try:
+      return self.labels.get(code, self.unknown)
+    except TypeError:
+      return self.unknown
+
+
+AUTOMATION = OptionCodec(DigitalizationOptions)
+AI_LEVEL = OptionCodec(AILevelOptions, offset=1)
+SYNCHRONIZATION = OptionCodec(synchronizationOptions, offset=1)
+NEED_FOR_CHANGE = OptionCodec(NeedForChangeOptions, offset=1)
+PAYMENT_METHOD = OptionCodec(PaymentMethodOptions, offset=1)
+
+
+def activity_nfc_score(row):
+  # nfc_score of a re_details row, derived from needForChange unless the row already carries one
+  if "nfc_score" in row:
+    return row["nfc_score"]
+  return NEED_FOR_CHANGE.encode(row.get("needForChange", "No need to change"))
+
+
+class ActivityCodes:
+  """
+  re_details rows of one tool, decoded once: the normalized activity name and activity ID (utils.activity_registry)
+  per row and an int8 array with one row of COLUMNS codes per activity, with the defaults flatten_activities applies
+  to missing values.
+  """
+
+  COLUMNS = ("digitalization", "aiLevel", "synchronization", "nfc_score", "isManual")
+
+  def __init__(self, rows):
+    rows = [row for row in rows or [] if isinstance(row, dict)]
+    self.names = [row.get("category", "N/A").strip().lower() for row in rows]
+    self.ids = np.array([activity_id(name) for name in self.names], dtype=np.int64)
+    self.codes = np.array([
+      (
+        AUTOMATION.encode(row.get("digitalization", "Automated")),
+        AI_LEVEL.encode(row.get("aiLevel", "No")),
+        SYNCHRONIZATION.encode(row.get("synchronization", "Ad-Hoc File Sharing")),
+        activity_nfc_score(row),
+        bool(row.get("isManual", False)),
+      )
+      for row in rows
+    ], dtype=np.int8).reshape(-1, len(self.COLUMNS))
+
+  def __len__(self):
+    return len(self.names)
+
+  def __iter__(self):
+    """(name, activity ID, digitalization, aiLevel, synchronization, nfc_score, isManual) per activity, as Python ints."""
+    for name, row_id, codes in zip(self.names, self.ids.tolist(), self.codes.tolist()):
+      yield (name, row_id, *codes)
+
+
+def tool_activity_codes(tool_info):
+  """ActivityCodes of a tools_dict entry: the ones decoded at load ("activity_codes"), else decoded now."""
+  activity_codes = tool_info.get("activity_codes")
+  if activity_codes is None:
+    activity_codes = ActivityCodes(tool_info.get("activities", []))
+  return activity_codes
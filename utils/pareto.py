@@ -0,0 +1,26 @@
+"""
+Non-dominated filter for the multi-objective view of the recommendations (see
+requirement_calc.run_pareto_frontier).
+
+Points are (coverage, cost rating, tool count) with coverage and cost rating maximized and the tool count minimized.
+Sorting by coverage, then cost rating (both descending), then tool count puts every point that weakly dominates
+another one in front of it, so one sweep keeping the best cost rating seen per tool count decides each point against
+everything before it, instead of comparing all pairs.
+"""
+
+
+def pareto_front(points):
+  """
+  Indices of the non-dominated points, in sweep order (coverage descending). Of several equal points the first one
+  is kept.
+  """
+  order = sorted(range(len(points)), key=lambda idx: (-points[idx][0], -points[idx][1], points[idx][2], idx))
+  best_cost = {}  # tool count -> best cost rating of the points swept so far with that many tools
+  front = []
+  for idx in order:
+    _, cost, tool_count = points[idx]
+    if any(count <= tool_count and best >= cost for count, best in best_cost.items()):
+      continue
+    front.append(idx)
+    best_cost[tool_count] = max(best_cost.get(tool_count, cost), cost)
+  return front
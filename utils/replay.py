@@ -0,0 +1,122 @@
+"""
+Record/replay of real Design Recommendation sessions.
+
+Recording is opt-in: with the RECOMMENDATION_RECORD_DIR environment variable set, pages/requirement.py writes every
+new set of engine inputs to that directory as one JSON capture: the re_details rows of the tool stack (the fields the
+engine reads), the weights and payment methods read from priority_data.json, the content hash of the catalog and the
+recommendations computed for the user's payment methods. Captures are anonymized: tool names and IDs become
+placeholders and activities the catalog doesn't offer become "Unlisted activity N", neither of which changes what the
+engine computes. A capture is named by its content hash, so repeated sessions are stored once.
+
+benchmarks/replay.py re-runs a corpus against the current engine and reports timings and output diffs.
+"""
+import hashlib
+import json
+import os
+
+from utils.activity_registry import activity_id
+
+RECORD_DIR = os.environ.get("RECOMMENDATION_RECORD_DIR") or None
+CORPUS_VERSION = 1
+# re_details fields the engine reads
+ROW_FIELDS = ("category", "digitalization", "aiLevel", "synchronization", "needForChange", "isManual")
+
+
+def catalog_hash(def_tools_data):
+  """Content hash of a catalog in catalog order, preference scores left out (they follow the user weights)."""
+  catalog = [
+    [tool_name, {key: value for key, value in info.items() if key != "preference_score"}]
+    for tool_name, info in def_tools_data.items()
+  ]
+  return hashlib.sha256(json.dumps(catalog, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def anonymize_stack(tools_dict, def_tools_data):
+  """The re_details rows of tools_dict with placeholder tool names and IDs, unknown activities renamed."""
+  offered = {activity_id(activity.get("activity", "")) for info in def_tools_data.values() for activity in info.get("activities", [])}
+  unlisted = {}
+  rows = []
+  for tool_number, info in enumerate(tools_dict.values(), 1):
+    for row_number, activity in enumerate(info.get("activities", []), 1):
+      row = {field: activity[field] for field in ROW_FIELDS if field in activity}
+      category = row.get("category")
+      if isinstance(category, str) and category.strip():
+        row_id = activity_id(category.strip().lower())
+        if row_id not in offered:
+          row["category"] = unlisted.setdefault(row_id, f"Unlisted activity {len(unlisted) + 1}")
+      row.update(tool=f"Tool {tool_number}", base_tool_id=f"tool-{tool_number}", id=f"{tool_number}-{row_number}")
+      rows.append(row)
+  return rows
+
+
+def summarize_outcomes(outcomes):
+  """run_all_approaches output ((title, result, score, payment_flag) per approach) as the tool names per approach."""
+  return [
+    {"approach": title, "tools": [tool["tool_name"] for tool in result], "score": score, "payment_flag": payment_flag}
+    for title, result, score, payment_flag in outcomes
+  ]
+
+
+def record_session(record_dir, tools_dict, def_tools_data, weights, user_payment, outcomes, catalog_key=None):
+  """
+  Writes one capture (see the module docstring) to record_dir and returns its path, or None when it can't be
+  written; recording must never break the page. weights: (usability, support, integration, cost); catalog_key:
+  catalog_hash(def_tools_data), when the caller computed it already.
+  """
+  capture = {
+    "version": CORPUS_VERSION,
+    "catalog_hash": catalog_key or catalog_hash(def_tools_data),
+    "re_details": anonymize_stack(tools_dict, def_tools_data),
+    "priority": {"weights": list(weights), "payment_method": list(user_payment)},
+    "outcomes": summarize_outcomes(outcomes),
+  }
+  body = json.dumps(capture, sort_keys=True, default=str)
+  path = os.path.join(record_dir, hashlib.sha256(body.encode("utf-8")).hexdigest()[:16] + ".json")
+  try:
+    os.makedirs(record_dir, exist_ok=True)
+    if not os.path.exists(path):
+      tmp_path = f"{path}.{os.getpid()}.tmp"
+      with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(body)
+      os.replace(tmp_path, path)
+  except OSError:
+    return None
+  return path
+
+
+def load_corpus(corpus_dir):
+  """(path, capture) per capture in corpus_dir, by file name."""
+  for file_name in sorted(os.listdir(corpus_dir)):
+    if file_name.endswith(".json"):
+      path = os.path.join(corpus_dir, file_name)
+      with open(path, "r", encoding="utf-8") as f:
+        yield path, json.load(f)
+
+
+def session_inputs(capture):
+  """tools_dict (grouped by base_tool_id as pages/requirement.py does), weights and user_payment of a capture."""
+  from utils.requirement_calc import tool_priorizitation
+
+  tools_dict = {}
+  for row in capture["re_details"]:
+    tool = tools_dict.setdefault(row["base_tool_id"], {"activities": [], "tool_name": row["tool"]})
+    tool["activities"].append(dict(row))
+  for tool_info in tools_dict.values():
+    tool_info["prio_score"] = tool_priorizitation(tool_info["activities"])
+  return tools_dict, tuple(capture["priority"]["weights"]), list(capture["priority"]["payment_method"])
+
+
+def diff_outcomes(recorded, replayed, tolerance=1e-9):
+  """Descriptions of the differences between two summarize_outcomes lists; empty when they agree."""
+  diffs = []
+  if [outcome["approach"] for outcome in recorded] != [outcome["approach"] for outcome in replayed]:
+    return ["approaches differ"]
+  for before, after in zip(recorded, replayed):
+    title = before["approach"]
+    if before["tools"] != after["tools"]:
+      diffs.append(f"{title}: tools {before['tools']} -> {after['tools']}")
+    if abs((before["score"] or 0.0) - (after["score"] or 0.0)) > tolerance:
+      diffs.append(f"{title}: score {before['score']} -> {after['score']}")
+    if before["payment_flag"] != after["payment_flag"]:
+      diffs.append(f"{title}: payment flag {before['payment_flag']} -> {after['payment_flag']}")
+  return diffs
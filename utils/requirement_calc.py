@@ -1,109 +1,76 @@
-import streamlit as st
-import pandas as pd
+import numpy as np
+import os
+import time
+import contextvars
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
 
-from utils.utils import (
-    JSON_PRIO_DATA_PATH,
+from utils import instrumentation
+from utils.catalog_matrix import payment_methods_of, build_activity_tool_index, catalog_attribute, NEAR_TIE
+from utils.score_memo import ScoreMemo, requirement_key, CATALOG_SCORES
+from utils.activity_registry import activity_id, flat_activity_id
+from utils.option_codecs import (
+  AUTOMATION, AI_LEVEL, SYNCHRONIZATION, NEED_FOR_CHANGE, PAYMENT_METHOD, tool_activity_codes,
+  ActivityCodes,
 )
+from data.SelectValues import PaymentMethodOptions
+
+# Implementation behind the run_* approaches: "classic" (the dict/list code in this module, scoring the catalog in
+# vectorized batches) or "lazy" (utils.cover_engine, the same results computed on activity bitsets with lazy greedy
+# covering loops). Classic is at least as fast on the catalog sizes measured (benchmarks.compare_engines); the bitset
+# engine is what top_k, run_exact_total_score and run_beam_search are built on
+ENGINES = ("classic", "lazy")
+RECOMMENDATION_ENGINE = os.environ.get("RECOMMENDATION_ENGINE", "classic")
+
+def resolve_engine(engine=None):
+  engine = engine or RECOMMENDATION_ENGINE
+  if engine not in ENGINES:
+    raise ValueError(f"Unknown recommendation engine '{engine}', expected one of {ENGINES}")
+  return engine
 
 def get_nfc_score(nfc):
-  if nfc == "No need to change":
-    return 1
-  elif nfc == "Nice to change":
-    return 2
-  elif nfc == "Must change":
-    return 3
-  else:
-    return 0
+  return NEED_FOR_CHANGE.encode(nfc)
 
 def tool_priorizitation(activities):
   activity_count = len(activities)
   activity_calc = 0
   for activity in activities:
     nfc = activity.get("needForChange", "No need to change")
-    nfc_score = get_nfc_score(nfc)
-    activity["nfc_score"] = nfc_score  # Store the score back in the activity
-    activity_calc += nfc_score
+    activity_calc += get_nfc_score(nfc)
   
   return float(activity_calc / activity_count) if activity_count > 0 else 0
 
+# Option string <-> score code conversions (utils.option_codecs); the engine loops work on the codes, the *_to_str
+# functions turn them back into labels for display
 def get_ai_score(level):
-  if level == "No":
-    return 1
-  elif level == "Descriptive":
-    return 2
-  elif level == "Diagnostic":
-    return 3
-  elif level == "Predictive":
-    return 4
-  elif level == "Prescriptive":
-    return 5
-  else:
-    return 0
+  return AI_LEVEL.encode(level)
 
 def ai_score_to_str(score):
-  mapping = {
-    1: "No",
-    2: "Descriptive",
-    3: "Diagnostic",
-    4: "Predictive",
-    5: "Prescriptive"
-  }
-  return mapping.get(score, "Unknown")
+  return AI_LEVEL.decode(score)
 
 def get_automation_score(option):
-  if option == "Manual":
-    return 0
-  elif option == "Automated":
-    return 1
-  elif option == "AI-Asisted":
-    return 2
-  elif option == "AI-Driven Automation":
-    return 3
-  else:
-    return 0
+  return AUTOMATION.encode(option)
 
 def automation_score_to_str(score):
-  mapping = {
-    0: "Manual",
-    1: "Automated",
-    2: "AI-Asisted",
-    3: "AI-Driven Automation"
-  }
-  return mapping.get(score, "Unknown")
+  return AUTOMATION.decode(score)
 
 def get_sync_score(option):
-  if option == "Ad-Hoc File Sharing":
-    return 1
-  elif option == "Planned Batch Exchange":
-    return 2
-  elif option == "Standardized Data Interfaces":
-    return 3
-  elif option == "Real-Time Ecosystem Integration":
-    return 4
-  else:
-    return 0
+  return SYNCHRONIZATION.encode(option)
 
 def sync_score_to_str(score):
-  mapping = {
-    1: "Ad-Hoc File Sharing",
-    2: "Planned Batch Exchange",
-    3: "Standardized Data Interfaces",
-    4: "Real-Time Ecosystem Integration"
-  }
-  return mapping.get(score, "Unknown")
+  return SYNCHRONIZATION.decode(score)
 
 def get_payment_method_score(methods):
-  payments = []
-  for method in methods:
-    if method == "Licensed":
-      payments.append(1)
-    elif method == "Subscription-based":
-      payments.append(2)
-    elif method == "Pay-Per-Use":
-      payments.append(3)
+  payments = [code for code in map(PAYMENT_METHOD.encode, methods) if code]
   return payments if payments else [0]
   
 def read_user_preference_scores():
+  # Page helper reading data/priority_data.json; imported here so the engine itself stays free of pandas and of the
+  # directory setup of utils.utils
+  import pandas as pd
+  from utils.utils import JSON_PRIO_DATA_PATH
   try:
     priority_data = pd.read_json(JSON_PRIO_DATA_PATH, orient='records')
   except FileNotFoundError:
@@ -118,11 +85,11 @@ def read_user_preference_scores():
   return user_usability, user_support, user_integration, user_cost, user_payment
 
 def calculate_tool_preference_score(def_tool_info, user_usability, user_support, user_integration, user_cost):
-  def_tool_integration = def_tool_info.get("integration", 0)
-  def_tool_usability = def_tool_info.get("usability", 0)
-  def_tool_cost = def_tool_info.get("cost", 0)
-  def_tool_support = def_tool_info.get("support", 0)
-  def_tool_functionality = def_tool_info.get("functionality", 0)
+  def_tool_integration = catalog_attribute(def_tool_info, "integration")
+  def_tool_usability = catalog_attribute(def_tool_info, "usability")
+  def_tool_cost = catalog_attribute(def_tool_info, "cost")
+  def_tool_support = catalog_attribute(def_tool_info, "support")
+  def_tool_functionality = catalog_attribute(def_tool_info, "functionality")
 
   return ((def_tool_usability * user_usability) +
           (def_tool_support * user_support) +
@@ -137,12 +104,30 @@ def calculate_def_tools_preference_scores(def_tool_info, user_usability, user_su
     calculate_tool_preference_score(def_tool_info, user_usability, user_support, user_integration, user_cost)
   )
 
-def calculate_digitalization_capability_scores(flat_activities, def_activities, def_automation, def_ai_level, def_syncronization):
+def assign_preference_scores(def_tools_data, user_usability, user_support, user_integration, user_cost, catalog=None):
+  """
+  calculate_def_tools_preference_scores for every catalog tool. With the CatalogMatrix of def_tools_data the scores
+  come from one vectorized pass over its attribute arrays (CatalogMatrix.preference_scores). This is the only part of a
+  rerun after a weight change that depends on the weights; the rest of the rerun reuses the tool scores of the memo
+  passed to it.
+  """
+  if catalog is None or catalog.tool_names != list(def_tools_data):
+    for def_tool_info in def_tools_data.values():
+      calculate_def_tools_preference_scores(def_tool_info, user_usability, user_support, user_integration, user_cost)
+    return
+  preference_scores = catalog.preference_scores(user_usability, user_support, user_integration, user_cost)
+  for def_tool_info, preference_score in zip(def_tools_data.values(), preference_scores.tolist()):
+    def_tool_info["preference_score"] = preference_score
+
+def calculate_digitalization_capability_scores(flat_activities, def_activities, def_automation, def_ai_level, def_syncronization, coverage=None):
+  # coverage: optional per flat activity flags (from CatalogMatrix.coverage_flags) replacing the name matching below
   # digitalization score calculation
   digitalization_score = 0
   capability_score = 0
   total_nfc = 0
-  for activity in flat_activities:
+  if coverage is None:
+    def_activity_ids = {activity_id(def_act.get("activity", "")) for def_act in def_activities}
+  for idx, activity in enumerate(flat_activities):
     automation_score = activity.get("digitalization", 0)
     ai_level_score = activity.get("aiLevel", 0)
     sync_score = activity.get("synchronization", 0)
@@ -160,8 +145,10 @@ def calculate_digitalization_capability_scores(flat_activities, def_activities,
 
     # capability score calculation
     # find the matching def tool activity
-    activity_name = activity.get("activity_name", "").strip().lower()
-    matching_def_activity = next((def_act for def_act in def_activities if def_act.get("activity", "").strip().lower() == activity_name), None)
+    if coverage is not None:
+      matching_def_activity = coverage[idx]
+    else:
+      matching_def_activity = flat_activity_id(activity) in def_activity_ids
     if matching_def_activity:
       capability_score += nfc_score
 
@@ -178,43 +165,156 @@ def calculate_digitalization_capability_scores(flat_activities, def_activities,
   return total_digi_score, total_cap_score
 
 
-def find_highest_scorer(def_tools_data, flat_activities, force_all_activities=False):
+def score_def_tool(def_tool_name, def_tool_info, flat_activities, coverage=None, memo=None, token=None):
+  # memo: optional ScoreMemo (utils.score_memo) holding the scores of flat_activities under token
+  def_automation = catalog_attribute(def_tool_info, "automation")
+  def_ai_level = catalog_attribute(def_tool_info, "ai_level")
+  def_syncronization = catalog_attribute(def_tool_info, "syncronization")
+  scores = memo.get(def_tool_name, token) if memo is not None else None
+  if scores is None:
+    scores = calculate_digitalization_capability_scores(
+      flat_activities, def_tool_info.get("activities", []), def_automation, def_ai_level, def_syncronization, coverage
+    )
+    if memo is not None:
+      memo.put(def_tool_name, token, scores)
+  digi_score, cap_score = scores
+  return {
+    "tool_name": def_tool_name,
+    "total_score": float(digi_score * cap_score * def_tool_info.get("preference_score", 0.0)),
+    "digi_score": digi_score,
+    "cap_score": cap_score,
+    "preference_score": def_tool_info.get("preference_score", 0.0),
+    "automation": automation_score_to_str(def_automation),
+    "ai_level": ai_score_to_str(def_ai_level),
+    "synchronization": sync_score_to_str(def_syncronization),
+  }
+
+def find_highest_scorer(def_tools_data, flat_activities, force_all_activities=False, catalog=None, memo=None):
+  # catalog: optional CatalogMatrix of def_tools_data; all tools are then scored in one batch (see
+  # find_highest_scorer_batched) and activities are matched on the incidence matrix instead of by name
+  # memo: optional ScoreMemo shared by the passes of one request
+  profile = instrumentation.active_profile()
+  if profile is not None:
+    profile.count("find_highest_scorer")
+  if catalog is not None and all(def_tool_name in catalog.tool_index for def_tool_name in def_tools_data):
+    return find_highest_scorer_batched(def_tools_data, flat_activities, catalog, force_all_activities, memo)
+  token = memo.token(requirement_key(flat_activities)) if memo is not None else None
   highest_scorer = None
   highest_score = -1
-  flat_activity_names = {a.get("activity_name", "").strip().lower() for a in flat_activities}
+  flat_activity_ids = {flat_activity_id(a) for a in flat_activities}
   for def_tool_name, def_tool_info in def_tools_data.items():
-    def_automation = def_tool_info.get("automation", -1)
-    def_ai_level = def_tool_info.get("ai_level", -1)
-    def_syncronization = def_tool_info.get("syncronization", -1)
-    def_activities = def_tool_info.get("activities", [])
-    def_activity_names = {a.get("activity", "").strip().lower() for a in def_activities}
-    if force_all_activities and not flat_activity_names.issubset(def_activity_names):
-      continue
-    digi_score, cap_score = calculate_digitalization_capability_scores(
-      flat_activities, def_activities, def_automation, def_ai_level, def_syncronization
-    )
-    total_score = float(digi_score * cap_score * def_tool_info.get("preference_score", 0.0))
-    if total_score > highest_score:
-      highest_score = total_score
-      highest_scorer = {
-        "tool_name": def_tool_name,
-        "total_score": total_score,
-        "digi_score": digi_score,
-        "cap_score": cap_score,
-        "preference_score": def_tool_info.get("preference_score", 0.0),
-        "automation": automation_score_to_str(def_automation),
-        "ai_level": ai_score_to_str(def_ai_level),
-        "synchronization": sync_score_to_str(def_syncronization),
-      }
+    if force_all_activities:
+      def_activity_ids = {activity_id(a.get("activity", "")) for a in def_tool_info.get("activities", [])}
+      if not flat_activity_ids.issubset(def_activity_ids):
+        continue
+    scorer = score_def_tool(def_tool_name, def_tool_info, flat_activities, memo=memo, token=token)
+    if profile is not None:
+      profile.count("tools_scored")
+    if scorer["total_score"] > highest_score:
+      highest_score = scorer["total_score"]
+      highest_scorer = scorer
+  return highest_scorer
+
+def find_highest_scorer_batched(def_tools_data, flat_activities, catalog, force_all_activities=False, memo=None):
+  """
+  find_highest_scorer as an argmax over CatalogMatrix.digitalization_capability_scores. Tools within NEAR_TIE of the
+  best batched total are re-scored with the scalar code and compared in catalog order, so the pick and the returned
+  scores are the same as the scalar scan's.
+  """
+  tool_names = list(def_tools_data)
+  rows = np.array([catalog.tool_index[def_tool_name] for def_tool_name in tool_names], dtype=int)
+  flat_activity_ids = [flat_activity_id(a) for a in flat_activities]
+  if force_all_activities and len(rows):
+    eligible = catalog.covers_all_mask(flat_activity_ids)[rows]
+    tool_names = [def_tool_name for def_tool_name, keep in zip(tool_names, eligible) if keep]
+    rows = rows[eligible]
+  if not tool_names:
+    return None
+  profile = instrumentation.active_profile()
+  if profile is not None:
+    profile.count("tools_scored", len(tool_names))
+  token = memo.token(requirement_key(flat_activities)) if memo is not None else None
+  scores = memo.get(CATALOG_SCORES, token) if memo is not None else None
+  if scores is None:
+    scores = catalog.digitalization_capability_scores(flat_activities)
+    if memo is not None:
+      memo.put(CATALOG_SCORES, token, scores)
+  digi_scores, cap_scores = scores[0][rows], scores[1][rows]
+  preference_scores = np.array([def_tools_data[def_tool_name].get("preference_score", 0.0) for def_tool_name in tool_names], dtype=float)
+  totals = digi_scores * cap_scores * preference_scores
+  # The scan only takes totals above its start value of -1, so NaN totals (e.g. of a NaN preference score) never win
+  valid = totals > -1
+  if not valid.any():
+    return None
+  best = totals[valid].max()
+  if best > 0:
+    contenders = np.flatnonzero(valid & (totals >= (best - best * NEAR_TIE if np.isfinite(best) else best)))
+  else:
+    # Nothing above 0: the scan keeps the first tool with the best total
+    contenders = np.flatnonzero(valid & (totals >= best))[:1]
+  highest_scorer = None
+  for idx in contenders:
+    def_tool_name = tool_names[idx]
+    coverage = catalog.coverage_flags(def_tool_name, flat_activity_ids)
+    scorer = score_def_tool(def_tool_name, def_tools_data[def_tool_name], flat_activities, coverage, memo, token)
+    if highest_scorer is None or scorer["total_score"] > highest_scorer["total_score"]:
+      highest_scorer = scorer
   return highest_scorer
 
-def run_forced_exchange_approach(tools_dict, def_tools_data, user_payment = None):
+def find_highest_touching_scorer(def_tools_data, flat_activities, activity_index, catalog=None, drain=False, memo=None):
+  """
+  Same pick as find_highest_scorer, but only the tools offering at least one of flat_activities (looked up in
+  activity_index, see build_activity_tool_index) are scored. Every other tool scores exactly 0, so it can only win
+  when no touching tool scores above 0; then the unrestricted scan returns the first remaining tool.
+  With drain=True (covering loops, where activities are only ever removed) tools that touch nothing can never cover
+  anything again, so they are skipped for good and None is returned once no touching tool is left.
+  """
+  touching = set()
+  for activity in flat_activities:
+    touching |= activity_index.get(flat_activity_id(activity), set())
+  candidates = {k: v for k, v in def_tools_data.items() if k in touching}
+  highest = find_highest_scorer(candidates, flat_activities, catalog=catalog, memo=memo)
+  if drain or (highest and highest["total_score"] > 0):
+    return highest
+  first_tool = next(iter(def_tools_data), None)
+  if first_tool is None:
+    return None
+  return find_highest_scorer({first_tool: def_tools_data[first_tool]}, flat_activities, catalog=catalog, memo=memo)
+
+def _pick(steps, find, def_tools_data, flat_activities, *args, **kwargs):
+  # A greedy decision of the classic approaches: find(def_tools_data, flat_activities, ...), or through the steps
+  # of the run (PaymentFallbackSteps, StepLog)
+  if steps is None:
+    return find(def_tools_data, flat_activities, *args, **kwargs)
+  return steps.pick(find, def_tools_data, flat_activities, *args, **kwargs)
+
+def filter_def_tools_by_payment(def_tools_data, user_payment, catalog=None):
+  """Catalog tools accepting at least one of the user's payment methods (all tools when no preference is given)."""
+  if not (user_payment and isinstance(user_payment, (list, tuple, set))):
+    return def_tools_data.copy()
+  accepted = catalog.payment_filter(user_payment) if catalog is not None else None
+  filtered = {}
+  for k, v in def_tools_data.items():
+    idx = catalog.tool_index.get(k) if catalog is not None else None
+    if idx is not None:
+      if accepted[idx]:
+        filtered[k] = v
+    elif any(pm in user_payment for pm in payment_methods_of(v)):
+      filtered[k] = v
+  return filtered
+
+def run_forced_exchange_approach(tools_dict, def_tools_data, user_payment = None, catalog=None, engine=None, memo=None, top_k=None, steps=None):
+  engine = resolve_engine(engine)
+  if top_k:
+    return top_k_stacks(run_forced_exchange_approach, tools_dict, def_tools_data, user_payment, catalog, engine, memo, top_k)
+  if engine != "classic":
+    from utils import cover_engine
+    return cover_engine.run_forced_exchange_approach(tools_dict, def_tools_data, user_payment, catalog, memo=memo)
   # st.write("### Forced Exchange Approach Results:")
   if not tools_dict:
     return []
 
-  copy_tools_dict = tools_dict.copy()
-  surpluss_activities = flatten_activities(copy_tools_dict, only_manual=True)
+  surpluss_activities, copy_tools_dict = split_manual_activities(tools_dict)
 
   ordered_tools = sorted(
     copy_tools_dict.items(),
@@ -222,13 +322,8 @@ def run_forced_exchange_approach(tools_dict, def_tools_data, user_payment = None
     reverse=True
   )
   
-  if user_payment and isinstance(user_payment, (list, tuple, set)):
-    def_tools_data_copy = {
-      k: v for k, v in def_tools_data.items()
-      if any(pm in user_payment for pm in (v.get("payment_method") if isinstance(v.get("payment_method"), (list, tuple, set)) else [v.get("payment_method")]))
-    }
-  else:
-    def_tools_data_copy = def_tools_data.copy()
+  def_tools_data_copy = filter_def_tools_by_payment(def_tools_data, user_payment, catalog)
+  activity_index = catalog.activity_tools if catalog is not None else build_activity_tool_index(def_tools_data_copy)
 
   results = []
   if not def_tools_data_copy:
@@ -236,30 +331,35 @@ def run_forced_exchange_approach(tools_dict, def_tools_data, user_payment = None
   
   for tool_id, info in ordered_tools:
     flatten_tool_activities = flatten_activities({tool_id: info})
-    highest = find_highest_scorer(def_tools_data_copy, flatten_tool_activities, True)
+    highest = _pick(steps, find_highest_scorer, def_tools_data_copy, flatten_tool_activities, True, catalog, memo)
     # st.write(f"Forced Exchange - Highest for Tool ID {tool_id}")
     # st.write(highest)
     surpluss_activities.extend(flatten_tool_activities)
     if highest:
-      cover_calcs(highest, surpluss_activities, def_tools_data_copy, results)
+      cover_calcs(highest, surpluss_activities, def_tools_data_copy, results, catalog)
   
   # After looping through ordered_tools, cover any remaining surpluss_activities
   while surpluss_activities and def_tools_data_copy:
-    highest = find_highest_scorer(def_tools_data_copy, surpluss_activities)
+    highest = _pick(steps, find_highest_touching_scorer, def_tools_data_copy, surpluss_activities, activity_index, catalog, drain=True, memo=memo)
     if not highest:
       break
-    cover_calcs(highest, surpluss_activities, def_tools_data_copy, results)
+    cover_calcs(highest, surpluss_activities, def_tools_data_copy, results, catalog)
 
   score = calculate_recommendation_score(tools_dict, results)
   # st.write(results)
   return [results, score]
 
-def run_one_by_one_exchange_approach(tools_dict, def_tools_data, user_payment = None):
+def run_one_by_one_exchange_approach(tools_dict, def_tools_data, user_payment = None, catalog=None, engine=None, memo=None, top_k=None, steps=None):
+  engine = resolve_engine(engine)
+  if top_k:
+    return top_k_stacks(run_one_by_one_exchange_approach, tools_dict, def_tools_data, user_payment, catalog, engine, memo, top_k)
+  if engine != "classic":
+    from utils import cover_engine
+    return cover_engine.run_one_by_one_exchange_approach(tools_dict, def_tools_data, user_payment, catalog, memo=memo)
   if not tools_dict:
     return []
   
-  copy_tools_dict = tools_dict.copy()
-  surpluss_activities = flatten_activities(copy_tools_dict, only_manual=True)
+  surpluss_activities, copy_tools_dict = split_manual_activities(tools_dict)
   # st.write(f"Surpluss Activities (Manual):")
   # st.write(surpluss_activities)
   
@@ -269,13 +369,8 @@ def run_one_by_one_exchange_approach(tools_dict, def_tools_data, user_payment =
     reverse=True
   )
 
-  if user_payment and isinstance(user_payment, (list, tuple, set)):
-    def_tools_data_copy = {
-      k: v for k, v in def_tools_data.items()
-      if any(pm in user_payment for pm in (v.get("payment_method") if isinstance(v.get("payment_method"), (list, tuple, set)) else [v.get("payment_method")]))
-    }
-  else:
-    def_tools_data_copy = def_tools_data.copy()
+  def_tools_data_copy = filter_def_tools_by_payment(def_tools_data, user_payment, catalog)
+  activity_index = catalog.activity_tools if catalog is not None else build_activity_tool_index(def_tools_data_copy)
 
   results = []
 
@@ -283,16 +378,10 @@ def run_one_by_one_exchange_approach(tools_dict, def_tools_data, user_payment =
     return [results, 0.0]
 
   for tool_id, info in ordered_tools:
-    activities = info.get("activities", []) or []
-    for activity in activities:
-      activity_name = activity.get("category", "N/A").strip().lower()
-      digitalization_score = get_automation_score(activity.get("digitalization", "Automated"))
-      ai_level_score = get_ai_score(activity.get("aiLevel", "No"))
-      sync_score = get_sync_score(activity.get("synchronization", "Ad-Hoc File Sharing"))
-      nfc_score = activity.get("nfc_score", 0)
+    for activity_name, row_id, digitalization_score, ai_level_score, sync_score, nfc_score, _ in tool_activity_codes(info):
 
       # Check if activity already exists in surpluss_activities
-      existing = next((act for act in surpluss_activities if act["activity_name"] == activity_name), None)
+      existing = next((act for act in surpluss_activities if act["activity_id"] == row_id), None)
       if existing:
         # Update scores if new ones are higher
         existing["digitalization"] = max(existing["digitalization"], digitalization_score)
@@ -302,21 +391,23 @@ def run_one_by_one_exchange_approach(tools_dict, def_tools_data, user_payment =
       else:
         surpluss_activities.append({
           "activity_name": activity_name,
+          "activity_id": row_id,
           "digitalization": digitalization_score,
           "aiLevel": ai_level_score,
           "synchronization": sync_score,
           "nfc_score": nfc_score
         })
       
-    highest = find_highest_scorer(def_tools_data_copy, surpluss_activities)
-    cover_calcs(highest, surpluss_activities, def_tools_data_copy, results)
+    highest = _pick(steps, find_highest_touching_scorer, def_tools_data_copy, surpluss_activities, activity_index, catalog, memo=memo)
+    if highest:
+      cover_calcs(highest, surpluss_activities, def_tools_data_copy, results, catalog)
 
   # After looping through ordered_tools, cover any remaining surpluss_activities
   while surpluss_activities and def_tools_data_copy:
-    highest = find_highest_scorer(def_tools_data_copy, surpluss_activities)
+    highest = _pick(steps, find_highest_touching_scorer, def_tools_data_copy, surpluss_activities, activity_index, catalog, drain=True, memo=memo)
     if not highest:
       break
-    cover_calcs(highest, surpluss_activities, def_tools_data_copy, results)
+    cover_calcs(highest, surpluss_activities, def_tools_data_copy, results, catalog)
 
   # st.write("### One-by-One Exchange Approach Results:")
   # st.write(results)
@@ -324,35 +415,40 @@ def run_one_by_one_exchange_approach(tools_dict, def_tools_data, user_payment =
   return [results, score]
 
 def flatten_activities(tools_dict, only_manual=False):
+  return _flatten_activities(tools_dict, only_manual)[0]
+
+def split_manual_activities(tools_dict):
+  """
+  Flat manual activities, and the tools of tools_dict except those that contributed one of them. tools_dict is not
+  modified, the remaining tools come back as a new dict.
+  """
+  flat_activities, contributing_tools = _flatten_activities(tools_dict, only_manual=True)
+  return flat_activities, {k: v for k, v in tools_dict.items() if k not in contributing_tools}
+
+def _flatten_activities(tools_dict, only_manual=False):
   flat_activities = []
   activity_map = {}
   tools_to_remove = set()
 
   for tool_id, info in tools_dict.items():
-    activities = info.get("activities", []) or []
-    for activity in activities:
-      if not isinstance(activity, dict):
-        continue
-      if only_manual and not activity.get("isManual", False):
+    for activity_name, row_id, digitalization_score, ai_level_score, sync_score, nfc_score, is_manual in tool_activity_codes(info):
+      if only_manual and not is_manual:
         continue
-      activity_name = activity.get("category", "N/A").strip().lower()
-      digitalization_score = get_automation_score(activity.get("digitalization", "Automated"))
-      ai_level_score = get_ai_score(activity.get("aiLevel", "No"))
-      sync_score = get_sync_score(activity.get("synchronization", "Ad-Hoc File Sharing"))
-      nfc_score = activity.get("nfc_score", 0)
-
-      if activity_name in activity_map:
-        prev = activity_map[activity_name]
-        activity_map[activity_name] = {
-          "activity_name": activity_name,
+
+      if row_id in activity_map:
+        prev = activity_map[row_id]
+        activity_map[row_id] = {
+          "activity_name": prev["activity_name"],
+          "activity_id": row_id,
           "digitalization": max(prev["digitalization"], digitalization_score),
           "aiLevel": max(prev["aiLevel"], ai_level_score),
           "synchronization": max(prev["synchronization"], sync_score),
           "nfc_score": max(prev["nfc_score"], nfc_score)
         }
       else:
-        activity_map[activity_name] = {
+        activity_map[row_id] = {
           "activity_name": activity_name,
+          "activity_id": row_id,
           "digitalization": digitalization_score,
           "aiLevel": ai_level_score,
           "synchronization": sync_score,
@@ -363,70 +459,270 @@ def flatten_activities(tools_dict, only_manual=False):
 
   flat_activities = list(activity_map.values())
 
-  # Remove tools from tools_dict if only_manual is True and they contributed activities
-  if only_manual:
-    for tool_id in tools_to_remove:
-      tools_dict.pop(tool_id, None)
-
-  return flat_activities
+  # With only_manual, the tools that contributed activities (callers drop them from the tool stack)
+  return flat_activities, tools_to_remove
 
-def run_total_score_prioritization(tools_dict, def_tools_data, user_payment = None):
+def run_total_score_prioritization(tools_dict, def_tools_data, user_payment = None, catalog=None, engine=None, memo=None, top_k=None, steps=None):
+  engine = resolve_engine(engine)
+  if top_k:
+    return top_k_stacks(run_total_score_prioritization, tools_dict, def_tools_data, user_payment, catalog, engine, memo, top_k)
+  if engine != "classic":
+    from utils import cover_engine
+    return cover_engine.run_total_score_prioritization(tools_dict, def_tools_data, user_payment, catalog, memo=memo)
   if not tools_dict:
     return []
   
   flat_activities = flatten_activities(tools_dict)
   # st.write(f"Flat Activities: {flat_activities}")
-  if user_payment and isinstance(user_payment, (list, tuple, set)):
-    def_tools_data_copy = {
-      k: v for k, v in def_tools_data.items()
-      if any(pm in user_payment for pm in (v.get("payment_method") if isinstance(v.get("payment_method"), (list, tuple, set)) else [v.get("payment_method")]))
-    }
-  else:
-    def_tools_data_copy = def_tools_data.copy()
+  def_tools_data_copy = filter_def_tools_by_payment(def_tools_data, user_payment, catalog)
+  activity_index = catalog.activity_tools if catalog is not None else build_activity_tool_index(def_tools_data_copy)
   results = []
 
   if not def_tools_data_copy:
     return [results, 0.0]
 
   while flat_activities and def_tools_data_copy:
-    highest = find_highest_scorer(def_tools_data_copy, flat_activities)
+    highest = _pick(steps, find_highest_touching_scorer, def_tools_data_copy, flat_activities, activity_index, catalog, drain=True, memo=memo)
     if not highest:
       break
-    cover_calcs(highest, flat_activities, def_tools_data_copy, results)
+    cover_calcs(highest, flat_activities, def_tools_data_copy, results, catalog)
 
   # st.write("### Total Score Prioritization Results:")
   # st.write(results)
   score = calculate_recommendation_score(tools_dict, results)
   return [results, score]
 
-def cover_calcs(highest, flat_activities, def_tools_data_copy, results):
+def cover_calcs(highest, flat_activities, def_tools_data_copy, results, catalog=None):
+  profile = instrumentation.active_profile()
+  start = time.perf_counter() if profile is not None else None
   tool_name = highest["tool_name"]
   score = highest["total_score"]
   tool_info = def_tools_data_copy.get(tool_name, {})
   activities = tool_info.get("activities", [])
-  # Find which activities this tool covers
-  covered = []
-  for activity in activities:
-    activity_name = activity.get("activity", "N/A").strip().lower()
-    for flat_act in flat_activities:
-      if flat_act.get("activity_name", "").strip().lower() == activity_name:
-        covered.append(activity_name)
-        break
-  if covered:
+  # Find which activities this tool covers, in catalog order and named as in flat_activities
+  flat_activity_names = {}
+  for fa in flat_activities:
+    flat_activity_names.setdefault(flat_activity_id(fa), fa.get("activity_name", ""))
+  if catalog is not None and tool_name in catalog.tool_index:
+    tool_activity_ids = catalog.tool_activity_ids[catalog.tool_index[tool_name]]
+  else:
+    tool_activity_ids = [activity_id(activity.get("activity", "N/A")) for activity in activities]
+  covered_ids = [tool_activity_id for tool_activity_id in tool_activity_ids if tool_activity_id in flat_activity_names]
+  if covered_ids:
+    covered = [flat_activity_names[covered_id] for covered_id in covered_ids]
     results.append({"tool_name": tool_name, "score": score, "activities": covered, **highest})
     # Remove covered activities from flat_activities
-    flat_activities[:] = [fa for fa in flat_activities if fa.get("activity_name", "").strip().lower() not in covered]
+    covered_ids = set(covered_ids)
+    flat_activities[:] = [fa for fa in flat_activities if flat_activity_id(fa) not in covered_ids]
   # Remove this tool from further consideration
   def_tools_data_copy.pop(tool_name, None)
+  if profile is not None:
+    profile.count("picks")
+    profile.add_time("cover_calcs", time.perf_counter() - start)
+
+# Default wall-clock budget (seconds) of run_exact_total_score
+EXACT_TIME_BUDGET = 2.0
+
+def run_exact_total_score(tools_dict, def_tools_data, user_payment=None, catalog=None, time_budget=EXACT_TIME_BUDGET, memo=None):
+  """
+  Exact solver for the objective of run_total_score_prioritization: the stack maximizing
+  calculate_recommendation_score when every pick covers the flat activities it offers among those still remaining,
+  scored (digi * cap * preference) against them as the greedy approach scores it.
+  Branch-and-bound over the remaining activities as bitsets (cover_engine). The value of what is left only depends on
+  the remaining set, so a remaining set reached again is solved once (dominance between paths), and among tools
+  covering the same remaining entries only the best scoring one is branched on. A subtree is cut when its value so far
+  plus an upper bound (every activity credited the highest preference_score of the tools offering it) can't beat the
+  incumbent, which starts as the greedy solution.
+  Stops after time_budget seconds with the best stack found so far. Returns [results, score, report] with results and
+  score as the approaches return them and report a dict: greedy_score, improvement (score - greedy_score),
+  upper_bound (proven bound on the optimal score), gap (upper_bound - score, 0 once optimality is proven), optimal,
+  timed_out, nodes and seconds.
+  """
+  if not tools_dict:
+    return []
+  from utils import cover_engine
+  start = time.perf_counter()
+  deadline = start + time_budget
+  engine = cover_engine.CoverEngine(def_tools_data, catalog, memo=memo)
+  candidates = engine.payment_candidates(user_payment)
+  table = engine.new_table(flatten_activities(tools_dict))
+  total_activities = find_number_of_unique_activities(tools_dict)
+
+  # Activities a pick reports, as cover_calcs counts them: one per catalog activity of the tool still remaining
+  tool_multiplicity = []
+  for activity_ids in engine.catalog.tool_activity_ids:
+    multiplicity = {}
+    for tool_activity_id in activity_ids:
+      bits = table.by_id.get(tool_activity_id, 0)
+      if bits:
+        multiplicity[bits] = multiplicity.get(bits, 0) + 1
+    tool_multiplicity.append(multiplicity)
+  # Upper bound of what covering an entry can add to the objective (a pick scores at most its preference_score)
+  entry_credit = [0.0] * len(table)
+  for tool_idx in cover_engine.iter_bits(candidates):
+    for bits, times in tool_multiplicity[tool_idx].items():
+      for idx in cover_engine.iter_bits(bits):
+        entry_credit[idx] = max(entry_credit[idx], times * max(engine.preference[tool_idx], 0.0))
+
+  def bound(remaining):
+    return sum(entry_credit[idx] for idx in cover_engine.iter_bits(remaining))
+
+  def pick_value(remaining, tool_idx, level_sums, total_nfc):
+    # (covered activities) * total_score of the tool picked at this state
+    if not total_nfc:
+      return 0.0
+    covered = sum(times for bits, times in tool_multiplicity[tool_idx].items() if bits & remaining)
+    return covered * engine.key(table, remaining, tool_idx, level_sums) / (3 * total_nfc * total_nfc)
+
+  def children(remaining):
+    level_sums = {}
+    total_nfc = table.weighted_count(remaining)
+    best = {}
+    for tool_idx in cover_engine.iter_bits(engine.touching(table, remaining) & candidates):
+      covered = table.tool_bits.get(engine.tool_names[tool_idx], 0) & remaining
+      value = pick_value(remaining, tool_idx, level_sums, total_nfc)
+      if covered not in best or value > best[covered][0]:
+        best[covered] = (value, tool_idx)
+    return sorted(((value, tool_idx, remaining & ~covered) for covered, (value, tool_idx) in best.items()), reverse=True)
+
+  # The greedy stack is the first incumbent
+  greedy_results = []
+  if candidates:
+    engine.drain(table, table.all_bits, candidates, greedy_results)
+  greedy_score = calculate_recommendation_score(tools_dict, greedy_results) if candidates else 0.0
+  greedy_value = 0.0
+  remaining = table.all_bits
+  for result in greedy_results:
+    tool_idx = engine.catalog.tool_index[result["tool_name"]]
+    greedy_value += pick_value(remaining, tool_idx, {}, table.weighted_count(remaining))
+    remaining &= ~table.tool_bits.get(result["tool_name"], 0)
+
+  solved = {}  # remaining bits -> (best value found, upper bound, first pick of the best)
+  incumbent = greedy_value
+  nodes = 0
+  timed_out = False
+
+  def solve(remaining, value_so_far):
+    nonlocal incumbent, nodes, timed_out
+    known = solved.get(remaining)
+    if known is not None and (known[0] >= known[1] or value_so_far + known[1] <= incumbent):
+      return known[0], known[1]
+    if timed_out or time.perf_counter() > deadline:
+      timed_out = True
+      return (known[0], known[1]) if known is not None else (0.0, bound(remaining))
+    nodes += 1
+    best, upper, best_pick = 0.0, 0.0, None
+    for value, tool_idx, rest in children(remaining):
+      known_rest = solved.get(rest)
+      rest_upper = known_rest[1] if known_rest is not None else bound(rest)
+      if value_so_far + value + rest_upper <= incumbent:
+        upper = max(upper, value + rest_upper)
+        continue
+      rest_best, rest_upper = solve(rest, value_so_far + value)
+      upper = max(upper, value + rest_upper)
+      if value + rest_best > best:
+        best, best_pick = value + rest_best, tool_idx
+        incumbent = max(incumbent, value_so_far + best)
+    if known is not None:
+      if known[0] >= best:
+        best, best_pick = known[0], known[2]
+      upper = min(upper, known[1])
+    upper = max(upper, best)
+    solved[remaining] = (best, upper, best_pick)
+    return best, upper
+
+  best_value, upper_value = solve(table.all_bits, 0.0) if candidates else (0.0, 0.0)
+
+  if best_value > greedy_value * (1 + 1e-12):
+    results = []
+    remaining = table.all_bits
+    left = candidates
+    while remaining in solved and solved[remaining][2] is not None:
+      tool_idx = solved[remaining][2]
+      remaining = engine.cover(engine.highest(table, remaining, tool_idx), table, remaining, results)
+      left &= ~(1 << tool_idx)
+    # Picks adding nothing to the score, covering the rest as the greedy loop would
+    engine.drain(table, remaining, left, results)
+    score = calculate_recommendation_score(tools_dict, results)
+  if best_value <= greedy_value * (1 + 1e-12) or score < greedy_score:
+    results, score = greedy_results, greedy_score
+  if timed_out and total_activities:
+    upper_bound = max(normalize_score(max(upper_value, best_value, greedy_value) / total_activities), score)
+  else:
+    upper_bound = score
+  return [results, score, {
+    "greedy_score": greedy_score,
+    "improvement": score - greedy_score,
+    "upper_bound": upper_bound,
+    "gap": upper_bound - score,
+    "optimal": not timed_out,
+    "timed_out": timed_out,
+    "nodes": nodes,
+    "seconds": time.perf_counter() - start,
+  }]
+
+# Partial stacks kept per step / best scoring tools expanded per stack by run_beam_search
+BEAM_WIDTH = 4
+BEAM_CANDIDATES = 8
+
+def run_beam_search(tools_dict, def_tools_data, user_payment=None, catalog=None, beam_width=BEAM_WIDTH, candidate_cap=BEAM_CANDIDATES, memo=None):
+  """
+  Beam-search version of run_total_score_prioritization for large catalogs. Instead of the single greedy stack it
+  keeps the beam_width partial stacks with the highest recommendation score so far; every step each of them is
+  extended by the candidate_cap best scoring tools offering a remaining activity (found through the activity -> tool
+  index and scored in one batch by CatalogMatrix.digitalization_capability_scores). Partial stacks leaving the same
+  activities to cover are merged. beam_width=1, candidate_cap=1 is the greedy approach up to near ties.
+  Returns [results, score] as run_total_score_prioritization does.
+  """
+  if not tools_dict:
+    return []
+  stacks = beam_search_stacks(tools_dict, def_tools_data, user_payment, catalog, beam_width, candidate_cap, memo)
+  return max(stacks, key=lambda output: output[1]) if stacks else [[], 0.0]
+
+def beam_search_stacks(tools_dict, def_tools_data, user_payment=None, catalog=None, beam_width=BEAM_WIDTH, candidate_cap=BEAM_CANDIDATES, memo=None):
+  """The outputs ([results, score]) of every stack run_beam_search completed, in the order they were completed."""
+  from utils import cover_engine
+  engine = cover_engine.CoverEngine(def_tools_data, catalog, memo=memo)
+  catalog = engine.catalog
+  candidates = engine.payment_candidates(user_payment)
+  table = engine.new_table(flatten_activities(tools_dict))
+  if not candidates:
+    return []
+
+  beam = [(0.0, table.all_bits, ())]  # (sum of covered activities * total_score, remaining bits, picked tools)
+  finished = []
+  while beam:
+    extended = {}
+    for value, remaining, picks in beam:
+      rows = list(cover_engine.iter_bits(engine.touching(table, remaining) & candidates))
+      if not rows:
+        finished.append(picks)
+        continue
+      activities = [table.as_activity(idx) for idx in cover_engine.iter_bits(remaining)]
+      digi, cap = catalog.digitalization_capability_scores(activities, rows)
+      scores = digi * cap * engine.preference_array[rows]
+      for pos in np.argsort(-scores, kind="stable")[:candidate_cap].tolist():
+        tool_idx = rows[pos]
+        covered = sum(1 for tool_activity_id in catalog.tool_activity_ids[tool_idx] if table.by_id.get(tool_activity_id, 0) & remaining)
+        rest = remaining & ~table.tool_bits.get(engine.tool_names[tool_idx], 0)
+        state = (value + covered * float(scores[pos]), rest, picks + (tool_idx,))
+        if rest not in extended or state[0] > extended[rest][0]:
+          extended[rest] = state
+    beam = sorted(extended.values(), key=lambda state: -state[0])[:beam_width]
+
+  outputs = []
+  for picks in finished:
+    results = []
+    remaining = table.all_bits
+    for tool_idx in picks:
+      remaining = engine.cover(engine.highest(table, remaining, tool_idx), table, remaining, results)
+    outputs.append([results, calculate_recommendation_score(tools_dict, results)])
+  return outputs
 
 def find_number_of_unique_activities(tools_dict):
   unique_activities = set()
   for info in tools_dict.values():
-    activities = info.get("activities", []) or []
-    for activity in activities:
-      if isinstance(activity, dict):
-        activity_name = activity.get("category", "N/A").strip().lower()
-        unique_activities.add(activity_name)
+    unique_activities.update(tool_activity_codes(info).ids.tolist())
   return len(unique_activities)
 
 def calculate_recommendation_score(tools_dict, results):
@@ -441,4 +737,366 @@ def calculate_recommendation_score(tools_dict, results):
 
 def normalize_score(score):
   score = score * 100.0
-  return (((100.0 - score) / 100.0) * 60.0) + score
\ No newline at end of file
+  return (((100.0 - score) / 100.0) * 60.0) + score
+
+def check_if_all_activities_covered(tools_dict, result_data):
+  all_activities = set()
+  for tool in tools_dict.values():
+    for activity in tool["activities"]:
+      category = activity.get("category", "")
+      if category.strip():
+        all_activities.add(activity_id(category))
+
+  covered_activities = set()
+  for tool in result_data:
+    for activity in tool.get("activities", []):
+      if isinstance(activity, str):
+        category = activity
+      elif isinstance(activity, dict):
+        category = activity.get("category", "")
+      else:
+        continue
+      if category.strip():
+        covered_activities.add(activity_id(category))
+
+  uncovered_activities = all_activities - covered_activities
+  if not uncovered_activities:
+    return True
+  return False
+
+def top_k_stacks(approach, tools_dict, def_tools_data, user_payment=None, catalog=None, engine=None, memo=None, top_k=3):
+  """
+  The run_* approach with top_k: up to top_k outputs ([results, score]) with distinct tool stacks, best score first,
+  branching on the steps where other tools came within cover_engine.TIE_TOLERANCE of the winner (see
+  cover_engine.run_top_k). The branching needs the bitset engine, so it computes the stacks whatever engine is given;
+  its first stack is the one of the classic engine.
+  """
+  from utils import cover_engine
+  return cover_engine.run_top_k(
+    cover_engine.APPROACHES[approach], tools_dict, def_tools_data, user_payment, catalog, memo=memo, k=top_k
+  )
+
+# Recommendation approaches, in the order the results page presents them
+APPROACHES = (
+  ("Total Score Prioritization Approach", run_total_score_prioritization),
+  ("One-by-One Exchange Approach", run_one_by_one_exchange_approach),
+  ("Forced Exchange Approach", run_forced_exchange_approach),
+)
+
+# Stacks per approach (top_k) run_pareto_frontier starts from, besides the stacks of the beam search
+PARETO_TOP_K = 5
+
+def run_pareto_frontier(tools_dict, def_tools_data, user_payment=None, catalog=None, engine=None, memo=None, top_k=PARETO_TOP_K, beam_width=BEAM_WIDTH, candidate_cap=BEAM_CANDIDATES):
+  """
+  Trade-off view of the recommendations: instead of one score, the stacks that are best for some balance of
+  activity coverage, catalog cost rating and number of tools.
+  Candidate stacks are the top_k stacks of every approach, the stacks completed by the beam search and every prefix
+  of them (a stack cut after its first tools covers less with fewer tools). Each is measured as
+  - coverage: share of the unique activities of tools_dict it covers
+  - cost: mean catalog cost rating of its tools (higher is better, as in the preference score)
+  - tool_count: number of tools
+  and only the non-dominated ones are kept (see utils.pareto).
+  Returns a list of dicts with results, score (calculate_recommendation_score), coverage, cost and tool_count,
+  coverage first.
+  """
+  if not tools_dict:
+    return []
+  from utils.pareto import pareto_front
+  outputs = []
+  for _, approach in APPROACHES:
+    outputs += approach(tools_dict, def_tools_data, user_payment, catalog=catalog, engine=engine, memo=memo, top_k=top_k)
+  outputs += beam_search_stacks(tools_dict, def_tools_data, user_payment, catalog, beam_width, candidate_cap, memo)
+
+  total_activities = find_number_of_unique_activities(tools_dict)
+  stacks = {}
+  for results, _ in outputs:
+    for size in range(1, len(results) + 1):
+      tool_names = frozenset(result["tool_name"] for result in results[:size])
+      if tool_names not in stacks:
+        stacks[tool_names] = results[:size]
+  if not stacks or not total_activities:
+    return []
+  candidates = []
+  points = []
+  for tool_names, results in stacks.items():
+    covered = {activity_id(name) for result in results for name in result.get("activities", [])}
+    cost = sum(catalog_attribute(def_tools_data[name], "cost") for name in tool_names) / len(tool_names)
+    candidates.append(results)
+    points.append((len(covered) / total_activities, cost, len(tool_names)))
+  return [
+    {
+      "results": candidates[idx],
+      "score": calculate_recommendation_score(tools_dict, candidates[idx]),
+      "coverage": points[idx][0],
+      "cost": points[idx][1],
+      "tool_count": points[idx][2],
+    }
+    for idx in pareto_front(points)
+  ]
+
+# How run_all_approaches schedules the approaches: one after the other ("sequential") or all at once on a "thread"
+# pool. The pool is the default where there is more than one core; on a single core the threads only add switching
+# and lose the memo hits the approaches get from each other in sequence (benchmarks/bench_executor.py: about 9% slower)
+EXECUTORS = ("sequential", "thread")
+RECOMMENDATION_EXECUTOR = os.environ.get("RECOMMENDATION_EXECUTOR", "thread" if (os.cpu_count() or 1) > 1 else "sequential")
+# Thread pool of the "thread" executor, created on first use and kept for the life of the process
+_POOL = None
+_POOL_LOCK = threading.Lock()
+# Single thread running the background sweeps of submit_payment_sweep, so they take at most one core from the sessions
+_SWEEP_POOL = None
+
+def _approach_pool():
+  global _POOL
+  with _POOL_LOCK:
+    if _POOL is None:
+      _POOL = ThreadPoolExecutor(max_workers=max(len(APPROACHES), os.cpu_count() or 1), thread_name_prefix="approach")
+    return _POOL
+
+class PaymentFallbackSteps:
+  """
+  The greedy decisions a payment-filtered classic run shares with its unfiltered fallback (see run_approach).
+  The filtered run records every decision with the memo token of the activity list it was scored against. Until the
+  runs part, both are in the same state (the same activities left and tools taken), and the fallback only decides
+  differently where a tool the payment filter excluded gets near the filtered winner's total. Those totals are read
+  off the catalog score arrays the batched scorer left in memo, so finding the first step that could differ costs
+  one vector product per step. The fallback run re-takes the decisions before it without scoring and only computes
+  the steps from there on.
+  """
+
+  def __init__(self, memo, logged=None):
+    self.memo = memo
+    self.decisions = []  # (highest, requirement token) per decision of the filtered run
+    self.replay = None
+    self.logged = logged  # steps of the run's StepLog, if any
+
+  def pick(self, find, def_tools_data, flat_activities, *args, **kwargs):
+    if self.replay:
+      highest = self.replay.popleft()
+      if self.logged is not None:
+        self.logged.take(highest, find, flat_activities, args, kwargs)
+      return highest
+    highest = _pick(self.logged, find, def_tools_data, flat_activities, *args, **kwargs)
+    if self.replay is None:
+      self.decisions.append((highest, self.memo.token(requirement_key(flat_activities))))
+    return highest
+
+  def start_fallback(self, def_tools_data, user_payment, catalog, logged=None):
+    """
+    Queues the decisions the unfiltered run of def_tools_data takes alike; returns how many there are. logged: the
+    steps of the unfiltered run's StepLog, if any.
+    """
+    self.logged = logged
+    shared = 0
+    if catalog is not None and catalog.tool_names == list(def_tools_data):
+      excluded = np.flatnonzero(~catalog.payment_filter(user_payment))
+      preference_scores = np.array(
+        [def_tools_data[catalog.tool_names[idx]].get("preference_score", 0.0) for idx in excluded], dtype=float
+      )
+      for highest, token in self.decisions:
+        if not self._unchanged(highest, token, excluded, preference_scores):
+          break
+        shared += 1
+    self.replay = deque(highest for highest, _ in self.decisions[:shared])
+    return shared
+
+  def _unchanged(self, highest, token, excluded, preference_scores):
+    # A decision for a tool above 0 stays when no excluded tool is within NEAR_TIE of it; anything else (no pick,
+    # the first-tool fallback at 0, scores no longer in the memo) is left to the fallback run to decide
+    if not highest or not highest["total_score"] > 0:
+      return False
+    scores = self.memo.get(CATALOG_SCORES, token)
+    if scores is None:
+      return False
+    best = highest["total_score"]
+    totals = scores[0][excluded] * scores[1][excluded] * preference_scores
+    # NaN totals compare False, they never win
+    return not np.any(totals >= best - best * NEAR_TIE)
+
+# Runs a StepLog keeps the decisions of: 3 approaches times the payment scenarios and the unfiltered runs, for a few
+# preference weightings
+DEFAULT_LOGGED_RUNS = 128
+
+class StepLog:
+  """
+  The greedy decisions of earlier classic runs, for their reruns after an activity row was edited on the requirement
+  engineering page. A run is logged under its approach, payment selection and the catalog's preference scores, each
+  decision with the memo token of the activity list it was scored against. The rerun re-takes a logged decision
+  without scoring as long as every decision before it took the same tool (the candidates left are the same) and the
+  step comes with the same activity requirements. So it only scores the steps from the first one whose activity list
+  the edit changed, and once a decision comes out different, the rest of the run.
+  The log is bound to the catalog of its memo, like the memo's scores.
+  """
+
+  def __init__(self, memo, maxruns=DEFAULT_LOGGED_RUNS):
+    self.memo = memo
+    self.maxruns = maxruns
+    self._runs = OrderedDict()
+    self._lock = threading.Lock()
+
+  def run(self, title, def_tools_data, user_payment=None):
+    """The steps (see _pick) of a new run of approach title, replaying the run logged under the same key before."""
+    preference_token = self.memo.token(tuple(info.get("preference_score", 0.0) for info in def_tools_data.values()))
+    key = (title, tuple(user_payment) if user_payment else None, preference_token)
+    with self._lock:
+      steps = LoggedSteps(self.memo, self._runs.pop(key, []))
+      # Logged right away: a run of the same key starting meanwhile replays the decisions taken so far
+      self._runs[key] = steps.decisions
+      while len(self._runs) > self.maxruns:
+        self._runs.popitem(last=False)
+    return steps
+
+class LoggedSteps:
+  """The steps of one run of a StepLog: replays the decisions of the previous run where they still hold (see StepLog)."""
+
+  def __init__(self, memo, logged):
+    self.memo = memo
+    self.logged = logged  # (step key, highest) per decision of the previous run
+    self.decisions = []
+    self.replaying = True
+
+  def pick(self, find, def_tools_data, flat_activities, *args, **kwargs):
+    key = self._step_key(find, flat_activities, args, kwargs)
+    step = len(self.decisions)
+    if self.replaying and step < len(self.logged) and self.logged[step][0] == key:
+      highest = self.logged[step][1]
+      profile = instrumentation.active_profile()
+      if profile is not None:
+        profile.count("steps_replayed")
+    else:
+      highest = find(def_tools_data, flat_activities, *args, **kwargs)
+    self._append(key, highest)
+    return highest
+
+  def take(self, highest, find, flat_activities, args, kwargs):
+    """Logs a decision taken elsewhere (the shared steps of PaymentFallbackSteps)."""
+    self._append(self._step_key(find, flat_activities, args, kwargs), highest)
+
+  def _step_key(self, find, flat_activities, args, kwargs):
+    # The activity index, catalog and memo arguments are the same for every run of the log; the flags
+    # (force_all_activities, drain) are part of the step
+    flags = tuple(arg for arg in (*args, *kwargs.values()) if isinstance(arg, bool))
+    return find.__name__, self.memo.token(requirement_key(flat_activities)), flags
+
+  def _append(self, key, highest):
+    step = len(self.decisions)
+    if self.replaying and (step >= len(self.logged) or _tool_name(self.logged[step][1]) != _tool_name(highest)):
+      # The candidates left differ from here on
+      self.replaying = False
+    self.decisions.append((key, highest))
+
+def _tool_name(highest):
+  return highest["tool_name"] if highest else None
+
+def _logged_steps(step_log, title, def_tools_data, user_payment, engine):
+  # StepLog steps of a run, on the classic engine only
+  if step_log is None or resolve_engine(engine) != "classic":
+    return None
+  return step_log.run(title, def_tools_data, user_payment)
+
+def run_approach(title, tools_dict, def_tools_data, user_payment=None, catalog=None, engine=None, memo=None, step_log=None):
+  """
+  One approach the way the results page shows it: with the user's payment filter, and again on the whole catalog
+  when the filtered stack leaves activities uncovered. Returns (title, result, score, payment_flag), payment_flag
+  False when the filtered stack is incomplete. The fallback run shares memo with the filtered one, so it only scores
+  the tools the payment filter excluded. On the classic engine with a catalog matrix it also re-takes the filtered
+  run's decisions up to the first one an excluded tool could change (see PaymentFallbackSteps), so it only computes
+  the greedy steps after that. With step_log (StepLog) both runs re-take the decisions of their runs before that an
+  edit of the tool stack left as they were.
+  """
+  approach = dict(APPROACHES)[title]
+  profile = instrumentation.active_profile()
+  start = time.perf_counter() if profile is not None else None
+  steps = _logged_steps(step_log, title, def_tools_data, user_payment, engine)
+  fallback_steps = None
+  if user_payment and catalog is not None and resolve_engine(engine) == "classic":
+    memo = memo if memo is not None else ScoreMemo()
+    steps = fallback_steps = PaymentFallbackSteps(memo, steps)
+  filtered = approach(tools_dict, def_tools_data, user_payment, catalog=catalog, engine=engine, memo=memo, steps=steps)
+  unfiltered = None
+  if user_payment and not check_if_all_activities_covered(tools_dict, filtered[0] if filtered else []):
+    steps = _logged_steps(step_log, title, def_tools_data, None, engine)
+    if fallback_steps is not None:
+      shared = fallback_steps.start_fallback(def_tools_data, user_payment, catalog, steps)
+      if profile is not None:
+        profile.count("fallback_steps_shared", shared)
+      steps = fallback_steps
+    unfiltered = approach(tools_dict, def_tools_data, catalog=catalog, engine=engine, memo=memo, steps=steps)
+  outcome = _approach_outcome(title, tools_dict, user_payment, filtered, unfiltered)
+  if profile is not None:
+    profile.add_time(title, time.perf_counter() - start)
+  return outcome
+
+def _approach_outcome(title, tools_dict, user_payment, filtered, unfiltered):
+  payment_flag = check_if_all_activities_covered(tools_dict, filtered[0] if filtered else [])
+  profile = instrumentation.active_profile()
+  if user_payment and not payment_flag and profile is not None:
+    profile.count("payment_fallbacks")
+  output = filtered if payment_flag or not user_payment else unfiltered
+  result, score = output if output else ([], 0.0)
+  return title, result, score, payment_flag
+
+def run_all_approaches(tools_dict, def_tools_data, user_payment=None, catalog=None, engine=None, memo=None, executor=None, step_log=None):
+  """
+  run_approach for every approach, in APPROACHES order. With the "thread" executor the approaches run concurrently on
+  a pool shared by all calls, so the latency is that of the slowest one instead of the sum where the scoring releases
+  the GIL (numpy batches) or more cores are free. The runs don't modify their inputs, so the threads share
+  tools_dict, def_tools_data and memo, and run in a copy of the caller's context, so they report into its profile
+  (utils.instrumentation).
+  """
+  executor = executor or RECOMMENDATION_EXECUTOR
+  if executor not in EXECUTORS:
+    raise ValueError(f"Unknown executor '{executor}', expected one of {EXECUTORS}")
+  if executor == "sequential":
+    return [run_approach(title, tools_dict, def_tools_data, user_payment, catalog, engine, memo, step_log) for title, _ in APPROACHES]
+  pool = _approach_pool()
+  futures = [
+    pool.submit(contextvars.copy_context().run, run_approach, title, tools_dict, def_tools_data, user_payment, catalog, engine, memo, step_log)
+    for title, _ in APPROACHES
+  ]
+  return [future.result() for future in futures]
+
+def payment_scenarios():
+  """user_payment values of every non-empty combination of PaymentMethodOptions."""
+  codes = [PAYMENT_METHOD.encode(method) for method in PaymentMethodOptions]
+  return [scenario for size in range(1, len(codes) + 1) for scenario in combinations(codes, size)]
+
+def run_payment_sweep(tools_dict, def_tools_data, scenarios=None, catalog=None, engine=None, memo=None, step_log=None):
+  """
+  run_all_approaches for several payment selections at once (default: payment_scenarios()), as
+  {scenario: [(title, result, score, payment_flag), ...]} with scenarios as tuples of user_payment codes.
+  The unfiltered fallback run of each approach is computed once for all scenarios and the per-tool scores are shared
+  through memo. The memoized scores don't depend on the user weights, so a sweep after the weights changed or after an
+  activity row was edited that gets the memo of the sweep before only scores the activity lists it hasn't seen. With
+  step_log (StepLog) a sweep after an edit also re-takes the decisions the edit left as they were.
+  """
+  scenarios = [tuple(scenario) for scenario in (scenarios or payment_scenarios())]
+  memo = memo if memo is not None else ScoreMemo()
+  sweep = {scenario: [] for scenario in scenarios}
+  for title, approach in APPROACHES:
+    with instrumentation.timed(title):
+      unfiltered = approach(
+        tools_dict, def_tools_data, catalog=catalog, engine=engine, memo=memo,
+        steps=_logged_steps(step_log, title, def_tools_data, None, engine),
+      )
+      outputs = {
+        scenario: approach(
+          tools_dict, def_tools_data, list(scenario), catalog=catalog, engine=engine, memo=memo,
+          steps=_logged_steps(step_log, title, def_tools_data, scenario, engine),
+        )
+        for scenario in scenarios
+      }
+    for scenario in scenarios:
+      sweep[scenario].append(_approach_outcome(title, tools_dict, scenario, outputs[scenario], unfiltered))
+  return sweep
+
+def submit_payment_sweep(tools_dict, def_tools_data, scenarios=None, catalog=None, engine=None, memo=None, step_log=None):
+  """
+  run_payment_sweep on a background thread, e.g. for the scenarios a page hasn't shown yet; returns the
+  concurrent.futures.Future of the sweep. The sweep reads tools_dict, def_tools_data and catalog while it runs, so
+  callers pass inputs they no longer modify. It runs outside the caller's context and reports into no profile.
+  """
+  global _SWEEP_POOL
+  with _POOL_LOCK:
+    if _SWEEP_POOL is None:
+      _SWEEP_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="payment-sweep")
+  return _SWEEP_POOL.submit(run_payment_sweep, tools_dict, def_tools_data, scenarios, catalog, engine, memo, step_log)
@@ -0,0 +1,177 @@
+"""
+Recommendation results shared by page reruns and browser sessions.
+
+Recommendation outcomes (run_all_approaches per payment scenario, or run_payment_sweep) are keyed by a content hash of
+everything they depend on (see result_key): the re_details rows of the stack, the user weights, the payment scenarios,
+the catalog content and the engine version. RESULT_CACHE,
+the process-wide instance the Design Recommendation page uses, keeps the most recently used results in memory and,
+with the RECOMMENDATION_CACHE_DIR environment variable set, also as JSON files in that directory, so they survive
+restarts and are shared by server processes. The files are plain data (see to_json), so a file placed in the directory
+can at worst be a wrong result, never code that runs. Cached results are returned as stored, callers must not modify
+them.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from utils.replay import catalog_hash
+
+DEFAULT_MAXSIZE = 64
+DEFAULT_DISK_ENTRIES = 1000
+# Modules whose code decides the results; a change to any of them is a new engine version
+ENGINE_MODULES = (
+  "requirement_calc.py", "cover_engine.py", "catalog_matrix.py", "option_codecs.py", "activity_registry.py",
+  "score_memo.py", os.path.join(os.pardir, "data", "SelectValues.py"),
+)
+
+_engine_version = None
+
+
+def engine_version():
+  """Content hash of the engine modules, computed once per process."""
+  global _engine_version
+  if _engine_version is None:
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for module in ENGINE_MODULES:
+      with open(os.path.join(directory, module), "rb") as f:
+        digest.update(f.read())
+    _engine_version = digest.hexdigest()
+  return _engine_version
+
+
+def result_key(tools_dict, weights, scenarios, def_tools_data, engine, catalog_key=None):
+  """
+  Content hash of the inputs of run_all_approaches / run_payment_sweep for the given payment scenarios. Tool and row
+  order are kept, since ties between tools are broken by it. weights: (usability, support, integration, cost); engine:
+  the resolved engine name; catalog_key: catalog_hash(def_tools_data), when the caller computed it already.
+  """
+  catalog_key = catalog_key or catalog_hash(def_tools_data)
+  stack = [[tool_id, info.get("activities", [])] for tool_id, info in tools_dict.items()]
+  inputs = [stack, list(weights), [list(scenario) for scenario in scenarios], catalog_key, engine, engine_version()]
+  return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def to_json(value):
+  """
+  value as JSON data that from_json turns back into an equal value: every dict and tuple is tagged, so tuples stay
+  tuples and dicts may have tuple keys (the scenarios of run_payment_sweep). Raises TypeError for other types.
+  """
+  if isinstance(value, tuple):
+    return {"tuple": [to_json(item) for item in value]}
+  if isinstance(value, list):
+    return [to_json(item) for item in value]
+  if isinstance(value, dict):
+    return {"items": [[to_json(key), to_json(item)] for key, item in value.items()]}
+  if value is None or isinstance(value, (str, bool, int, float)):
+    return value
+  raise TypeError(f"{type(value).__name__} values are not cached on disk")
+
+
+def from_json(data):
+  if isinstance(data, list):
+    return [from_json(item) for item in data]
+  if isinstance(data, dict):
+    if "tuple" in data:
+      return tuple(from_json(item) for item in data["tuple"])
+    return {from_json(key): from_json(item) for key, item in data["items"]}
+  return data
+
+
+class ResultCache:
+  """
+  Bounded LRU of results by result_key, with an optional directory as second tier holding up to disk_entries files
+  (least recently used removed first). Disk errors are treated as misses. Safe to share between threads.
+  """
+
+  def __init__(self, maxsize=DEFAULT_MAXSIZE, directory=None, disk_entries=DEFAULT_DISK_ENTRIES):
+    self.maxsize = maxsize
+    self.directory = directory
+    self.disk_entries = disk_entries
+    self.hits = 0
+    self.disk_hits = 0
+    self.misses = 0
+    self._results = OrderedDict()
+    self._lock = threading.Lock()
+
+  def __len__(self):
+    return len(self._results)
+
+  def _path(self, key):
+    return os.path.join(self.directory, f"{key}.json")
+
+  def get(self, key):
+    with self._lock:
+      result = self._results.get(key)
+      if result is not None:
+        self.hits += 1
+        self._results.move_to_end(key)
+        return result
+    result = self._read(key) if self.directory else None
+    with self._lock:
+      if result is None:
+        self.misses += 1
+        return None
+      self.disk_hits += 1
+      self._remember(key, result)
+    return result
+
+  def put(self, key, result):
+    with self._lock:
+      self._remember(key, result)
+    if self.directory:
+      self._write(key, result)
+
+  def _remember(self, key, result):
+    self._results[key] = result
+    self._results.move_to_end(key)
+    if len(self._results) > self.maxsize:
+      self._results.popitem(last=False)
+
+  def _read(self, key):
+    path = self._path(key)
+    try:
+      with open(path, "r", encoding="utf-8") as f:
+        result = from_json(json.load(f))
+      os.utime(path)
+    except (OSError, ValueError, KeyError, TypeError, RecursionError):
+      return None
+    return result
+
+  def _write(self, key, result):
+    try:
+      body = json.dumps(to_json(result))
+      os.makedirs(self.directory, mode=0o700, exist_ok=True)
+      tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+      with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(body)
+      os.replace(tmp_path, self._path(key))
+      entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")]
+      if len(entries) > self.disk_entries:
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.disk_entries]:
+          os.remove(entry.path)
+    except (OSError, TypeError, ValueError):
+      # The disk tier is an optimization only; a read-only or full directory or a result it can't store as JSON
+      # must not break the page
+      pass
+
+  def clear(self):
+    with self._lock:
+      self._results.clear()
+
+  def info(self):
+    lookups = self.hits + self.disk_hits + self.misses
+    return {
+      "hits": self.hits,
+      "disk_hits": self.disk_hits,
+      "misses": self.misses,
+      "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+      "size": len(self._results),
+      "maxsize": self.maxsize,
+    }
+
+
+RESULT_CACHE = ResultCache(directory=os.environ.get("RECOMMENDATION_CACHE_DIR") or None)
@@ -0,0 +1,139 @@
+"""
+Per-tool score memo shared by the engine passes of one recommendation request.
+
+The three approaches and their payment-fallback reruns keep scoring the same catalog tools against the same
+activity lists. ScoreMemo keeps the (digi_score, cap_score) pair of calculate_digitalization_capability_scores per
+(catalog tool, frozen activity-requirement list) in a bounded LRU. Preference scores are not part of the key, the
+total_score is recomputed from the memoized pair.
+"""
+import threading
+from collections import OrderedDict
+from itertools import count
+
+from utils.activity_registry import flat_activity_id
+
+DEFAULT_MAXSIZE = 100_000
+# Requirement keys remembered for tokens; a key holds one tuple per activity, so these are kept fewer
+DEFAULT_MAX_TOKENS = 1024
+# Memory of the catalog score arrays (see CATALOG_SCORES), which grows with the catalog size
+DEFAULT_MAX_ARRAY_BYTES = 32 * 2**20
+# Tool name under which batched scorers keep the score arrays of the whole catalog for a token
+CATALOG_SCORES = None
+
+
+def requirement_key(flat_activities):
+  """
+  Frozen form of a flat activity list as the scorer sees it: activity ID, the three requirement levels and nfc_score
+  per entry. List order is kept since the float sums of the scores depend on it.
+  """
+  return tuple(
+    (
+      flat_activity_id(a),
+      a.get("digitalization", 0),
+      a.get("aiLevel", 0),
+      a.get("synchronization", 0),
+      a.get("nfc_score", 0),
+    )
+    for a in flat_activities
+  )
+
+
+class ScoreMemo:
+  """
+  Bounded LRU of (digi_score, cap_score) per (tool name, requirement token).
+  Requirement keys are interned to int tokens (see token), so lookups hash two scalars instead of the list. Tokens
+  come from a counter and are never handed out twice: callers keep them (e.g. cover_engine.ActivityTable), so a
+  token whose key was evicted has to keep missing rather than find the scores of another key.
+  The per-tool pairs are bounded by maxsize entries, the remembered keys by max_tokens and the catalog score arrays
+  (CATALOG_SCORES) by the memory they take, max_array_bytes. Safe to share between threads.
+  """
+
+  def __init__(self, maxsize=DEFAULT_MAXSIZE, max_tokens=DEFAULT_MAX_TOKENS, max_array_bytes=DEFAULT_MAX_ARRAY_BYTES):
+    self.maxsize = maxsize
+    self.max_tokens = max_tokens
+    self.max_array_bytes = max_array_bytes
+    self.hits = 0
+    self.misses = 0
+    self._scores = OrderedDict()
+    self._arrays = OrderedDict()  # token -> catalog score arrays
+    self._array_bytes = 0
+    self._tokens = OrderedDict()
+    self._next_token = count()
+    self._lock = threading.Lock()
+
+  def __len__(self):
+    return len(self._scores) + len(self._arrays)
+
+  def token(self, key):
+    """Token of a requirement_key; equal keys get the same token while the key is remembered."""
+    with self._lock:
+      token = self._tokens.get(key)
+      if token is None:
+        token = next(self._next_token)
+        self._tokens[key] = token
+        if len(self._tokens) > self.max_tokens:
+          # The scores under the forgotten token are no longer looked up and age out of the LRU
+          self._tokens.popitem(last=False)
+      else:
+        self._tokens.move_to_end(key)
+      return token
+
+  def get(self, tool_name, token):
+    with self._lock:
+      if tool_name is CATALOG_SCORES:
+        entries, key = self._arrays, token
+      else:
+        entries, key = self._scores, (tool_name, token)
+      scores = entries.get(key)
+      if scores is None:
+        self.misses += 1
+        return None
+      self.hits += 1
+      entries.move_to_end(key)
+      return scores
+
+  def put(self, tool_name, token, scores):
+    with self._lock:
+      if tool_name is CATALOG_SCORES:
+        self._put_arrays(token, scores)
+        return
+      self._scores[(tool_name, token)] = scores
+      self._scores.move_to_end((tool_name, token))
+      if len(self._scores) > self.maxsize:
+        self._scores.popitem(last=False)
+
+  def _put_arrays(self, token, scores):
+    previous = self._arrays.pop(token, None)
+    if previous is not None:
+      self._array_bytes -= _nbytes(previous)
+    size = _nbytes(scores)
+    if size > self.max_array_bytes:
+      return
+    self._arrays[token] = scores
+    self._array_bytes += size
+    while self._array_bytes > self.max_array_bytes:
+      _, evicted = self._arrays.popitem(last=False)
+      self._array_bytes -= _nbytes(evicted)
+
+  def clear(self):
+    with self._lock:
+      self._scores.clear()
+      self._arrays.clear()
+      self._array_bytes = 0
+      self._tokens.clear()
+
+  def info(self):
+    lookups = self.hits + self.misses
+    return {
+      "hits": self.hits,
+      "misses": self.misses,
+      "hit_rate": self.hits / lookups if lookups else 0.0,
+      "size": len(self._scores),
+      "maxsize": self.maxsize,
+      "tokens": len(self._tokens),
+      "array_bytes": self._array_bytes,
+    }
+
+
+def _nbytes(scores):
+  return sum(getattr(values, "nbytes", 0) for values in scores)
@@ -1,6 +1,13 @@
 import pandas as pd
+import numpy as np
+import openpyxl
 import streamlit as st
+import hashlib
+import pickle
 import json
+import math
+import time
+import threading
 import os
 
 # Define APP_ROOT for persistent data storage
@@ -27,6 +34,10 @@ TEMPLATE_PATH = "data/METIS_VoC.xlsx"
 DEF_TOOLS_DATA_PATH = "data/def_tools_data.xlsx"
 JSON_DEFAULT_USE_CASES_PATH = "data/default_use_cases.json"
 
+# Compiled snapshots of catalog workbooks, one per workbook (rebuilt automatically when the workbook changes)
+DEF_TOOLS_CACHE_DIR = DATA_DIR
+DEF_TOOLS_CACHE_VERSION = 3
+
 FILE_MAP = [JSON_FILE_PATH, JSON_MANUAL_TASKS_PATH, JSON_DETAILS_DATA_PATH, JSON_RE_DETAILS_DATA_PATH,
             JSON_PRIO_DATA_PATH, JSON_USER_RATINGS_PATH, JSON_SELECTED_USE_CASE_PATH, CURRENT_PAGE_JSON]
 
@@ -39,77 +50,182 @@ def reset_application_data():
             st.toast(f"Failed to delete '{file_path}': {e}")
 
 
-def load_def_tools_data_from_xlsx(file_path=DEF_TOOLS_DATA_PATH) -> dict:
+def _file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def def_tools_cache_path(file_path):
+    """Snapshot location of a catalog workbook: named after the workbook and keyed by its absolute path."""
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    path_hash = hashlib.sha256(os.path.abspath(file_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(DEF_TOOLS_CACHE_DIR, f"{stem}.{path_hash}.cache")
+
+def _read_def_tools_cache(file_path, cache_path):
+    """
+    Returns the cached catalog if the snapshot at cache_path was compiled from the current
+    content of file_path, otherwise None. Size and mtime are checked first; the content hash
+    is only computed when they differ (e.g. after a copy that touched the mtime).
+    """
+    try:
+        with open(cache_path, "rb") as f:
+            snapshot = pickle.load(f)
+        stat = os.stat(file_path)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("version") != DEF_TOOLS_CACHE_VERSION:
+        return None
+    if snapshot.get("size") != stat.st_size:
+        return None
+    if snapshot.get("mtime_ns") != stat.st_mtime_ns:
+        if snapshot.get("sha256") != _file_sha256(file_path):
+            return None
+        # Same content with a new mtime: refresh the key so the next load skips hashing
+        _write_def_tools_cache(snapshot["catalog"], file_path, cache_path, snapshot["sha256"])
+    return snapshot["catalog"]
+
+def _write_def_tools_cache(catalog, file_path, cache_path, sha256=None):
+    try:
+        stat = os.stat(file_path)
+        snapshot = {
+            "version": DEF_TOOLS_CACHE_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256 or _file_sha256(file_path),
+            "catalog": catalog,
+        }
+        # Unique per process and thread: Streamlit sessions load the catalog from concurrent threads
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # The cache is an optimization only; a read-only data dir must not break loading
+        pass
+
+def load_def_tools_data_from_xlsx(file_path=DEF_TOOLS_DATA_PATH, cache_path=None, use_cache=True, with_info=False):
+    """
+    Returns the tool catalog of the given XLSX file (see parse_def_tools_data_from_xlsx).
+    The parsed catalog is kept as a binary snapshot at cache_path (by default the workbook's own
+    def_tools_cache_path), keyed by the workbook's size, mtime and content hash, so the workbook
+    is only parsed again after it changed. Pass use_cache=False to always parse the workbook.
+    With with_info=True, returns (catalog, info) where info holds the "source" ("cache" or
+    "workbook") and the "seconds" this load took.
+    """
+    start = time.perf_counter()
+    if use_cache and cache_path is None:
+        cache_path = def_tools_cache_path(file_path)
+    result = _read_def_tools_cache(file_path, cache_path) if use_cache else None
+    source = "cache"
+    if result is None:
+        result = parse_def_tools_data_from_xlsx(file_path)
+        source = "workbook"
+        if use_cache:
+            _write_def_tools_cache(result, file_path, cache_path)
+    if with_info:
+        return result, {"source": source, "seconds": time.perf_counter() - start}
+    return result
+
+# Cell texts that pandas.read_excel treats as missing; kept so the streaming reader produces the same catalog
+_XLSX_NA_STRINGS = frozenset(["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+                              "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"])
+
+def _xlsx_value(value):
+    """
+    Normalizes a raw openpyxl cell value the way pandas.read_excel does (None means missing). NaN and
+    infinite numbers count as missing too, so their cells are skipped like pd.notna skipped NaN.
+    """
+    if isinstance(value, str):
+        return None if value in _XLSX_NA_STRINGS else value
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            return None
+        if value == int(value):
+            return int(value)
+    return value
+
+def _xlsx_rows(workbook, sheet_index):
+    """Streams the rows of a read-only sheet over its used range."""
+    return workbook.worksheets[sheet_index].iter_rows(values_only=True)
+
+def parse_def_tools_data_from_xlsx(file_path=DEF_TOOLS_DATA_PATH) -> dict:
     """
     Reads the first sheet of the given XLSX file and returns a dictionary:
     {tool_id: {"activities": [{"activity": <string>, "category": <string>}, ...], "automation": <number>, "ai_level": <number>, "syncronization": <number>,
                "integration": <value>, "usability": <value>, "cost": <value>, "support": <value>, "payment_method": <list of strings>}}
     Also reads the second sheet for automation, ai_level, syncronization, integration, usability, cost, support, and payment_method values.
+    Tool columns (from D) and activity rows (from 2) are detected from the used range of the sheet, and rows are
+    streamed so only the resulting catalog is held in memory.
     """
-    # First sheet: activities and categories
-    df = pd.read_excel(file_path, sheet_name=0, header=None)
-    tool_ids = df.iloc[0, 3:92].tolist()  # D to CM
-    activity_names = df.iloc[1:, 2].tolist()  # C, from row 2
-    category_names = df.iloc[1:, 1].tolist()  # B, from row 2
-    data = df.iloc[1:, 3:92]
-
-    result = {}
-    for col_idx, tool_id in enumerate(tool_ids):
-        if pd.isna(tool_id):
-            continue
-        activities = []
-        for row_idx, val in enumerate(data.iloc[:, col_idx]):
-            if val == 1:
-                activity = activity_names[row_idx]
-                category = category_names[row_idx]
-                if pd.notna(activity) and pd.notna(category):
-                    activities.append({"activity": activity, "category": category})
-        result[str(tool_id)] = {"activities": activities}
-
-    # Second sheet: automation, ai_level, syncronization, integration, usability, cost, support, payment_method
-    df2 = pd.read_excel(file_path, sheet_name=1, header=None)
-    for idx in range(1, df2.shape[0]):
-        tool_name = df2.iloc[idx, 0]
-        if pd.isna(tool_name):
-            continue
-        tool_name_lc = str(tool_name).strip().lower()
-        # Find matching tool in result (case-insensitive)
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        # First sheet: activities and categories
+        rows = _xlsx_rows(workbook, 0)
+        header = [_xlsx_value(v) for v in next(rows, ())[3:]]  # D onwards
+        while header and header[-1] is None:
+            header.pop()
+        tool_count = len(header)
+        activities_by_col = [[] for _ in range(tool_count)]
+        for row in rows:
+            if len(row) < 4:
+                continue
+            category = _xlsx_value(row[1])  # B
+            activity = _xlsx_value(row[2])  # C
+            if activity is None or category is None:
+                continue
+            marks = np.array(row[3:3 + tool_count], dtype=object)
+            for col_idx in np.flatnonzero(marks == 1):
+                activities_by_col[col_idx].append({"activity": activity, "category": category})
+
+        result = {}
+        for col_idx, tool_id in enumerate(header):
+            if tool_id is None:
+                continue
+            result[str(tool_id)] = {"activities": activities_by_col[col_idx]}
+
+        # Second sheet: automation, ai_level, syncronization, integration, usability, cost, support, payment_method
+        # Case-insensitive name lookup; the first catalog key wins when two normalize to the same name
+        key_lookup = {}
         for key in result:
-            if str(key).strip().lower() == tool_name_lc:
-                # Columns: B=1, C=2, D=3, E=4, F=5, I=8, J=9, K=10, L=11
-                integration = df2.iloc[idx, 1]
-                usability = df2.iloc[idx, 2]
-                cost = df2.iloc[idx, 3]
-                support = df2.iloc[idx, 4]
-                functionality = df2.iloc[idx, 5]  # Column F
-                automation = df2.iloc[idx, 8]
-                ai_level = df2.iloc[idx, 9]
-                syncronization = df2.iloc[idx, 10]
-                payment_method_raw = df2.iloc[idx, 11]  # Column L
-                if pd.notna(integration):
-                    result[key]["integration"] = integration
-                if pd.notna(usability):
-                    result[key]["usability"] = usability
-                if pd.notna(cost):
-                    result[key]["cost"] = cost
-                if pd.notna(support):
-                    result[key]["support"] = support
-                if pd.notna(functionality):
-                    result[key]["functionality"] = functionality
-                if pd.notna(automation):
-                    result[key]["automation"] = automation
-                if pd.notna(ai_level):
-                    result[key]["ai_level"] = ai_level
-                if pd.notna(syncronization):
-                    result[key]["syncronization"] = syncronization
-                if pd.notna(payment_method_raw):
-                    # Split by "/", trim, and filter out empty strings
-                    if str(payment_method_raw).strip() == "-":
-                        payment_methods = [0]
-                    else:
-                        payment_methods = [int(pm.strip()) for pm in str(payment_method_raw).split("/") if pm.strip()]
-                    result[key]["payment_method"] = payment_methods
-                break  # Stop after first match
+            key_lookup.setdefault(str(key).strip().lower(), key)
+
+        # Columns: B=1, C=2, D=3, E=4, F=5, I=8, J=9, K=10, L=11
+        attribute_columns = (
+            ("integration", 1),
+            ("usability", 2),
+            ("cost", 3),
+            ("support", 4),
+            ("functionality", 5),
+            ("automation", 8),
+            ("ai_level", 9),
+            ("syncronization", 10),
+        )
+        rows = _xlsx_rows(workbook, 1)
+        next(rows, None)  # header row
+        for row in rows:
+            row = [_xlsx_value(v) for v in row[:12]]
+            row.extend([None] * (12 - len(row)))
+            tool_name = row[0]
+            if tool_name is None:
+                continue
+            key = key_lookup.get(str(tool_name).strip().lower())
+            if key is None:
+                continue
+            for attr, col in attribute_columns:
+                if row[col] is not None:
+                    result[key][attr] = row[col]
+            payment_method_raw = row[11]  # Column L
+            if payment_method_raw is not None:
+                # Split by "/", trim, and filter out empty strings
+                if str(payment_method_raw).strip() == "-":
+                    payment_methods = [0]
+                else:
+                    payment_methods = [int(pm.strip()) for pm in str(payment_method_raw).split("/") if pm.strip()]
+                result[key]["payment_method"] = payment_methods
+    finally:
+        workbook.close()
 
     return result
 